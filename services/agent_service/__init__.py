@@ -1,6 +1,22 @@
-"""Veris Agent Service - AI fact-checking system"""
+"""Veris Agent Service - AI fact-checking system
 
-from .agent import root_agent
-from .database import db_client
+Importing the package is cheap: `root_agent` (with its sub-agents and the
+database configuration) is built on first attribute access.
+"""
+from typing import Any
+from dotenv import load_dotenv
 
-__all__ = ['root_agent', 'db_client']
\ No newline at end of file
+# Before any submodule reads its os.getenv() configuration
+load_dotenv()
+
+__all__ = ['root_agent', 'db_client']
+
+
+def __getattr__(name: str) -> Any:
+    if name == "root_agent":
+        from .agent import get_root_agent
+        return get_root_agent()
+    if name == "db_client":
+        from .database import db_client
+        return db_client
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
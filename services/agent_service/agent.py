@@ -1,22 +1,25 @@
+import asyncio
+import atexit
 import logging
 import os
+import threading
+import time
+from typing import Any, Dict, Optional
 from google.adk.agents import LlmAgent
 from google.adk.tools.agent_tool import AgentTool
 from . import prompt
-from .model_callbacks import before_model_modifier
-from .sub_agents.claim_extraction_agent.claim_extration_agent import claim_extraction_agent
-from .sub_agents.verify_claim_agent.verify_claim_agent import verify_claim_agent
-from .sub_agents.save_verified_claim_agent.save_verified_claim_agent import save_verified_claim_agent
-from .database import db_client
+from .metrics import instrument_agent, set_readiness_probe, start_exporters
+from .database import db_client, async_db_client
 
 logger = logging.getLogger(__name__)
 
 GEMINI_MODEL = os.getenv("GEMINI_MODEL_ROOT", "gemini-2.5-flash")
+WARM_UP_ENABLED = os.getenv("WARM_UP_ENABLED", "true").lower() == "true"
 DESCRIPTION = "Orchestrate fact-checking pipeline: extract claims → verify → save. Handles uploaded media (images/videos) and text input."
 
 
 def initialize_database():
-    """Initialize database connection"""
+    """Configure the database clients (pools open on first use or in warm_up())"""
     try:
         project_id = os.getenv("NEON_PROJECT_ID", "")
         database_name = os.getenv("NEON_DATABASE_NAME", "neondb")
@@ -26,32 +29,144 @@ def initialize_database():
             return False
         
         db_client.connect(project_id, database_name)
-        logger.info(f"✅ Database connected: {database_name}")
+        async_db_client.connect(project_id, database_name)
+        logger.info(f"✅ Database configured: {database_name}")
         return True
     except Exception as e:
         logger.error(f"❌ Database connection failed: {e}")
         return False
 
-root_agent = None
-
-if claim_extraction_agent and verify_claim_agent and save_verified_claim_agent:
-    db_initialized = initialize_database()
-    
-    if db_initialized:
-        root_agent = LlmAgent(
-            name="veris",
-            model=GEMINI_MODEL, 
-            description=DESCRIPTION,
-            instruction=prompt.VERIS_AGENT_PROMPT,
-            tools=[
-                AgentTool(claim_extraction_agent),
-                AgentTool(verify_claim_agent),
-                AgentTool(save_verified_claim_agent)
-            ],
-            before_model_callback=before_model_modifier,
-        )
-        logger.info(f"✅ Root agent 'Veris' created using model '{GEMINI_MODEL}'.")
-    else:
-        logger.error("❌ Cannot create root agent: Database initialization failed")
-else:
-    logger.error("❌ Cannot create root agent: Sub-agents failed to initialize")
\ No newline at end of file
+
+def create_root_agent(model=GEMINI_MODEL) -> LlmAgent:
+    """Build the orchestrator over the sub-agent singletons
+
+    Args:
+        model: Model name or BaseLlm instance (the benchmark passes a scripted model)
+    """
+    from .model_callbacks import before_model_modifier
+    from .pipeline.context_compaction import compact_model_context
+    from .pipeline.model_scheduler import scheduled
+    from .pipeline.state import capture_content_item
+    from .sub_agents.claim_extraction_agent.claim_extration_agent import claim_extraction_agent
+    from .sub_agents.verify_claim_agent.verify_claim_agent import verify_claims_agent
+    from .sub_agents.save_verified_claim_agent.save_verified_claim_agent import save_verified_claim_agent
+
+    return instrument_agent(LlmAgent(
+        name="veris",
+        model=scheduled(model),
+        description=DESCRIPTION,
+        instruction=prompt.VERIS_AGENT_PROMPT,
+        tools=[
+            AgentTool(claim_extraction_agent),
+            AgentTool(verify_claims_agent),
+            AgentTool(save_verified_claim_agent)
+        ],
+        before_agent_callback=capture_content_item,
+        before_model_callback=[before_model_modifier, compact_model_context],
+    ))
+
+
+# Warm-up status per dependency: None until the first attempt finishes
+_warm_up_status: Dict[str, Optional[bool]] = {"database": None, "storage": None}
+_warm_up_thread: Optional[threading.Thread] = None
+_root_agent: Optional[LlmAgent] = None
+_root_agent_lock = threading.Lock()
+_write_behind_start: Optional[asyncio.Task] = None
+
+
+def _warm_up() -> None:
+    from .media.uploader import media_uploader
+
+    started = time.monotonic()
+    _warm_up_status["database"] = db_client.connected and db_client.warm_up()
+    try:
+        if media_uploader.backend is not None:
+            media_uploader.backend.warm_up()
+        _warm_up_status["storage"] = True
+    except Exception as e:
+        logger.warning(f"⚠️ Storage warm-up failed: {e}")
+        _warm_up_status["storage"] = False
+    logger.info(f"🔥 Warm-up finished in {time.monotonic() - started:.2f}s: {_warm_up_status}")
+
+
+def warm_up() -> None:
+    """Open the DB pool and the storage client in a background thread (no-op while one runs)
+
+    The async pool is left to open on first use: it is bound to the request's event loop.
+    """
+    global _warm_up_thread
+    if _warm_up_thread is not None and _warm_up_thread.is_alive():
+        return
+    _warm_up_thread = threading.Thread(target=_warm_up, name="warm-up", daemon=True)
+    _warm_up_thread.start()
+
+
+def start_write_behind() -> None:
+    """Replay the claim journal now and drain it when the process exits
+
+    The ADK server owns the event loop, so the drain runs from atexit. Without
+    a running loop the buffer starts with the first save instead.
+    """
+    global _write_behind_start
+    from .database.write_behind import WRITE_BEHIND_ENABLED, claim_buffer
+
+    if not WRITE_BEHIND_ENABLED:
+        return
+    atexit.register(claim_buffer.close_at_exit)
+    try:
+        _write_behind_start = asyncio.get_running_loop().create_task(claim_buffer.start())
+    except RuntimeError:
+        pass
+
+
+def get_root_agent() -> Optional[LlmAgent]:
+    """Root agent, built on first call (None if a sub-agent failed to build)
+
+    Building does not wait on the database: pools open in the background
+    warm-up, and a failed warm-up is retried by readiness().
+    """
+    global _root_agent
+    if _root_agent is not None:
+        return _root_agent
+
+    with _root_agent_lock:
+        if _root_agent is None:
+            started = time.monotonic()
+            from .sub_agents.claim_extraction_agent.claim_extration_agent import claim_extraction_agent
+            from .sub_agents.verify_claim_agent.verify_claim_agent import verify_claims_agent
+            from .sub_agents.save_verified_claim_agent.save_verified_claim_agent import save_verified_claim_agent
+
+            if not (claim_extraction_agent and verify_claims_agent and save_verified_claim_agent):
+                logger.error("❌ Cannot create root agent: Sub-agents failed to initialize")
+                return None
+
+            initialize_database()
+            if WARM_UP_ENABLED:
+                warm_up()
+            start_write_behind()
+            _root_agent = create_root_agent()
+            set_readiness_probe(readiness)
+            start_exporters()
+            logger.info(
+                f"✅ Root agent 'Veris' created using model '{GEMINI_MODEL}' "
+                f"in {time.monotonic() - started:.2f}s."
+            )
+    return _root_agent
+
+
+def readiness() -> Dict[str, Any]:
+    """Readiness probe: root agent built and database reachable
+
+    A failed database warm-up is retried in the background on each probe.
+    """
+    if _warm_up_status["database"] is False and db_client.connected:
+        warm_up()
+    checks = {"root_agent": _root_agent is not None, **_warm_up_status}
+    return {"ready": bool(checks["root_agent"] and checks["database"]), "checks": checks}
+
+
+def __getattr__(name: str) -> Any:
+    # ADK loads `root_agent` from this module; build it on first access
+    if name == "root_agent":
+        return get_root_agent()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
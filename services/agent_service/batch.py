@@ -0,0 +1,222 @@
+"""Batch ingestion of crawler output: extract → verify → save for each item
+
+Usage:
+    python -m agent_service.batch items.jsonl --checkpoint run.ckpt
+    crawler ... | python -m agent_service.batch - --rpm gemini-2.5-pro=60
+
+Input is one RawContentItem JSON object per line. URLs of completed items are
+appended to the checkpoint file, so a rerun with the same checkpoint skips them.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, Optional, Set, TextIO
+from .database import async_db_client
+from .database.write_behind import WRITE_BEHIND_CLOSE_TIMEOUT, claim_buffer
+from .metrics import METRICS_DUMP_PATH, dump_metrics, start_exporters
+from .pipeline.ingest import content_item_from_raw, process_content_item
+from .pipeline.model_scheduler import model_scheduler, set_model_rpm
+from .pipeline.priority import CRAWLER, priority_class
+from .pipeline.verdict_cache import verdict_cache
+from .pipeline.verify_stage import VERIFY_CONCURRENCY, cascade_stats
+from .sub_agents.claim_extraction_agent.claim_extration_agent import extraction_cache
+
+logger = logging.getLogger(__name__)
+
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "8"))
+
+
+class Checkpoint:
+    """Append-only file of completed URLs"""
+
+    def __init__(self, path: Optional[str]):
+        self.path = path
+        self.completed: Set[str] = set()
+        self._file: Optional[TextIO] = None
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                self.completed = {line.strip() for line in f if line.strip()}
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.completed
+
+    def mark(self, url: str) -> None:
+        self.completed.add(url)
+        if not self.path:
+            return
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(url + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+class BatchStats:
+    def __init__(self):
+        self.started = time.monotonic()
+        self.items = 0
+        self.claims = 0
+        self.saved = 0
+        self.failures = 0
+        self.skipped = 0
+
+    def report(self) -> Dict[str, Any]:
+        elapsed = max(time.monotonic() - self.started, 1e-9)
+        return {
+            "items": self.items,
+            "claims": self.claims,
+            "saved": self.saved,
+            "failures": self.failures,
+            "skipped": self.skipped,
+            "elapsed_seconds": round(elapsed, 1),
+            "items_per_second": round(self.items / elapsed, 3),
+            "claims_per_second": round(self.claims / elapsed, 3),
+            "extraction_cache": extraction_cache.stats(),
+            "verdict_cache": verdict_cache.stats(),
+            "write_behind": claim_buffer.stats(),
+            "verification_tiers": cascade_stats.stats(),
+            "model_scheduler": model_scheduler.stats(),
+        }
+
+
+async def _process(
+    raw: Dict[str, Any], stats: BatchStats, checkpoint: Checkpoint, verify_concurrency: int
+) -> None:
+    url = raw.get("url", "?")
+    try:
+        result = await process_content_item(content_item_from_raw(raw), verify_concurrency)
+    except Exception as e:
+        stats.failures += 1
+        logger.error(f"❌ {url}: {e}")
+        return
+
+    stats.items += 1
+    stats.claims += result["claims"]
+    stats.saved += result["saved"]
+    if result["success"]:
+        checkpoint.mark(url)
+        logger.info(f"✅ {url}: {result['saved']}/{result['claims']} claims saved")
+    else:
+        stats.failures += 1
+        logger.warning(
+            f"⚠️ {url}: {result['failed']} verifications failed, "
+            f"{result['saved']}/{result['claims']} claims saved"
+        )
+
+
+async def run_batch(
+    source: TextIO,
+    concurrency: int = BATCH_CONCURRENCY,
+    verify_concurrency: int = VERIFY_CONCURRENCY,
+    checkpoint_path: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Stream JSONL items through the pipeline with at most `concurrency` in flight
+
+    Items run at crawler priority, behind interactive fact-checks.
+
+    Returns:
+        dict: Run report (counts, items/sec, claims/sec, verdict cache stats)
+    """
+    stats = BatchStats()
+    checkpoint = Checkpoint(checkpoint_path)
+    slots = asyncio.Semaphore(concurrency)
+    tasks: Set[asyncio.Task] = set()
+
+    async def run_item(raw: Dict[str, Any]) -> None:
+        try:
+            await _process(raw, stats, checkpoint, verify_concurrency)
+        finally:
+            slots.release()
+
+    try:
+        with priority_class(CRAWLER):
+            while True:
+                line = await asyncio.to_thread(source.readline)
+                if not line:
+                    break
+                if not line.strip():
+                    continue
+
+                try:
+                    raw = json.loads(line)
+                except json.JSONDecodeError as e:
+                    stats.failures += 1
+                    logger.error(f"❌ Invalid JSONL line: {e}")
+                    continue
+                if not raw.get("url"):
+                    stats.failures += 1
+                    logger.error("❌ Item without url skipped")
+                    continue
+                if raw["url"] in checkpoint:
+                    stats.skipped += 1
+                    continue
+
+                # Acquire before creating the task so reading stays ahead by at most `concurrency`
+                await slots.acquire()
+                task = asyncio.create_task(run_item(raw))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+    finally:
+        checkpoint.close()
+
+    return stats.report()
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Batch claim extraction and verification")
+    parser.add_argument("input", help="JSONL file of RawContentItem records, or - for stdin")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="Items in flight")
+    parser.add_argument(
+        "--verify-concurrency", type=int, default=VERIFY_CONCURRENCY, help="Claims verified in parallel per item"
+    )
+    parser.add_argument("--checkpoint", help="File of completed URLs (created, appended and resumed)")
+    parser.add_argument(
+        "--rpm", action="append", default=[], metavar="MODEL=N", help="Requests per minute for a model (repeatable)"
+    )
+    return parser.parse_args(argv)
+
+
+async def main(argv=None) -> int:
+    args = _parse_args(argv)
+    for entry in args.rpm:
+        model, _, rpm = entry.partition("=")
+        set_model_rpm(model.strip(), float(rpm))
+
+    project_id = os.getenv("NEON_PROJECT_ID", "")
+    if not project_id:
+        logger.error("❌ NEON_PROJECT_ID required")
+        return 2
+    async_db_client.connect(project_id, os.getenv("NEON_DATABASE_NAME", "neondb"))
+
+    start_exporters()
+    await claim_buffer.start()
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    try:
+        report = await run_batch(source, args.concurrency, args.verify_concurrency, args.checkpoint)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        # Whatever cannot be written now stays journaled for the next run
+        await claim_buffer.close(timeout=WRITE_BEHIND_CLOSE_TIMEOUT)
+        await async_db_client.disconnect()
+        if METRICS_DUMP_PATH:
+            dump_metrics()
+
+    print(json.dumps(report, indent=2))
+    return 1 if report["failures"] else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,9 @@
+"""Offline pipeline benchmark: root_agent with a scripted model and an in-memory database
+
+Usage:
+    python -m agent_service.bench
+    python -m agent_service.bench --corpus short_posts --iterations 3 --model-latency 0.2
+
+No Gemini, Neon or GCS access is needed: every LlmAgent gets a ScriptedLlm,
+the DB clients are routed to InMemoryDatabase and media goes to local storage.
+"""
@@ -0,0 +1,194 @@
+"""Run the offline benchmark (see agent_service.bench)"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List
+from ..agent import create_root_agent
+from ..database import async_db_client, db_client
+from ..database.write_behind import claim_buffer
+from ..media.storage import LocalStorageBackend
+from ..media.uploader import media_uploader
+from ..pipeline.agent_runner import run_agent
+from ..pipeline.ingest import process_content_item
+from ..pipeline.model_scheduler import scheduled
+from ..pipeline.priority import CRAWLER, priority_class
+from ..pipeline.verdict_cache import verdict_cache
+from ..sub_agents.claim_extraction_agent.claim_extration_agent import claim_extractor, extraction_cache
+from ..sub_agents.verify_claim_agent.verify_claim_agent import verify_claim_tiers
+from .corpora import CORPORA, backlog_items
+from .fake_db import InMemoryDatabase
+from .scripted_llm import ScriptedLlm
+
+logger = logging.getLogger(__name__)
+
+ALLOCATION_FILTERS = [
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+]
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(round(q * len(ordered) + 0.5)) - 1))]
+
+
+async def run_corpus(
+    name: str, root, models: List[ScriptedLlm], database: InMemoryDatabase, args: argparse.Namespace
+) -> Dict[str, Any]:
+    items = CORPORA[name](args.scale)
+    latencies: List[float] = []
+    calls_before = sum(model.calls for model in models)
+    round_trips_before = database.round_trips
+    slots = asyncio.Semaphore(args.concurrency)
+
+    async def run_item(message) -> None:
+        async with slots:
+            started = time.perf_counter()
+            await run_agent(root, message, user_id="bench")
+            latencies.append(time.perf_counter() - started)
+
+    verdict_cache.clear()
+    extraction_cache.clear()
+    if args.tracemalloc:
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+        current_before = tracemalloc.get_traced_memory()[0]
+
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        await asyncio.gather(*(run_item(message) for message in items))
+    wall = time.perf_counter() - started
+
+    drain_started = time.perf_counter()
+    await media_uploader.drain()
+    await claim_buffer.flush()
+    drain = time.perf_counter() - drain_started
+
+    runs = len(items) * args.iterations
+    report = {
+        "corpus": name,
+        "items": runs,
+        "wall_seconds": round(wall, 3),
+        "items_per_second": round(runs / wall, 2),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "model_calls_per_item": round((sum(model.calls for model in models) - calls_before) / runs, 2),
+        "extraction_cache_hit_rate": extraction_cache.stats()["hit_rate"],
+        "db_round_trips_per_item": round((database.round_trips - round_trips_before) / runs, 2),
+        "drain_seconds": round(drain, 3),
+    }
+
+    if args.tracemalloc:
+        current, peak = tracemalloc.get_traced_memory()
+        report["alloc_peak_mb"] = round((peak - current_before) / 1e6, 2)
+        report["alloc_retained_kb_per_item"] = round((current - current_before) / 1e3 / runs, 1)
+        report["top_allocations"] = [
+            f"{stat.traceback[0].filename.rsplit('/', 1)[-1]}:{stat.traceback[0].lineno} {stat.size_diff / 1e3:+.1f} KB"
+            for stat in tracemalloc.take_snapshot().filter_traces(ALLOCATION_FILTERS).compare_to(
+                before.filter_traces(ALLOCATION_FILTERS), "lineno"
+            )[:5]
+        ]
+    return report
+
+
+async def run_backlog(count: int, concurrency: int) -> Dict[str, Any]:
+    """Crawler items through extract → verify → save, competing with the corpora for capacity"""
+    slots = asyncio.Semaphore(concurrency)
+
+    async def run_item(item) -> None:
+        async with slots:
+            await process_content_item(item)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(run_item(item) for item in backlog_items(count)))
+    return {"items": count, "seconds": round(time.perf_counter() - started, 2)}
+
+
+async def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Offline pipeline benchmark")
+    parser.add_argument("--corpus", action="append", choices=sorted(CORPORA), help="Corpus to run (repeatable; default all)")
+    parser.add_argument("--iterations", type=int, default=1, help="Passes over each corpus")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiply corpus sizes")
+    parser.add_argument("--concurrency", type=int, default=1, help="Items in flight")
+    parser.add_argument("--model-latency", type=float, default=0.0, help="Seconds per scripted model call")
+    parser.add_argument("--db-latency", type=float, default=0.0, help="Seconds per fake DB round-trip")
+    parser.add_argument("--backlog", type=int, default=0, help="Crawler-priority items run in the background meanwhile")
+    parser.add_argument("--backlog-concurrency", type=int, default=16, help="Backlog items in flight")
+    parser.add_argument("--no-tracemalloc", dest="tracemalloc", action="store_false", help="Skip allocation tracking")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    database = InMemoryDatabase(latency=args.db_latency)
+    database.install(db_client, async_db_client)
+
+    media_dir = tempfile.TemporaryDirectory(prefix="veris_bench_media_")
+    media_uploader.backend = LocalStorageBackend(media_dir.name)
+    # Start cold and leave the real extraction cache and claim journal alone
+    cache_dir = tempfile.TemporaryDirectory(prefix="veris_bench_extraction_cache_")
+    extraction_cache.root = Path(cache_dir.name)
+    claim_buffer.journal_path = str(Path(cache_dir.name) / "claim-journal.sqlite3")
+
+    models = [
+        ScriptedLlm(model="gemini-bench-root", role="root", latency=args.model_latency),
+        ScriptedLlm(model="gemini-bench-extract", role="extract", latency=args.model_latency),
+    ]
+    root = create_root_agent(models[0])
+    claim_extractor.model = scheduled(models[1])
+    for index, tier in enumerate(verify_claim_tiers):
+        models.append(ScriptedLlm(model=f"gemini-bench-verify-{index}", role="verify", latency=args.model_latency))
+        tier.model = scheduled(models[-1])
+
+    # Warm-up outside the measurement: lazy imports, schema generation, first sessions
+    for name in args.corpus or list(CORPORA):
+        await run_agent(root, CORPORA[name](args.scale)[0], user_id="bench")
+    await media_uploader.drain()
+
+    backlog = None
+    if args.backlog:
+        with priority_class(CRAWLER):
+            backlog = asyncio.create_task(run_backlog(args.backlog, args.backlog_concurrency))
+        await asyncio.sleep(0.5)  # Let the backlog fill the queues first
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    try:
+        reports = [
+            await run_corpus(name, root, models, database, args)
+            for name in args.corpus or list(CORPORA)
+        ]
+        backlog_report = await backlog if backlog else None
+    finally:
+        if args.tracemalloc:
+            tracemalloc.stop()
+        await claim_buffer.close()
+        media_dir.cleanup()
+        cache_dir.cleanup()
+
+    if args.json:
+        print(json.dumps({"corpora": reports, "backlog": backlog_report} if backlog else reports, indent=2))
+        return 0
+
+    columns = [
+        "corpus", "items", "items_per_second", "p50_ms", "p95_ms",
+        "model_calls_per_item", "extraction_cache_hit_rate", "db_round_trips_per_item", "alloc_peak_mb", "alloc_retained_kb_per_item",
+    ]
+    print(" | ".join(columns))
+    for report in reports:
+        print(" | ".join(str(report.get(column, "-")) for column in columns))
+        for line in report.get("top_allocations", []):
+            print(f"    {line}")
+    if backlog_report:
+        print(f"backlog: {backlog_report['items']} crawler items in {backlog_report['seconds']}s")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    sys.exit(asyncio.run(main()))
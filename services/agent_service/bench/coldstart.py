@@ -0,0 +1,106 @@
+"""Cold-start benchmark: fresh interpreters timing import, root agent build and readiness
+
+Usage:
+    python -m agent_service.bench.coldstart --runs 5 --top 15
+
+Each run starts a new Python process (as a Cloud Run instance would) and
+reports seconds to `import agent_service`, to `agent_service.root_agent`, and
+until readiness() reports the database reachable (when DATABASE_URL and
+NEON_PROJECT_ID are set). The slowest imports come from `python -X importtime`.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+SERVICES_DIR = Path(__file__).resolve().parents[2]
+
+PROBE = r"""
+import json, time
+started = time.perf_counter()
+import agent_service
+imported = time.perf_counter()
+root = agent_service.root_agent
+built = time.perf_counter()
+from agent_service.agent import readiness
+ready_at = None
+if {wait_ready}:
+    deadline = built + {ready_timeout}
+    while time.perf_counter() < deadline:
+        status = readiness()
+        if status["checks"]["database"] is not None:
+            ready_at = time.perf_counter() if status["ready"] else None
+            break
+        time.sleep(0.01)
+print(json.dumps({{
+    "import_seconds": imported - started,
+    "root_agent_seconds": built - imported,
+    "ready_seconds": None if ready_at is None else ready_at - started,
+    "root_agent_built": root is not None,
+}}))
+"""
+
+
+def run_probe(wait_ready: bool, ready_timeout: float) -> Dict[str, Any]:
+    script = PROBE.format(wait_ready=wait_ready, ready_timeout=ready_timeout)
+    completed = subprocess.run(
+        [sys.executable, "-c", script], cwd=SERVICES_DIR, capture_output=True, text=True, check=True
+    )
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> List[Tuple[str, float]]:
+    """Modules with the highest cumulative import time (seconds) for `import agent_service; root_agent`"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import agent_service; agent_service.root_agent"],
+        cwd=SERVICES_DIR, capture_output=True, text=True, check=True,
+    )
+    timings = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.removeprefix("import time:").split("|")
+        timings.append((module.strip(), int(cumulative) / 1e6))
+    return sorted(timings, key=lambda timing: timing[1], reverse=True)[:top]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to time")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports to list")
+    parser.add_argument("--ready-timeout", type=float, default=30.0, help="Seconds to wait for readiness")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    wait_ready = bool(os.getenv("DATABASE_URL") and os.getenv("NEON_PROJECT_ID"))
+    runs = [run_probe(wait_ready, args.ready_timeout) for _ in range(args.runs)]
+
+    report: Dict[str, Any] = {"runs": args.runs}
+    for key in ("import_seconds", "root_agent_seconds", "ready_seconds"):
+        values = [run[key] for run in runs if run[key] is not None]
+        if values:
+            report[key] = {"median": round(statistics.median(values), 3), "max": round(max(values), 3)}
+    report["root_agent_built"] = all(run["root_agent_built"] for run in runs)
+    report["slowest_imports"] = [
+        {"module": module, "seconds": round(seconds, 3)} for module, seconds in slowest_imports(args.top)
+    ]
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return 0
+    for key in ("import_seconds", "root_agent_seconds", "ready_seconds"):
+        if key in report:
+            print(f"{key}: median {report[key]['median']}s, max {report[key]['max']}s")
+    print(f"root_agent_built: {report['root_agent_built']}")
+    print("slowest imports (cumulative):")
+    for entry in report["slowest_imports"]:
+        print(f"    {entry['seconds']:.3f}s {entry['module']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
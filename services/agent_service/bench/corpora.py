@@ -0,0 +1,74 @@
+"""Fixed benchmark corpora (deterministic, generated in memory)"""
+import json
+import random
+from typing import Any, Callable, Dict, List
+from google.genai import types
+
+WORDS = (
+    "government report inflation percent quarter growth vaccine study hospital "
+    "minister election votes budget billion climate emissions record data survey "
+    "officials announced increase decrease rate million city national according"
+).split()
+
+
+def _text(rng: random.Random, chars: int, paragraph_chars: int = 0) -> str:
+    words = []
+    length = 0
+    while length < chars:
+        word = rng.choice(WORDS) if rng.random() > 0.1 else str(rng.randint(2, 2024))
+        words.append(word)
+        length += len(word) + 1
+        if paragraph_chars and length % paragraph_chars < len(word) + 1:
+            words[-1] += ".\n\n"
+    return " ".join(words)
+
+
+def _text_items(prefix: str, count: int, chars: int, seed: int, paragraph_chars: int = 0) -> List[types.Content]:
+    rng = random.Random(seed)
+    items = []
+    for index in range(count):
+        item = {
+            "source": "Benchmark",
+            "url": f"https://bench.example/{prefix}/{index}",
+            "content_type": "text",
+            "raw_text": _text(rng, chars, paragraph_chars),
+            "metadata": {"title": f"{prefix} {index}"},
+        }
+        items.append(types.Content(role="user", parts=[types.Part(text=json.dumps(item))]))
+    return items
+
+
+def _media_items(mime_type: str, count: int, size: int, seed: int) -> List[types.Content]:
+    rng = random.Random(seed)
+    return [
+        types.Content(role="user", parts=[
+            types.Part(text="Fact-check this upload."),
+            types.Part(inline_data=types.Blob(mime_type=mime_type, data=rng.randbytes(size))),
+        ])
+        for _ in range(count)
+    ]
+
+
+def backlog_items(count: int, chars: int = 2000, seed: int = 6) -> List[Dict[str, Any]]:
+    """Crawler content items (content_item layout) for the background backlog"""
+    rng = random.Random(seed)
+    return [
+        {
+            "source": "Benchmark Crawler",
+            "url": f"https://bench.example/backlog/{index}",
+            "content_type": "text",
+            "raw_text": _text(rng, chars),
+            "metadata": {},
+        }
+        for index in range(count)
+    ]
+
+
+CORPORA: Dict[str, Callable[[float], List[types.Content]]] = {
+    "short_posts": lambda scale: _text_items("post", max(1, int(40 * scale)), 280, 1),
+    "long_articles": lambda scale: _text_items("article", max(1, int(10 * scale)), 8000, 2),
+    # Hour-long transcript scale: chunked into parallel extraction windows
+    "long_reports": lambda scale: _text_items("report", max(1, int(3 * scale)), 120000, 5, paragraph_chars=900),
+    "image_uploads": lambda scale: _media_items("image/png", max(1, int(8 * scale)), 1536 * 1024, 3),
+    "video_uploads": lambda scale: _media_items("video/mp4", max(1, int(4 * scale)), 12 * 1024 * 1024, 4),
+}
@@ -0,0 +1,181 @@
+"""In-memory stand-in for the Neon clients
+
+Implements the query()/transaction() contract of NeonDatabaseClient and
+AsyncNeonDatabaseClient. Claim upserts are applied to a dict keyed on
+(url, claim) and answer RETURNING; content upserts go to a dict keyed on
+content_hash. The re-verification statements (candidate select, guarded
+verdict update, rechecked_at touch, run record) work on the same claim rows.
+Other statements (verdict lookups, index probes) return no rows. Every call
+counts as one round-trip.
+"""
+import asyncio
+import json
+import time
+from datetime import datetime
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Dict, List, Optional, Tuple
+from ..database.operations import CLAIM_COLUMNS, CONTENT_COLUMNS
+from ..metrics import record_db_query
+
+
+class FakeCursor:
+    def __init__(self, database: "InMemoryDatabase"):
+        self.database = database
+        self.description = None
+        self.rowcount = 0
+        self._rows: List[Dict[str, Any]] = []
+
+    def execute(self, sql: str, params: Optional[list] = None) -> None:
+        self._rows = []
+        rowcount = None
+        if sql.lstrip().startswith("INSERT INTO crawled_content (") and params:
+            width = len(CLAIM_COLUMNS)
+            for start in range(0, len(params), width):
+                row = dict(zip(CLAIM_COLUMNS, params[start:start + width]))
+                row.update(updated_at=datetime.utcnow(), rechecked_at=None)
+                self.database.rows[(row["url"], row["claim"])] = row
+                self._rows.append({"id": row["id"], "url": row["url"], "claim": row["claim"]})
+        elif sql.lstrip().startswith("INSERT INTO content (") and params:
+            width = len(CONTENT_COLUMNS)
+            for start in range(0, len(params), width):
+                row = dict(zip(CONTENT_COLUMNS, params[start:start + width]))
+                self.database.contents[row["content_hash"]] = row
+        elif "GREATEST(verified_at, rechecked_at) <" in sql:
+            self._rows = self.database.select_candidates(*params)
+        elif sql.lstrip().startswith("UPDATE crawled_content SET rechecked_at"):
+            checked_at, ids = params
+            for row in self.database.rows.values():
+                if row["id"] in ids:
+                    row["rechecked_at"] = checked_at
+        elif sql.lstrip().startswith("UPDATE crawled_content SET"):
+            rowcount = self.database.update_verdict(*params)
+        elif sql.lstrip().startswith("INSERT INTO reverify_runs"):
+            self.database.reverify_runs.append(params)
+        elif "crawled_content_staging" in sql:
+            raise NotImplementedError("COPY batches are not simulated; keep batches under CLAIM_BATCH_COPY_THRESHOLD")
+        self.description = [("id",)] if self._rows else None
+        self.rowcount = len(self._rows) if rowcount is None else rowcount
+
+    def fetchall(self) -> List[Dict[str, Any]]:
+        return self._rows
+
+
+class AsyncFakeCursor(FakeCursor):
+    async def execute(self, sql: str, params: Optional[list] = None) -> None:
+        super().execute(sql, params)
+
+    async def fetchall(self) -> List[Dict[str, Any]]:
+        return self._rows
+
+
+class InMemoryDatabase:
+    """Shared store behind both fake clients, with simulated per-round-trip latency"""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.rows: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        self.contents: Dict[str, Dict[str, Any]] = {}
+        self.reverify_runs: List[tuple] = []
+        self.round_trips = 0
+
+    def select_candidates(self, statuses, cutoff, max_confidence, limit) -> List[Dict[str, Any]]:
+        """reverify.SELECT_CANDIDATES_SQL (GREATEST skips NULLs)"""
+        def checked(row):
+            return max((value for value in (row.get("verified_at"), row.get("rechecked_at")) if value), default=None)
+
+        rows = [
+            row for row in self.rows.values()
+            if row["claim"] is not None and row["verification_status"] in statuses
+            and checked(row) is not None and checked(row) < cutoff and row["confidence"] <= max_confidence
+        ]
+        rows.sort(key=lambda row: (checked(row), row["id"]))
+        columns = ("id", "claim", "category", "claim_hash", "verification_status", "confidence", "updated_at")
+        return [{column: row[column] for column in columns} for row in rows[:limit]]
+
+    def update_verdict(self, status, confidence, evidence, sources, verified_at, rechecked_at, claim_id, updated_at) -> int:
+        """reverify.UPDATE_VERDICT_SQL: only while updated_at is unchanged"""
+        for row in self.rows.values():
+            if row["id"] == claim_id and row["updated_at"] == updated_at:
+                row.update(
+                    verification_status=status, confidence=confidence, evidence=evidence,
+                    verification_sources=json.loads(sources), verified_at=verified_at,
+                    rechecked_at=rechecked_at, updated_at=datetime.utcnow(),
+                )
+                return 1
+        return 0
+
+    def _run(self, sql: str, params) -> Dict[str, Any]:
+        cursor = FakeCursor(self)
+        cursor.execute(sql, params)
+        if sql.lstrip().upper().startswith("SELECT"):
+            return {"rows": cursor.fetchall(), "rowcount": cursor.rowcount}
+        return {"rowcount": cursor.rowcount}
+
+    # Sync client surface
+
+    def connect(self, project_id: str = "", database_name: str = "") -> None:
+        pass
+
+    def query(self, sql: str, params: Optional[tuple] = None) -> Dict[str, Any]:
+        started = time.monotonic()
+        self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+        try:
+            return self._run(sql, params)
+        finally:
+            record_db_query("fake", "query", time.monotonic() - started)
+
+    @contextmanager
+    def transaction(self):
+        started = time.monotonic()
+        self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+        try:
+            yield FakeCursor(self)
+        finally:
+            record_db_query("fake", "transaction", time.monotonic() - started)
+
+    def disconnect(self) -> None:
+        pass
+
+    # Async client surface
+
+    async def aquery(self, sql: str, params: Optional[tuple] = None) -> Dict[str, Any]:
+        started = time.monotonic()
+        self.round_trips += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        try:
+            return self._run(sql, params)
+        finally:
+            record_db_query("fake", "query", time.monotonic() - started)
+
+    @asynccontextmanager
+    async def atransaction(self):
+        started = time.monotonic()
+        self.round_trips += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        try:
+            yield AsyncFakeCursor(self)
+        finally:
+            record_db_query("fake", "transaction", time.monotonic() - started)
+
+    async def adisconnect(self) -> None:
+        pass
+
+    def install(self, sync_client, async_client) -> None:
+        """Route the given client singletons to this store (instance attributes shadow the methods)"""
+        sync_client.connect = self.connect
+        sync_client.query = self.query
+        sync_client.transaction = self.transaction
+        sync_client.disconnect = self.disconnect
+        sync_client.connected = True
+
+        async_client.connect = self.connect
+        async_client.query = self.aquery
+        async_client.transaction = self.atransaction
+        async_client.disconnect = self.adisconnect
+        async_client.connected = True
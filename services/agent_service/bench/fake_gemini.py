@@ -0,0 +1,103 @@
+"""Local stand-in for the Gemini generateContent endpoint with quota and injected 429s
+
+Point a Gemini model at it with base_url=server.url. Requests over the
+per-model RPM quota (a token bucket, burst of one second's worth) and a random
+inject_429 share of the rest get a RESOURCE_EXHAUSTED 429 with a RetryInfo
+delay, like the real API. Accepted requests sleep latency seconds and return a
+fixed JSON text part with usage metadata.
+"""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+
+class FakeGeminiServer:
+    def __init__(self, rpm: float = 600, inject_429: float = 0.0, latency: float = 0.1, seed: int = 0):
+        self.rate = rpm / 60.0
+        self.capacity = max(1.0, self.rate)
+        self.inject_429 = inject_429
+        self.latency = latency
+        self.accepted = 0
+        self.rejected = 0
+        self.max_concurrent = 0
+        self._concurrent = 0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def _admit(self) -> Optional[float]:
+        """None when admitted, else the retry delay to report"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                self.rejected += 1
+                return (1 - self._tokens) / self.rate
+            if self._random.random() < self.inject_429:
+                self.rejected += 1
+                return 1.0
+            self._tokens -= 1
+            self.accepted += 1
+            self._concurrent += 1
+            self.max_concurrent = max(self.max_concurrent, self._concurrent)
+            return None
+
+    def _handle(self, handler: BaseHTTPRequestHandler) -> None:
+        body = handler.rfile.read(int(handler.headers.get("Content-Length") or 0))
+        delay = self._admit()
+        if delay is not None:
+            self._reply(handler, 429, {"error": {
+                "code": 429,
+                "message": "Resource has been exhausted (e.g. check quota).",
+                "status": "RESOURCE_EXHAUSTED",
+                "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": f"{delay:.3f}s"}],
+            }})
+            return
+        try:
+            time.sleep(self.latency)
+            self._reply(handler, 200, {
+                "candidates": [{"content": {"role": "model", "parts": [{"text": "{}"}]}, "finishReason": "STOP"}],
+                "usageMetadata": {"promptTokenCount": len(body) // 4, "candidatesTokenCount": 1, "totalTokenCount": len(body) // 4 + 1},
+            })
+        finally:
+            with self._lock:
+                self._concurrent -= 1
+
+    @staticmethod
+    def _reply(handler: BaseHTTPRequestHandler, status: int, payload: Dict[str, Any]) -> None:
+        data = json.dumps(payload).encode()
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json")
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def start(self) -> "FakeGeminiServer":
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                fake._handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
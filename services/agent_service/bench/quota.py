@@ -0,0 +1,100 @@
+"""Quota benchmark: the model scheduler against a local endpoint that returns 429s
+
+Usage:
+    python -m agent_service.bench.quota --calls 200 --concurrency 32 --server-rpm 600 --inject-429 0.05
+    python -m agent_service.bench.quota --unscheduled   # same load straight to the model
+
+A real Gemini model (google-genai client and all) is pointed at a
+FakeGeminiServer, and `calls` requests are issued `concurrency` at a time.
+Reports successes, failures, 429s served, latency and the scheduler's lane
+state (final concurrency limit, calls by outcome).
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List
+from google.adk.models import LlmRequest
+from google.adk.models.google_llm import Gemini
+from google.genai import types
+from ..pipeline.model_scheduler import model_scheduler, scheduled
+from .fake_gemini import FakeGeminiServer
+
+MODEL = "gemini-quota-bench"
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def run(args: argparse.Namespace, server: FakeGeminiServer) -> Dict[str, Any]:
+    gemini = Gemini(model=MODEL, base_url=server.url)
+    model = gemini if args.unscheduled else scheduled(gemini)
+    slots = asyncio.Semaphore(args.concurrency)
+    latencies: List[float] = []
+    failures = 0
+
+    async def call(index: int) -> None:
+        nonlocal failures
+        request = LlmRequest(
+            model=MODEL,
+            contents=[types.Content(role="user", parts=[types.Part(text=f"Request {index}: " + "x" * 400)])],
+            config=types.GenerateContentConfig(),
+        )
+        async with slots:
+            started = time.perf_counter()
+            try:
+                async for _ in model.generate_content_async(request):
+                    pass
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(call(index) for index in range(args.calls)))
+    wall = time.perf_counter() - started
+    return {
+        "mode": "unscheduled" if args.unscheduled else "scheduled",
+        "calls": args.calls,
+        "succeeded": len(latencies),
+        "failed": failures,
+        "server_429s": server.rejected,
+        "server_max_concurrent": server.max_concurrent,
+        "wall_seconds": round(wall, 2),
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "lane": None if args.unscheduled else model_scheduler.lane(MODEL).stats(),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Model scheduler quota benchmark")
+    parser.add_argument("--calls", type=int, default=200, help="Requests to issue")
+    parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight from the caller")
+    parser.add_argument("--server-rpm", type=float, default=600, help="Fake endpoint quota (requests per minute)")
+    parser.add_argument("--inject-429", type=float, default=0.05, help="Share of in-quota requests rejected anyway")
+    parser.add_argument("--latency", type=float, default=0.1, help="Fake endpoint seconds per accepted request")
+    parser.add_argument("--rpm", type=float, help="Client-side RPM limit for the scheduler lane")
+    parser.add_argument("--unscheduled", action="store_true", help="Call the model directly")
+    args = parser.parse_args(argv)
+
+    # The fake endpoint ignores credentials, but the client wants an API key
+    os.environ.setdefault("GOOGLE_API_KEY", "fake-key")
+    os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "false"
+    if args.rpm:
+        model_scheduler.set_limits(MODEL, rpm=args.rpm)
+
+    server = FakeGeminiServer(args.server_rpm, args.inject_429, args.latency).start()
+    try:
+        report = asyncio.run(run(args, server))
+    finally:
+        server.stop()
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
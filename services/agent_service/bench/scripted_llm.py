@@ -0,0 +1,114 @@
+"""Deterministic stand-in for Gemini with canned orchestration/extraction/verification output"""
+import asyncio
+import hashlib
+import json
+from typing import AsyncGenerator, List
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+
+PIPELINE_TOOLS = ("claim_extraction_agent", "verify_claims_agent", "save_verified_claim_agent")
+VERDICTS = ("verified", "false", "partially_true", "disputed", "unverifiable")
+CHARS_PER_TOKEN = 4
+CHARS_PER_CLAIM = 600
+MAX_CLAIMS = 6
+
+
+def _digest(text: str) -> int:
+    return int(hashlib.md5(text.encode()).hexdigest()[:8], 16)
+
+
+def _texts(content: types.Content) -> List[str]:
+    return [part.text for part in content.parts or [] if part.text]
+
+
+class ScriptedLlm(BaseLlm):
+    """Scripted model for one agent role
+
+    Roles:
+        root: calls extraction → verification → save once each, then answers
+        extract: 1 claim per CHARS_PER_CLAIM request characters (up to MAX_CLAIMS)
+        verify: verdict picked from a hash of the claim
+
+    The model name must look like a Gemini model so google_search accepts it.
+    """
+
+    role: str
+    latency: float = 0.0
+    calls: int = 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if self.role == "root":
+            part = self._orchestrate(llm_request)
+        else:
+            request = "\n".join(_texts(llm_request.contents[-1])) if llm_request.contents else ""
+            output = self._extract(request) if self.role == "extract" else self._verify(request)
+            part = types.Part(text=json.dumps(output))
+
+        prompt_chars = sum(len(text) for content in llm_request.contents for text in _texts(content))
+        response_chars = len(part.text or json.dumps(part.function_call.args))
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_chars // CHARS_PER_TOKEN,
+                candidates_token_count=response_chars // CHARS_PER_TOKEN,
+            ),
+        )
+
+    def _orchestrate(self, llm_request: LlmRequest) -> types.Part:
+        user_turns = [
+            content for content in llm_request.contents
+            if content.role == "user" and _texts(content)
+        ]
+        called = {
+            part.function_response.name
+            for content in llm_request.contents
+            for part in content.parts or []
+            if part.function_response
+        }
+        pending = [name for name in PIPELINE_TOOLS if name not in called]
+        if not pending:
+            return types.Part(text="Fact-check complete.")
+
+        user_text = "\n".join(_texts(user_turns[0])) if user_turns else ""
+        if pending[0] == "claim_extraction_agent":
+            request = user_text
+        elif pending[0] == "verify_claims_agent":
+            request = "Verify all extracted claims."
+        else:
+            request = "{}"  # Content is captured into session state from the user message
+        return types.Part(function_call=types.FunctionCall(name=pending[0], args={"request": request}))
+
+    def _extract(self, request: str) -> dict:
+        seed = _digest(request)
+        count = min(MAX_CLAIMS, 1 + len(request) // CHARS_PER_CLAIM)
+        return {
+            "extracted_claims": [
+                {
+                    "claim": f"Statistic {index} in item {seed:08x} rose {(seed >> index) % 90 + 10} percent in 2024",
+                    "context": f"Paragraph {index + 1}",
+                    "category": ("health", "politics", "science", "finance")[(seed + index) % 4],
+                    "confidence_est": 70,
+                }
+                for index in range(count)
+            ],
+            "content_summary": "Benchmark content",
+            "content_type": "text",
+        }
+
+    def _verify(self, request: str) -> dict:
+        claim = request.splitlines()[0].removeprefix("Claim: ") if request else ""
+        seed = _digest(claim)
+        return {
+            "claim": claim,
+            "verification_status": VERDICTS[seed % len(VERDICTS)],
+            "confidence": seed % 101,
+            "evidence": "Canned benchmark evidence. " * 8,
+            "sources": [f"https://example.org/source/{seed % 1000}", "https://example.org/stats"],
+            "reasoning": "Scripted verdict",
+        }
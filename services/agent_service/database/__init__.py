@@ -1,6 +1,38 @@
 """Database module for Veris Agent Service"""
 
 from .client import db_client
-from .operations import save_verified_claim
+from .async_client import async_db_client
+from .operations import (
+    save_verified_claim,
+    save_verified_claims_batch,
+    asave_verified_claim,
+    asave_verified_claims_batch,
+)
+from .write_behind import claim_buffer, asave_claims
+from .queries import (
+    ClaimFilter,
+    ClaimPage,
+    list_claims,
+    alist_claims,
+    latest_claims,
+    claims_for_url,
+    claims_updated_since,
+)
 
-__all__ = ['db_client', 'save_verified_claim']
+__all__ = [
+    'db_client',
+    'async_db_client',
+    'save_verified_claim',
+    'save_verified_claims_batch',
+    'asave_verified_claim',
+    'asave_verified_claims_batch',
+    'claim_buffer',
+    'asave_claims',
+    'ClaimFilter',
+    'ClaimPage',
+    'list_claims',
+    'alist_claims',
+    'latest_claims',
+    'claims_for_url',
+    'claims_updated_since',
+]
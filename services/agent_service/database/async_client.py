@@ -0,0 +1,146 @@
+"""Async PostgreSQL database client for Neon"""
+import os
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, AsyncIterator
+from psycopg import AsyncConnection, AsyncCursor
+from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool
+from ..metrics import record_db_query
+from ..pipeline.priority import PriorityGate, effective_priority
+
+logger = logging.getLogger(__name__)
+
+POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+POOL_ACQUIRE_TIMEOUT = float(os.getenv("DB_POOL_ACQUIRE_TIMEOUT", "10"))
+
+
+class AsyncNeonDatabaseClient:
+    """Async PostgreSQL database client for Neon (psycopg3 connection pool)
+
+    Same query() contract as NeonDatabaseClient, but awaiting it yields the
+    event loop instead of blocking every other session on the instance.
+    """
+
+    def __init__(self):
+        self.pool: Optional[AsyncConnectionPool] = None
+        self.project_id = ""
+        self.database_name = ""
+        self.connected = False
+        self.min_size = POOL_MIN_SIZE
+        self.max_size = POOL_MAX_SIZE
+        self.acquire_timeout = POOL_ACQUIRE_TIMEOUT
+        self._open_lock = asyncio.Lock()
+        # Connections go to interactive work ahead of crawler/re-verification backlog
+        self.gate = PriorityGate("db", lambda: self.max_size)
+
+    def connect(
+        self,
+        project_id: str,
+        database_name: str = "neondb",
+        min_size: int = POOL_MIN_SIZE,
+        max_size: int = POOL_MAX_SIZE,
+        acquire_timeout: float = POOL_ACQUIRE_TIMEOUT,
+    ) -> None:
+        """Configure the Neon connection pool
+
+        The pool itself is opened on first use, inside the running event loop,
+        because psycopg async pools are bound to the loop that opens them.
+        """
+        if not os.getenv("DATABASE_URL"):
+            raise ValueError("DATABASE_URL environment variable is required")
+
+        self.project_id = project_id
+        self.database_name = database_name
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.connected = True
+
+    async def _get_pool(self) -> AsyncConnectionPool:
+        """Return the open pool, opening it on first call"""
+        if not self.connected:
+            raise RuntimeError("Database client not connected")
+
+        if self.pool is None:
+            async with self._open_lock:
+                if self.pool is None:
+                    pool = AsyncConnectionPool(
+                        conninfo=os.getenv("DATABASE_URL"),
+                        min_size=self.min_size,
+                        max_size=self.max_size,
+                        timeout=self.acquire_timeout,
+                        check=AsyncConnectionPool.check_connection,
+                        kwargs={"row_factory": dict_row},
+                        open=False,
+                    )
+                    await pool.open()
+                    self.pool = pool
+                    logger.info(
+                        f"✅ Async pool opened: {self.database_name} "
+                        f"(min={self.min_size}, max={self.max_size})"
+                    )
+        return self.pool
+
+    @asynccontextmanager
+    async def _connection(self) -> AsyncIterator[AsyncConnection]:
+        """Pooled connection, once the current priority class gets a slot"""
+        pool = await self._get_pool()
+        priority = effective_priority()
+        await self.gate.acquire(priority, timeout=self.acquire_timeout)
+        try:
+            async with pool.connection() as conn:
+                yield conn
+        finally:
+            await self.gate.release(priority)
+
+    async def query(self, sql: str, params: Optional[tuple] = None) -> Dict[str, Any]:
+        """Execute SQL query"""
+        started = time.monotonic()
+        try:
+            async with self._connection() as conn:
+                async with conn.cursor() as cursor:
+                    await cursor.execute(sql, params)
+
+                    if cursor.description:
+                        rows = await cursor.fetchall()
+                        return {"rows": rows, "rowcount": cursor.rowcount}
+                    return {"rowcount": cursor.rowcount}
+        except Exception as e:
+            logger.error(f"Query error: {e}")
+            return {"error": str(e)}
+        finally:
+            record_db_query("async", "query", time.monotonic() - started)
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[AsyncCursor]:
+        """Run several statements on one pooled connection in a single transaction
+
+        Commits when the block exits cleanly, rolls back and re-raises otherwise.
+        """
+        started = time.monotonic()
+        try:
+            async with self._connection() as conn:
+                async with conn.cursor() as cursor:
+                    yield cursor
+        finally:
+            record_db_query("async", "transaction", time.monotonic() - started)
+
+    def forget_pool(self) -> None:
+        """Drop a pool opened on an event loop that has finished; the next use opens a new one"""
+        self.pool = None
+        self._open_lock = asyncio.Lock()
+
+    async def disconnect(self) -> None:
+        """Close database connection pool"""
+        if self.pool:
+            await self.pool.close()
+            self.pool = None
+        self.connected = False
+        logger.info("Async database connection closed")
+
+
+async_db_client = AsyncNeonDatabaseClient()
@@ -1,10 +1,15 @@
 """PostgreSQL database client for Neon"""
 import os
 import logging
-from typing import Optional, Dict, Any
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Optional, Dict, Any, Iterator, List, Tuple
 import psycopg2
 from psycopg2.extras import RealDictCursor
 from psycopg2 import pool
+from ..metrics import record_db_query
 
 logger = logging.getLogger(__name__)
 
@@ -13,41 +18,66 @@ class NeonDatabaseClient:
     """PostgreSQL database client for Neon"""
     
     def __init__(self):
-        self.connection_pool: Optional[pool.SimpleConnectionPool] = None
+        self.connection_pool: Optional[pool.ThreadedConnectionPool] = None
         self.project_id = ""
         self.database_name = ""
         self.connected = False
+        self._open_lock = threading.Lock()
     
     def connect(self, project_id: str, database_name: str = "neondb") -> None:
-        """Connect to Neon database"""
-        self.project_id = project_id
-        self.database_name = database_name
-        
-        connection_string = os.getenv("DATABASE_URL")
+        """Configure the Neon connection pool
         
-        if not connection_string:
+        The pool (and its first connection) is opened on first use or by
+        warm_up(), so configuring the client never waits on the network. A
+        failed open is retried on the next use.
+        """
+        if not os.getenv("DATABASE_URL"):
             raise ValueError("DATABASE_URL environment variable is required")
         
+        self.project_id = project_id
+        self.database_name = database_name
+        self.connected = True
+    
+    def _get_pool(self) -> pool.ThreadedConnectionPool:
+        """Return the open pool, opening it on first call"""
+        if not self.connected:
+            raise RuntimeError("Database client not connected")
+        
+        if self.connection_pool is None:
+            with self._open_lock:
+                if self.connection_pool is None:
+                    try:
+                        self.connection_pool = pool.ThreadedConnectionPool(
+                            minconn=1,
+                            maxconn=10,
+                            dsn=os.getenv("DATABASE_URL")
+                        )
+                        logger.info(f"✅ Connected to Neon database: {self.database_name}")
+                    except Exception as e:
+                        logger.error(f"❌ Failed to connect to database: {e}")
+                        raise
+        return self.connection_pool
+    
+    def warm_up(self) -> bool:
+        """Open the pool and run one round-trip; False (and retried on next use) on failure"""
         try:
-            self.connection_pool = pool.SimpleConnectionPool(
-                minconn=1,
-                maxconn=10,
-                dsn=connection_string
-            )
-            self.connected = True
-            logger.info(f"✅ Connected to Neon database: {database_name}")
+            with self.transaction() as cursor:
+                cursor.execute("SELECT 1")
+            return True
         except Exception as e:
-            logger.error(f"❌ Failed to connect to database: {e}")
-            raise
+            logger.warning(f"⚠️ Database warm-up failed: {e}")
+            return False
     
     def query(self, sql: str, params: Optional[tuple] = None) -> Dict[str, Any]:
         """Execute SQL query"""
-        if not self.connected or not self.connection_pool:
+        if not self.connected:
             raise RuntimeError("Database client not connected")
         
         conn = None
+        started = time.monotonic()
         try:
-            conn = self.connection_pool.getconn()
+            connection_pool = self._get_pool()
+            conn = connection_pool.getconn()
             cursor = conn.cursor(cursor_factory=RealDictCursor)
             
             cursor.execute(sql, params)
@@ -71,8 +101,60 @@ class NeonDatabaseClient:
             return {"error": str(e)}
         finally:
             if conn:
-                self.connection_pool.putconn(conn)
+                connection_pool.putconn(conn)
+            record_db_query("sync", "query", time.monotonic() - started)
+    
+    @contextmanager
+    def transaction(self) -> Iterator[RealDictCursor]:
+        """Run several statements on one pooled connection in a single transaction
+        
+        Commits when the block exits cleanly, rolls back and re-raises otherwise.
+        """
+        connection_pool = self._get_pool()
+        started = time.monotonic()
+        conn = connection_pool.getconn()
+        try:
+            with conn.cursor(cursor_factory=RealDictCursor) as cursor:
+                yield cursor
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            connection_pool.putconn(conn)
+            record_db_query("sync", "transaction", time.monotonic() - started)
     
+    def stream(
+        self, sql: str, params: Optional[tuple] = None, fetch_size: int = 5000
+    ) -> Iterator[Tuple[List[str], List[tuple]]]:
+        """Yield (column names, rows) chunks from a server-side cursor
+
+        Only fetch_size rows are held in memory at a time; rows are plain
+        tuples. The connection stays checked out until the generator is
+        exhausted or closed.
+        """
+        connection_pool = self._get_pool()
+        started = time.monotonic()
+        conn = connection_pool.getconn()
+        try:
+            with conn.cursor(name=f"veris_stream_{uuid.uuid4().hex}") as cursor:
+                cursor.itersize = fetch_size
+                cursor.execute(sql, params)
+                columns = None
+                while True:
+                    rows = cursor.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    columns = columns or [column[0] for column in cursor.description]
+                    yield columns, rows
+            conn.commit()
+        except BaseException:  # Includes GeneratorExit when the consumer stops early
+            conn.rollback()
+            raise
+        finally:
+            connection_pool.putconn(conn)
+            record_db_query("sync", "stream", time.monotonic() - started)
+
     def disconnect(self) -> None:
         """Close database connection pool"""
         if self.connection_pool:
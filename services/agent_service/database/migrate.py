@@ -0,0 +1,49 @@
+"""Apply SQL migrations from database/migrations in filename order
+
+Usage: python -m agent_service.database.migrate
+"""
+import logging
+import os
+from pathlib import Path
+from typing import List
+from .client import db_client, NeonDatabaseClient
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).parent / "migrations"
+
+
+def apply_migrations(client: NeonDatabaseClient = db_client) -> List[str]:
+    """Apply pending migrations, each in its own transaction
+
+    Returns:
+        list: Names of migrations applied by this call
+    """
+    with client.transaction() as cursor:
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            "name TEXT PRIMARY KEY, applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+        )
+        cursor.execute("SELECT name FROM schema_migrations")
+        applied = {row["name"] for row in cursor.fetchall()}
+
+    newly_applied = []
+    for path in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        if path.name in applied:
+            continue
+        with client.transaction() as cursor:
+            cursor.execute(path.read_text())
+            cursor.execute("INSERT INTO schema_migrations (name) VALUES (%s)", (path.name,))
+        logger.info(f"✅ Applied migration: {path.name}")
+        newly_applied.append(path.name)
+    return newly_applied
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    db_client.connect(os.getenv("NEON_PROJECT_ID", ""), os.getenv("NEON_DATABASE_NAME", "neondb"))
+    try:
+        applied = apply_migrations()
+        logger.info(f"Migrations applied: {len(applied)}")
+    finally:
+        db_client.disconnect()
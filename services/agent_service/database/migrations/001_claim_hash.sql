@@ -0,0 +1,10 @@
+-- Normalized claim hash for verdict reuse across URLs.
+-- Normalization must match operations.normalize_claim_text.
+ALTER TABLE crawled_content ADD COLUMN IF NOT EXISTS claim_hash TEXT;
+
+UPDATE crawled_content
+SET claim_hash = md5(btrim(regexp_replace(lower(claim), '[^a-z0-9]+', ' ', 'g')))
+WHERE claim IS NOT NULL AND claim_hash IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_crawled_content_claim_hash
+    ON crawled_content (claim_hash, updated_at DESC);
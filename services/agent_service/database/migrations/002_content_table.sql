@@ -0,0 +1,48 @@
+-- Store article content once; claim rows reference it by content_hash.
+-- Hashing must match operations.content_hash: md5(source|url), plus media
+-- URLs and an md5 of the text for user uploads (which all share one url).
+CREATE TABLE IF NOT EXISTS content (
+    content_hash TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    url TEXT NOT NULL,
+    content_type TEXT,
+    raw_text TEXT,
+    images JSONB,
+    videos JSONB,
+    metadata JSONB,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+ALTER TABLE crawled_content ADD COLUMN IF NOT EXISTS content_hash TEXT;
+
+UPDATE crawled_content
+SET content_hash = CASE
+    WHEN url = 'user_upload' THEN md5(concat_ws('|',
+        source, url,
+        COALESCE(images::text, '[]'), COALESCE(videos::text, '[]'),
+        md5(COALESCE(raw_text, ''))))
+    ELSE md5(source || '|' || url)
+END
+WHERE content_hash IS NULL;
+
+-- One content row per hash, preferring the newest row that carries text
+INSERT INTO content (content_hash, source, url, content_type, raw_text, images, videos, metadata, created_at, updated_at)
+SELECT DISTINCT ON (content_hash)
+    content_hash, source, url, content_type, raw_text, images, videos, metadata, created_at, updated_at
+FROM crawled_content
+WHERE content_hash IS NOT NULL
+ORDER BY content_hash, (raw_text IS NULL), updated_at DESC
+ON CONFLICT (content_hash) DO NOTHING;
+
+-- Drop the per-claim copies; columns stay (nullable) for older readers
+UPDATE crawled_content
+SET raw_text = NULL, images = NULL, videos = NULL, metadata = NULL
+WHERE content_hash IS NOT NULL
+  AND (raw_text IS NOT NULL OR images IS NOT NULL OR videos IS NOT NULL OR metadata IS NOT NULL);
+
+ALTER TABLE crawled_content
+    ADD CONSTRAINT fk_crawled_content_content
+    FOREIGN KEY (content_hash) REFERENCES content (content_hash);
+
+CREATE INDEX IF NOT EXISTS idx_crawled_content_content_hash ON crawled_content (content_hash);
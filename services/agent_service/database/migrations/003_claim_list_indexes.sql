@@ -0,0 +1,24 @@
+-- Keyset pagination for database/queries.py: ORDER BY (updated_at, id) with
+-- equality filters in front. Partial on claim IS NOT NULL like every list query.
+-- "Claims for a URL" is served by the (url, claim) unique index.
+UPDATE crawled_content
+SET updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)
+WHERE updated_at IS NULL;
+
+ALTER TABLE crawled_content ALTER COLUMN updated_at SET NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_crawled_content_updated
+    ON crawled_content (updated_at, id)
+    WHERE claim IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_crawled_content_status_updated
+    ON crawled_content (verification_status, updated_at, id)
+    WHERE claim IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_crawled_content_category_updated
+    ON crawled_content (category, updated_at, id)
+    WHERE claim IS NOT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_crawled_content_category_status_updated
+    ON crawled_content (category, verification_status, updated_at, id)
+    WHERE claim IS NOT NULL;
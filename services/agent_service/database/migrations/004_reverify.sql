@@ -0,0 +1,24 @@
+-- Re-verification job (agent_service/reverify.py).
+-- rechecked_at is set whenever the job re-verifies a row, including when the
+-- verdict did not change (updated_at only moves with the verdict). Candidates
+-- are selected by status and GREATEST(updated_at, rechecked_at) age, oldest
+-- first; GREATEST ignores the NULLs of never-rechecked rows.
+ALTER TABLE crawled_content ADD COLUMN IF NOT EXISTS rechecked_at TIMESTAMP;
+
+CREATE INDEX IF NOT EXISTS idx_crawled_content_status_checked
+    ON crawled_content (verification_status, (GREATEST(updated_at, rechecked_at)), id)
+    WHERE claim IS NOT NULL;
+
+-- One row per job run: how much was looked at and how many verdicts moved
+CREATE TABLE IF NOT EXISTS reverify_runs (
+    id SERIAL PRIMARY KEY,
+    started_at TIMESTAMP NOT NULL,
+    finished_at TIMESTAMP NOT NULL,
+    candidates INTEGER NOT NULL,
+    verified INTEGER NOT NULL,
+    moved INTEGER NOT NULL,
+    failed INTEGER NOT NULL,
+    deferred INTEGER NOT NULL,
+    model_calls INTEGER NOT NULL,
+    transitions JSONB
+);
@@ -0,0 +1,22 @@
+-- Separate when a verdict was reached (verified_at) from when the row was
+-- last written (updated_at). Reused cached verdicts keep their original
+-- verified_at, while updated_at is always the database's now() at write time,
+-- so (updated_at, id) cursors never see rows appear behind them.
+ALTER TABLE crawled_content ADD COLUMN IF NOT EXISTS verified_at TIMESTAMP;
+
+UPDATE crawled_content SET verified_at = updated_at WHERE verified_at IS NULL;
+
+ALTER TABLE crawled_content ALTER COLUMN verified_at SET DEFAULT CURRENT_TIMESTAMP;
+ALTER TABLE crawled_content ALTER COLUMN verified_at SET NOT NULL;
+ALTER TABLE crawled_content ALTER COLUMN updated_at SET DEFAULT CURRENT_TIMESTAMP;
+
+-- Verdict cache lookups: newest verdict per claim hash
+DROP INDEX IF EXISTS idx_crawled_content_claim_hash;
+CREATE INDEX IF NOT EXISTS idx_crawled_content_claim_hash
+    ON crawled_content (claim_hash, verified_at DESC);
+
+-- Re-verification candidates age by verification, not by write time
+DROP INDEX IF EXISTS idx_crawled_content_status_checked;
+CREATE INDEX IF NOT EXISTS idx_crawled_content_status_checked
+    ON crawled_content (verification_status, (GREATEST(verified_at, rechecked_at)), id)
+    WHERE claim IS NOT NULL;
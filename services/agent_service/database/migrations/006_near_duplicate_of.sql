@@ -0,0 +1,5 @@
+-- Audit trail for verdicts reused from a near-duplicate claim
+-- (pipeline/claim_index.py): the claim_hash whose verdict was reused and the
+-- estimated similarity. NULL when the claim was verified (or matched) itself.
+ALTER TABLE crawled_content ADD COLUMN IF NOT EXISTS near_duplicate_of TEXT;
+ALTER TABLE crawled_content ADD COLUMN IF NOT EXISTS near_duplicate_similarity REAL;
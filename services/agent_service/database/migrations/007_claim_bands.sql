@@ -0,0 +1,16 @@
+-- Persistent near-duplicate index (pipeline/claim_index.py). One MinHash
+-- signature per claim hash, and one (band, bucket) row per LSH band, so a
+-- lookup is a primary-key probe per band however many claims are stored.
+-- Existing claims are signed by `python -m agent_service.pipeline.claim_index`.
+CREATE TABLE IF NOT EXISTS claim_signatures (
+    claim_hash TEXT PRIMARY KEY,
+    signature BYTEA NOT NULL,
+    numbers_key BIGINT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS claim_bands (
+    band SMALLINT NOT NULL,
+    bucket BIGINT NOT NULL,
+    claim_hash TEXT NOT NULL,
+    PRIMARY KEY (band, bucket, claim_hash)
+);
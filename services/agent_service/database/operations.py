@@ -1,17 +1,317 @@
 """Database operations for saving verified claims"""
+import csv
+import io
 import json
 import hashlib
 import logging
+import os
+import re
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
 from .client import db_client
+from .async_client import async_db_client
 
 logger = logging.getLogger(__name__)
 
+# Batches at or above this size go through COPY into a staging table
+COPY_THRESHOLD = int(os.getenv("CLAIM_BATCH_COPY_THRESHOLD", "500"))
 
-def escape_sql(value: str) -> str:
-    """Escape single quotes for SQL"""
-    return value.replace("'", "''") if value else ""
+# Claim rows carry content_hash; text/media/metadata live once per article in `content`
+CLAIM_COLUMNS = (
+    "id", "source", "url", "content_type", "claim", "category",
+    "verification_status", "confidence", "evidence", "verification_sources",
+    "media_references", "created_at", "verified_at", "claim_hash", "content_hash",
+    "near_duplicate_of", "near_duplicate_similarity",
+)  # updated_at is left to the database (see UPSERT_CONFLICT_SQL)
+CONTENT_COLUMNS = (
+    "content_hash", "source", "url", "content_type", "raw_text",
+    "images", "videos", "metadata", "created_at", "updated_at",
+)
+JSONB_COLUMNS = {"verification_sources", "media_references", "images", "videos", "metadata"}
+REQUIRED_CLAIM_FIELDS = ("source", "url", "content_type", "claim", "verification_status")
+# Content rows per INSERT statement (10 parameters each, far below the 65535 limit)
+CONTENT_BATCH_SIZE = 1000
+
+UPSERT_CONFLICT_SQL = """
+    ON CONFLICT (url, claim) DO UPDATE SET
+        verification_status = EXCLUDED.verification_status,
+        confidence = EXCLUDED.confidence,
+        evidence = EXCLUDED.evidence,
+        verification_sources = EXCLUDED.verification_sources,
+        media_references = EXCLUDED.media_references,
+        verified_at = EXCLUDED.verified_at,
+        updated_at = now(),
+        claim_hash = EXCLUDED.claim_hash,
+        content_hash = EXCLUDED.content_hash,
+        near_duplicate_of = EXCLUDED.near_duplicate_of,
+        near_duplicate_similarity = EXCLUDED.near_duplicate_similarity
+    RETURNING id, url, claim
+"""
+
+CONTENT_CONFLICT_SQL = """
+    ON CONFLICT (content_hash) DO UPDATE SET
+        content_type = EXCLUDED.content_type,
+        raw_text = COALESCE(EXCLUDED.raw_text, content.raw_text),
+        images = COALESCE(EXCLUDED.images, content.images),
+        videos = COALESCE(EXCLUDED.videos, content.videos),
+        metadata = COALESCE(EXCLUDED.metadata, content.metadata),
+        updated_at = EXCLUDED.updated_at
+"""
+
+CREATE_STAGING_SQL = (
+    "CREATE TEMP TABLE crawled_content_staging "
+    "(LIKE crawled_content INCLUDING DEFAULTS) ON COMMIT DROP"
+)
+MERGE_STAGING_SQL = (
+    f"INSERT INTO crawled_content ({', '.join(CLAIM_COLUMNS)}) "
+    f"SELECT {', '.join(CLAIM_COLUMNS)} FROM crawled_content_staging"
+    f"{UPSERT_CONFLICT_SQL}"
+)
+
+
+def generate_claim_id(url: str, claim: str) -> str:
+    """Deterministic claim ID from source URL and claim text"""
+    return hashlib.md5(f"{url}_{claim}".encode()).hexdigest()[:32]
+
+
+def normalize_claim_text(claim: str) -> str:
+    """Lowercase, collapse punctuation/whitespace (mirrored in migration 001 SQL)"""
+    return re.sub(r"[^a-z0-9]+", " ", claim.lower()).strip()
+
+
+def claim_hash(claim: str) -> str:
+    """Hash of normalized claim text, shared by every URL that repeats the claim"""
+    return hashlib.md5(normalize_claim_text(claim).encode()).hexdigest()
+
+
+def _jsonb_text(values: Optional[List[str]]) -> str:
+    """A JSON list rendered the way Postgres prints jsonb (non-ASCII kept as is)"""
+    return json.dumps(values or [], ensure_ascii=False, separators=(", ", ": "))
+
+
+def content_hash(
+    source: str, url: str, images: Optional[List[str]] = None,
+    videos: Optional[List[str]] = None, raw_text: Optional[str] = None,
+) -> str:
+    """Key of the content row an article's claims share (mirrored in migration 002 SQL)
+
+    Crawled content is keyed by source and URL. User uploads all share the
+    "user_upload" URL, so their media URLs and text are part of the key.
+    """
+    if url != "user_upload":
+        return hashlib.md5(f"{source}|{url}".encode()).hexdigest()
+    text_hash = hashlib.md5((raw_text or "").encode()).hexdigest()
+    key = "|".join([source, url, _jsonb_text(images), _jsonb_text(videos), text_hash])
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def _as_datetime(value: Any) -> Optional[datetime]:
+    """Accept datetimes or ISO strings (values that passed through session state)"""
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _content_row(claim: Dict[str, Any], now: datetime) -> tuple:
+    """CONTENT_COLUMNS row for the article a claim dict belongs to"""
+    return (
+        content_hash(claim["source"], claim["url"], claim.get("images"), claim.get("videos"), claim.get("raw_text")),
+        claim["source"],
+        claim["url"],
+        claim["content_type"],
+        claim.get("raw_text") or None,
+        json.dumps(claim.get("images") or []),
+        json.dumps(claim.get("videos") or []),
+        json.dumps(claim.get("metadata") or {}),
+        now,
+        now,
+    )
+
+
+def _claim_row(claim: Dict[str, Any], now: datetime, content_key: str) -> tuple:
+    """Map a claim dict (save_verified_claim keyword arguments) to a CLAIM_COLUMNS row"""
+    return (
+        generate_claim_id(claim["url"], claim["claim"]),
+        claim["source"],
+        claim["url"],
+        claim["content_type"],
+        claim["claim"],
+        claim.get("category") or "general",
+        claim["verification_status"],
+        int(claim.get("confidence") or 0),
+        claim.get("evidence") or "",
+        json.dumps(claim.get("sources") or []),
+        json.dumps(claim.get("media_references") or []),
+        now,
+        _as_datetime(claim.get("verified_at")) or now,
+        claim_hash(claim["claim"]),
+        content_key,
+        claim.get("near_duplicate_of"),
+        claim.get("similarity") if claim.get("near_duplicate_of") else None,
+    )
+
+
+def _values_upsert_sql(row_count: int, table: str = "crawled_content") -> str:
+    """Parameterized multi-row INSERT ... ON CONFLICT for row_count rows of table"""
+    columns, conflict_sql = (
+        (CONTENT_COLUMNS, CONTENT_CONFLICT_SQL) if table == "content"
+        else (CLAIM_COLUMNS, UPSERT_CONFLICT_SQL)
+    )
+    placeholder = "(" + ", ".join(
+        "%s::jsonb" if column in JSONB_COLUMNS else "%s" for column in columns
+    ) + ")"
+    return (
+        f"INSERT INTO {table} ({', '.join(columns)}) "
+        f"VALUES {', '.join([placeholder] * row_count)}"
+        f"{conflict_sql}"
+    )
+
+
+def _content_statements(contents: List[tuple]) -> List[Tuple[str, list]]:
+    """(sql, params) upserts writing each content row once, in CONTENT_BATCH_SIZE chunks"""
+    statements = []
+    for start in range(0, len(contents), CONTENT_BATCH_SIZE):
+        chunk = contents[start:start + CONTENT_BATCH_SIZE]
+        statements.append((
+            _values_upsert_sql(len(chunk), "content"),
+            [value for row in chunk for value in row],
+        ))
+    return statements
+
+
+def _copy_merge_rows(cursor, rows: List[tuple]) -> List[Dict[str, Any]]:
+    """COPY rows into a transaction-scoped staging table, then merge into crawled_content"""
+    cursor.execute(CREATE_STAGING_SQL)
+
+    buffer = io.StringIO()
+    csv.writer(buffer, quoting=csv.QUOTE_ALL).writerows(rows)
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY crawled_content_staging ({', '.join(CLAIM_COLUMNS)}) FROM STDIN "
+        "WITH (FORMAT csv, FORCE_NULL (near_duplicate_of, near_duplicate_similarity))",
+        buffer,
+    )
+
+    cursor.execute(MERGE_STAGING_SQL)
+    return cursor.fetchall()
+
+
+async def _acopy_merge_rows(cursor, rows: List[tuple]) -> List[Dict[str, Any]]:
+    """Async (psycopg3) variant of _copy_merge_rows"""
+    await cursor.execute(CREATE_STAGING_SQL)
+
+    async with cursor.copy(
+        f"COPY crawled_content_staging ({', '.join(CLAIM_COLUMNS)}) FROM STDIN"
+    ) as copy:
+        for row in rows:
+            await copy.write_row(row)
+
+    await cursor.execute(MERGE_STAGING_SQL)
+    return await cursor.fetchall()
+
+
+def _prepare_batch(claims: List[Dict[str, Any]]) -> Tuple[
+    List[Optional[Dict[str, Any]]], Dict[Tuple[str, str], tuple], Dict[Tuple[str, str], List[int]], List[tuple]
+]:
+    """Validate claims into claim rows and content rows.
+
+    Claim rows are deduplicated on (url, claim) with the last occurrence
+    winning, content rows on content_hash: ON CONFLICT cannot touch the same
+    row twice in one statement, and each article is written once per batch.
+    """
+    now = datetime.utcnow()
+    results: List[Optional[Dict[str, Any]]] = [None] * len(claims)
+    rows: Dict[Tuple[str, str], tuple] = {}
+    positions: Dict[Tuple[str, str], List[int]] = {}
+    contents: Dict[str, tuple] = {}
+
+    for index, claim in enumerate(claims):
+        try:
+            for field in REQUIRED_CLAIM_FIELDS:
+                if not claim.get(field):
+                    raise ValueError(f"missing {field}")
+            content_row = _content_row(claim, now)
+            row = _claim_row(claim, now, content_row[0])
+        except (TypeError, ValueError, AttributeError) as e:
+            results[index] = {"success": False, "claim_id": None, "error": f"Invalid claim: {e}"}
+            continue
+        contents[content_row[0]] = content_row
+        key = (row[2], row[4])
+        rows[key] = row
+        positions.setdefault(key, []).append(index)
+
+    return results, rows, positions, list(contents.values())
+
+
+def _finish_batch(
+    results: List[Optional[Dict[str, Any]]],
+    positions: Dict[Tuple[str, str], List[int]],
+    saved: List[Dict[str, Any]],
+    error: Optional[str],
+) -> Dict[str, Any]:
+    """Fill per-claim results from the RETURNING rows of the upsert"""
+    saved_ids = {(row["url"], row["claim"]): row["id"] for row in saved}
+
+    for key, indices in positions.items():
+        claim_id = saved_ids.get(key)
+        for index in indices:
+            results[index] = {
+                "success": claim_id is not None,
+                "claim_id": claim_id or generate_claim_id(*key),
+                "error": None if claim_id else (error or "Row not written"),
+            }
+
+    saved_count = sum(1 for result in results if result["success"])
+    return {
+        "success": saved_count == len(results),
+        "message": f"Saved {saved_count}/{len(results)} claims" + (f": {error}" if error else ""),
+        "saved": saved_count,
+        "results": results,
+    }
+
+
+def save_verified_claims_batch(claims: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Save many verified claims in a single transaction (one round-trip per batch)
+
+    Args:
+        claims: Claim dicts keyed like save_verified_claim's arguments
+
+    Returns:
+        dict: Overall success, saved count and per-claim results in input order,
+            each with success, claim_id and error
+
+    Note:
+        - Each article's text/media/metadata is upserted once into `content`,
+          in the same transaction; claim rows only reference it by content_hash
+        - Small batches use one parameterized multi-row INSERT ... ON CONFLICT
+        - Batches of CLAIM_BATCH_COPY_THRESHOLD rows or more are COPY-ed into a
+          staging table and merged, which suits large backfills
+        - Invalid claims are reported per row and do not abort the batch
+        - verified_at (optional) is stored as is, so re-saving a cached verdict
+          does not make it look freshly verified; updated_at is always the
+          database's now(), so rows never land behind an (updated_at, id) cursor
+    """
+    results, rows, positions, contents = _prepare_batch(claims)
+    saved: List[Dict[str, Any]] = []
+    error = None
+
+    if rows:
+        try:
+            with db_client.transaction() as cursor:
+                for sql, params in _content_statements(contents):
+                    cursor.execute(sql, params)
+                if len(rows) >= COPY_THRESHOLD:
+                    saved = _copy_merge_rows(cursor, list(rows.values()))
+                else:
+                    params = [value for row in rows.values() for value in row]
+                    cursor.execute(_values_upsert_sql(len(rows)), params)
+                    saved = cursor.fetchall()
+        except Exception as e:
+            logger.error(f"Batch save failed ({len(rows)} claims): {e}")
+            error = str(e)
+
+    batch_result = _finish_batch(results, positions, saved, error)
+    logger.info(f"💾 {batch_result['message']}")
+    return batch_result
 
 
 def save_verified_claim(
@@ -32,7 +332,7 @@ def save_verified_claim(
 ) -> Dict[str, Any]:
     """
     Save verified claim to database with full context
-    
+
     Args:
         source: Original content source name (e.g., "BBC News", "User Upload")
         url: Original source URL (article link, social media URL, or "user_upload" for uploaded files)
@@ -48,82 +348,77 @@ def save_verified_claim(
         images: Image URL list (GCS URLs for uploaded images, or original URLs)
         videos: Video URL list (GCS URLs for uploaded videos, or original URLs)
         metadata: Original content metadata (title, author, date, etc.)
-        
+
     Returns:
         dict: Success status and message
-        
+
     Note:
         - url: Source/origin of content (article link or "user_upload")
         - images/videos: Actual media URLs (GCS URLs for uploaded, original URLs for linked)
     """
-    try:
-        claim_id = hashlib.md5(f"{url}_{claim}".encode()).hexdigest()[:32]
-        
-        # Prepare JSON fields
-        sources_json = json.dumps(sources) if sources else '[]'
-        media_json = json.dumps(media_references) if media_references else '[]'
-        images_json = json.dumps(images) if images else '[]'
-        videos_json = json.dumps(videos) if videos else '[]'
-        metadata_json = json.dumps(metadata) if metadata else '{}'
-        
-        # Build SQL with all fields
-        sql = f"""
-            INSERT INTO crawled_content (
-                id, source, url, content_type, claim, category,
-                verification_status, confidence, evidence, verification_sources,
-                media_references, raw_text, images, videos, metadata,
-                created_at, updated_at
-            ) VALUES (
-                '{escape_sql(claim_id)}',
-                '{escape_sql(source)}',
-                '{escape_sql(url)}',
-                '{escape_sql(content_type)}',
-                '{escape_sql(claim)}',
-                '{escape_sql(category)}',
-                '{escape_sql(verification_status)}',
-                {confidence},
-                '{escape_sql(evidence)}',
-                '{sources_json}'::jsonb,
-                '{media_json}'::jsonb,
-                {f"'{escape_sql(raw_text)}'" if raw_text else 'NULL'},
-                '{images_json}'::jsonb,
-                '{videos_json}'::jsonb,
-                '{metadata_json}'::jsonb,
-                '{datetime.utcnow().isoformat()}',
-                '{datetime.utcnow().isoformat()}'
-            )
-            ON CONFLICT (url, claim) DO UPDATE SET
-                verification_status = EXCLUDED.verification_status,
-                confidence = EXCLUDED.confidence,
-                evidence = EXCLUDED.evidence,
-                verification_sources = EXCLUDED.verification_sources,
-                media_references = EXCLUDED.media_references,
-                raw_text = COALESCE(EXCLUDED.raw_text, crawled_content.raw_text),
-                images = COALESCE(EXCLUDED.images, crawled_content.images),
-                videos = COALESCE(EXCLUDED.videos, crawled_content.videos),
-                metadata = COALESCE(EXCLUDED.metadata, crawled_content.metadata),
-                updated_at = EXCLUDED.updated_at
-        """
-        
-        result = db_client.query(sql)
-        
-        if "error" in result:
-            logger.error(f"Database error: {result['error']}")
-            return {
-                "success": False,
-                "message": f"Failed to save: {result['error']}"
-            }
-        
-        logger.info(f"✅ Saved claim: {claim[:50]}...")
-        return {
-            "success": True,
-            "message": "Claim saved successfully",
-            "claim_id": claim_id
-        }
-        
-    except Exception as e:
-        logger.error(f"Error saving claim: {e}")
+    return _single_claim_result(save_verified_claims_batch([{
+        "source": source,
+        "url": url,
+        "content_type": content_type,
+        "claim": claim,
+        "category": category,
+        "verification_status": verification_status,
+        "confidence": confidence,
+        "evidence": evidence,
+        "sources": sources,
+        "media_references": media_references,
+        "raw_text": raw_text,
+        "images": images,
+        "videos": videos,
+        "metadata": metadata,
+    }]), claim)
+
+
+async def asave_verified_claims_batch(claims: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Async variant of save_verified_claims_batch using the async pool"""
+    results, rows, positions, contents = _prepare_batch(claims)
+    saved: List[Dict[str, Any]] = []
+    error = None
+
+    if rows:
+        try:
+            async with async_db_client.transaction() as cursor:
+                for sql, params in _content_statements(contents):
+                    await cursor.execute(sql, params)
+                if len(rows) >= COPY_THRESHOLD:
+                    saved = await _acopy_merge_rows(cursor, list(rows.values()))
+                else:
+                    params = [value for row in rows.values() for value in row]
+                    await cursor.execute(_values_upsert_sql(len(rows)), params)
+                    saved = await cursor.fetchall()
+        except Exception as e:
+            logger.error(f"Batch save failed ({len(rows)} claims): {e}")
+            error = str(e)
+
+    batch_result = _finish_batch(results, positions, saved, error)
+    logger.info(f"💾 {batch_result['message']}")
+    return batch_result
+
+
+async def asave_verified_claim(**claim: Any) -> Dict[str, Any]:
+    """Async variant of save_verified_claim, taking the same keyword arguments"""
+    return _single_claim_result(await asave_verified_claims_batch([claim]), claim.get("claim", ""))
+
+
+def _single_claim_result(batch_result: Dict[str, Any], claim: str) -> Dict[str, Any]:
+    """Collapse a one-claim batch result into the save_verified_claim contract"""
+    result = batch_result["results"][0]
+
+    if not result["success"]:
+        logger.error(f"Database error: {result['error']}")
         return {
             "success": False,
-            "message": f"Exception: {str(e)}"
+            "message": f"Failed to save: {result['error']}"
         }
+
+    logger.info(f"✅ Saved claim: {claim[:50]}...")
+    return {
+        "success": True,
+        "message": "Claim saved successfully",
+        "claim_id": result["claim_id"]
+    }
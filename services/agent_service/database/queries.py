@@ -0,0 +1,220 @@
+"""Read-path queries over crawled_content
+
+Pages are keyset-paginated on (updated_at, id): the cursor carries the last
+row's sort key, so page N costs the same as page 1 (no OFFSET scan). Filters
+map onto the partial indexes of migration 003. Results of identical queries
+are served from a short-TTL in-process cache for hot dashboard queries.
+"""
+import base64
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from .client import db_client
+from .async_client import async_db_client
+
+logger = logging.getLogger(__name__)
+
+QUERY_CACHE_TTL_SECONDS = float(os.getenv("QUERY_CACHE_TTL_SECONDS", "10"))
+QUERY_CACHE_SIZE = int(os.getenv("QUERY_CACHE_SIZE", "256"))
+MAX_PAGE_SIZE = 500
+
+# Listing columns; article text stays in `content`
+CLAIM_LIST_COLUMNS = (
+    "id", "source", "url", "content_type", "claim", "category",
+    "verification_status", "confidence", "evidence", "verification_sources",
+    "media_references", "content_hash", "created_at", "updated_at",
+)
+
+
+@dataclass(frozen=True)
+class ClaimFilter:
+    """Filters for list_claims (None means unfiltered)
+
+    ascending pages oldest-first, which suits "updated since T" syncs;
+    the default is newest-first.
+    """
+    category: Optional[str] = None
+    verification_status: Optional[str] = None
+    min_confidence: Optional[float] = None
+    max_confidence: Optional[float] = None
+    url: Optional[str] = None
+    updated_since: Optional[datetime] = None
+    ascending: bool = False
+
+
+@dataclass
+class ClaimPage:
+    claims: List[Dict[str, Any]] = field(default_factory=list)
+    next_cursor: Optional[str] = None  # None on the last page
+
+
+def encode_cursor(row: Dict[str, Any]) -> str:
+    """Opaque cursor for the page after row"""
+    key = json.dumps([row["updated_at"].isoformat(), row["id"]])
+    return base64.urlsafe_b64encode(key.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """(updated_at, id) from encode_cursor output; ValueError if malformed"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        updated_at, claim_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(updated_at), str(claim_id)
+    except (TypeError, ValueError) as e:
+        raise ValueError(f"Invalid page cursor: {cursor!r}") from e
+
+
+def build_list_query(
+    claim_filter: ClaimFilter, cursor: Optional[str] = None, limit: int = 50
+) -> Tuple[str, tuple]:
+    """SQL and params for one page (fetches limit + 1 rows to detect a next page)"""
+    conditions = ["claim IS NOT NULL"]  # Matches the partial indexes
+    params: List[Any] = []
+    for column, operator, value in (
+        ("category", "=", claim_filter.category),
+        ("verification_status", "=", claim_filter.verification_status),
+        ("confidence", ">=", claim_filter.min_confidence),
+        ("confidence", "<=", claim_filter.max_confidence),
+        ("url", "=", claim_filter.url),
+        ("updated_at", ">", claim_filter.updated_since),
+    ):
+        if value is not None:
+            conditions.append(f"{column} {operator} %s")
+            params.append(value)
+
+    direction = "ASC" if claim_filter.ascending else "DESC"
+    if cursor:
+        conditions.append(f"(updated_at, id) {'>' if claim_filter.ascending else '<'} (%s, %s)")
+        params.extend(decode_cursor(cursor))
+
+    sql = (
+        f"SELECT {', '.join(CLAIM_LIST_COLUMNS)} FROM crawled_content "
+        f"WHERE {' AND '.join(conditions)} "
+        f"ORDER BY updated_at {direction}, id {direction} "
+        f"LIMIT %s"
+    )
+    params.append(max(1, min(limit, MAX_PAGE_SIZE)) + 1)
+    return sql, tuple(params)
+
+
+def _to_page(result: Dict[str, Any], limit: int) -> ClaimPage:
+    if "error" in result:
+        raise RuntimeError(f"Claim query failed: {result['error']}")
+    rows = result.get("rows", [])
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return ClaimPage(claims=rows, next_cursor=encode_cursor(rows[-1]))
+    return ClaimPage(claims=rows)
+
+
+def _copy_page(page: ClaimPage) -> ClaimPage:
+    """Copy of page whose rows (and their JSONB values) are not shared"""
+    return ClaimPage(claims=copy.deepcopy(page.claims), next_cursor=page.next_cursor)
+
+
+class QueryCache:
+    """Short-TTL LRU of query results keyed on (sql, params)
+
+    Pages are copied in and out, so callers may modify the rows they get.
+    """
+
+    def __init__(self, ttl: float = QUERY_CACHE_TTL_SECONDS, max_entries: int = QUERY_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, tuple], Tuple[float, ClaimPage]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, tuple]) -> Optional[ClaimPage]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return _copy_page(entry[1])
+            if entry:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Tuple[str, tuple], page: ClaimPage) -> None:
+        if self.ttl <= 0:
+            return
+        page = _copy_page(page)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, page)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop cached pages and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+query_cache = QueryCache()
+
+
+def list_claims(
+    claim_filter: ClaimFilter = ClaimFilter(), cursor: Optional[str] = None, limit: int = 50
+) -> ClaimPage:
+    """One page of claims matching claim_filter
+
+    Args:
+        claim_filter: Filters and sort direction
+        cursor: next_cursor of the previous page (None for the first page)
+        limit: Page size (capped at MAX_PAGE_SIZE)
+
+    Returns:
+        ClaimPage: Rows plus the cursor for the next page
+    """
+    key = build_list_query(claim_filter, cursor, limit)
+    page = query_cache.get(key)
+    if page is None:
+        page = _to_page(db_client.query(*key), limit)
+        query_cache.put(key, page)
+    return page
+
+
+async def alist_claims(
+    claim_filter: ClaimFilter = ClaimFilter(), cursor: Optional[str] = None, limit: int = 50
+) -> ClaimPage:
+    """Async list_claims over the pooled async client"""
+    key = build_list_query(claim_filter, cursor, limit)
+    page = query_cache.get(key)
+    if page is None:
+        page = _to_page(await async_db_client.query(*key), limit)
+        query_cache.put(key, page)
+    return page
+
+
+def latest_claims(
+    category: Optional[str] = None, verification_status: Optional[str] = None,
+    cursor: Optional[str] = None, limit: int = 50,
+) -> ClaimPage:
+    """Newest claims, e.g. latest_claims("health", "false")"""
+    return list_claims(ClaimFilter(category=category, verification_status=verification_status), cursor, limit)
+
+
+def claims_for_url(url: str, cursor: Optional[str] = None, limit: int = 50) -> ClaimPage:
+    """All verdicts for one article URL, newest first"""
+    return list_claims(ClaimFilter(url=url), cursor, limit)
+
+
+def claims_updated_since(since: datetime, cursor: Optional[str] = None, limit: int = 500) -> ClaimPage:
+    """Claims updated after since, oldest first (resume from next_cursor)"""
+    return list_claims(ClaimFilter(updated_since=since, ascending=True), cursor, limit)
@@ -0,0 +1,378 @@
+"""Write-behind buffer for verified claims, journaled to local SQLite
+
+submit() appends claim records to an fsynced SQLite journal and returns
+immediately; a background task flushes the journal to Postgres in batches
+(when WRITE_BEHIND_BATCH_SIZE records are pending or every
+WRITE_BEHIND_FLUSH_SECONDS) and deletes what was written. A DB outage only
+delays the flush (with exponential backoff), and records left in the journal
+by a crash are replayed on the next start. Submitters wait while
+WRITE_BEHIND_MAX_PENDING records are pending (backpressure).
+
+A record that keeps failing while the database is up is retried on its own and,
+after WRITE_BEHIND_MAX_ATTEMPTS, moved to the journal's dead_letter table so it
+cannot hold back the records behind it. The journal must be on durable storage;
+without WRITE_BEHIND_JOURNAL claims are saved synchronously.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from ..metrics import metrics
+from .async_client import async_db_client
+from .operations import REQUIRED_CLAIM_FIELDS, asave_verified_claims_batch, generate_claim_id
+
+logger = logging.getLogger(__name__)
+
+WRITE_BEHIND_ENABLED = os.getenv("WRITE_BEHIND_ENABLED", "true").lower() == "true"
+WRITE_BEHIND_JOURNAL = os.getenv("WRITE_BEHIND_JOURNAL") or None
+WRITE_BEHIND_BATCH_SIZE = int(os.getenv("WRITE_BEHIND_BATCH_SIZE", "200"))
+WRITE_BEHIND_FLUSH_SECONDS = float(os.getenv("WRITE_BEHIND_FLUSH_SECONDS", "1.0"))
+WRITE_BEHIND_MAX_PENDING = int(os.getenv("WRITE_BEHIND_MAX_PENDING", "10000"))
+WRITE_BEHIND_MAX_ATTEMPTS = int(os.getenv("WRITE_BEHIND_MAX_ATTEMPTS", "5"))
+WRITE_BEHIND_CLOSE_TIMEOUT = float(os.getenv("WRITE_BEHIND_CLOSE_TIMEOUT", "60"))
+MAX_BACKOFF_SECONDS = 30.0
+
+
+class WriteBehindBuffer:
+    """Durable queue of claim records in front of asave_verified_claims_batch"""
+
+    def __init__(
+        self,
+        journal_path: Optional[str] = WRITE_BEHIND_JOURNAL,
+        batch_size: int = WRITE_BEHIND_BATCH_SIZE,
+        flush_interval: float = WRITE_BEHIND_FLUSH_SECONDS,
+        max_pending: int = WRITE_BEHIND_MAX_PENDING,
+        max_attempts: int = WRITE_BEHIND_MAX_ATTEMPTS,
+    ):
+        self.journal_path = journal_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.max_attempts = max_attempts
+        self.pending = 0
+        self.flushed = 0
+        self.dead_lettered = 0
+        self.flush_failures = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._journal_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._changed: Optional[asyncio.Condition] = None
+        self._flushing: Optional[asyncio.Lock] = None
+        self._warned = False
+
+    # Journal (blocking; called through asyncio.to_thread)
+
+    def _journal(self) -> sqlite3.Connection:
+        if self._connection is None:
+            connection = sqlite3.connect(self.journal_path, check_same_thread=False, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=FULL")  # fsync on every commit
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS pending_claims (seq INTEGER PRIMARY KEY AUTOINCREMENT, record TEXT NOT NULL)"
+            )
+            columns = {row[1] for row in connection.execute("PRAGMA table_info(pending_claims)")}
+            if "attempts" not in columns:  # journals written before dead-lettering
+                connection.execute("ALTER TABLE pending_claims ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS dead_letter "
+                "(seq INTEGER PRIMARY KEY, record TEXT NOT NULL, error TEXT, attempts INTEGER, failed_at TEXT NOT NULL)"
+            )
+            self.pending = connection.execute("SELECT COUNT(*) FROM pending_claims").fetchone()[0]
+            if self.pending:
+                logger.info(f"♻️ Replaying {self.pending} journaled claims from {self.journal_path}")
+            self._connection = connection
+        return self._connection
+
+    def _append(self, records: List[Dict[str, Any]]) -> None:
+        with self._journal_lock:
+            journal = self._journal()
+            with journal:
+                journal.execute("BEGIN")
+                journal.executemany(
+                    "INSERT INTO pending_claims (record) VALUES (?)",
+                    [(json.dumps(record, default=str),) for record in records],
+                )
+            self.pending += len(records)
+
+    def _oldest(self, limit: int) -> List[Tuple[int, Dict[str, Any]]]:
+        with self._journal_lock:
+            rows = self._journal().execute(
+                "SELECT seq, record FROM pending_claims ORDER BY seq LIMIT ?", (limit,)
+            ).fetchall()
+        return [(seq, json.loads(record)) for seq, record in rows]
+
+    def _remove(self, seqs: List[int]) -> None:
+        with self._journal_lock:
+            journal = self._journal()
+            with journal:
+                journal.execute("BEGIN")
+                deleted = journal.executemany(
+                    "DELETE FROM pending_claims WHERE seq = ?", [(seq,) for seq in seqs]
+                ).rowcount
+            self.pending -= deleted
+
+    def _record_failures(self, failures: List[Tuple[int, str]]) -> int:
+        """Count a failed attempt per (seq, error); move records out of attempts to dead_letter"""
+        failed_at = datetime.utcnow().isoformat()
+        with self._journal_lock:
+            journal = self._journal()
+            with journal:
+                journal.execute("BEGIN")
+                journal.executemany(
+                    "UPDATE pending_claims SET attempts = attempts + ? WHERE seq = ?",
+                    # Retrying cannot fix an invalid record: it uses up its attempts at once
+                    [(self.max_attempts if error.startswith("Invalid claim") else 1, seq) for seq, error in failures],
+                )
+                journal.executemany(
+                    "INSERT OR REPLACE INTO dead_letter (seq, record, error, attempts, failed_at) "
+                    "SELECT seq, record, ?, attempts, ? FROM pending_claims WHERE seq = ? AND attempts >= ?",
+                    [(error, failed_at, seq, self.max_attempts) for seq, error in failures],
+                )
+                dead = journal.executemany(
+                    "DELETE FROM pending_claims WHERE seq = ? AND attempts >= ?",
+                    [(seq, self.max_attempts) for seq, _ in failures],
+                ).rowcount
+            self.pending -= dead
+        return dead
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Records moved to dead_letter, oldest first"""
+        with self._journal_lock:
+            rows = self._journal().execute(
+                "SELECT seq, record, error, attempts, failed_at FROM dead_letter ORDER BY seq LIMIT ?", (limit,)
+            ).fetchall()
+        return [
+            {"seq": seq, "record": json.loads(record), "error": error, "attempts": attempts, "failed_at": failed_at}
+            for seq, record, error, attempts, failed_at in rows
+        ]
+
+    # Flusher
+
+    def _ensure_flusher(self) -> None:
+        """Start the flush task on the running loop (again if a previous loop has gone)"""
+        loop = asyncio.get_running_loop()
+        if self._task is not None and self._loop is loop and not self._task.done():
+            return
+        self._loop = loop
+        self._wake = asyncio.Event()
+        self._changed = asyncio.Condition()
+        self._flushing = asyncio.Lock()
+        self._task = loop.create_task(self._flush_loop())
+
+    async def _flush_batch(self) -> bool:
+        """Write the oldest batch; True when every record left the journal"""
+        async with self._flushing:
+            return await self._write_oldest()
+
+    @staticmethod
+    async def _save(
+        entries: List[Tuple[int, Dict[str, Any]]]
+    ) -> Tuple[List[int], List[Tuple[int, Dict[str, Any], str]]]:
+        """Write entries in one batch: (written seqs, [(seq, record, error)] not written)"""
+        result = await asave_verified_claims_batch([record for _, record in entries])
+        done, failed = [], []
+        for (seq, record), row in zip(entries, result["results"]):
+            if row["success"]:
+                done.append(seq)
+            else:
+                failed.append((seq, record, row["error"] or "Row not written"))
+        return done, failed
+
+    @staticmethod
+    async def _database_up() -> bool:
+        return "error" not in await async_db_client.query("SELECT 1")
+
+    async def _write_oldest(self) -> bool:
+        entries = await asyncio.to_thread(self._oldest, self.batch_size)
+        if not entries:
+            return True
+        done, failed = await self._save(entries)
+
+        dead = 0
+        # Failures only count against records while the database answers; an outage just waits
+        if failed and await self._database_up():
+            if len(entries) > 1:
+                # One bad record aborts the whole batch: write the others one by one
+                retried = []
+                for seq, record, _ in failed:
+                    written, still_failed = await self._save([(seq, record)])
+                    done += written
+                    retried += still_failed
+                failed = retried
+            if failed:
+                dead = await asyncio.to_thread(self._record_failures, [(seq, error) for seq, _, error in failed])
+                if dead:
+                    logger.error(f"❌ Moved {dead} claims to dead_letter in {self.journal_path}: {failed[0][2]}")
+        await asyncio.to_thread(self._remove, done)
+
+        self.flushed += len(done)
+        self.dead_lettered += dead
+        metrics.inc("veris_write_behind_flushed_total", {}, len(done))
+        metrics.inc("veris_write_behind_dead_letter_total", {}, dead)
+        async with self._changed:
+            self._changed.notify_all()
+        return len(done) + dead == len(entries)
+
+    async def _flush_loop(self) -> None:
+        backoff = self.flush_interval
+        while True:
+            if self.pending < self.batch_size:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            self._wake.clear()
+            if not self.pending:
+                continue
+            try:
+                complete = await self._flush_batch()
+            except Exception as e:
+                logger.error(f"❌ Write-behind flush failed: {e}")
+                complete = False
+            if complete:
+                backoff = self.flush_interval
+                continue
+            self.flush_failures += 1
+            logger.warning(f"⚠️ {self.pending} claims pending, retrying flush in {backoff:.1f}s")
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, MAX_BACKOFF_SECONDS)
+
+    # Public API
+
+    async def start(self) -> None:
+        """Open the journal and start flushing; replays records left by a previous process"""
+        if not self.journal_path:
+            if not self._warned:
+                logger.warning("⚠️ WRITE_BEHIND_JOURNAL not set: claims are saved synchronously")
+                self._warned = True
+            return
+        self._ensure_flusher()
+        if not self._connection:
+            await asyncio.to_thread(self._journal)
+        if self.pending:
+            self._wake.set()
+
+    async def submit(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Journal claim records for a background save
+
+        Args:
+            records: Claim dicts as passed to asave_verified_claims_batch
+
+        Returns:
+            dict: save_verified_claims_batch contract (success, message, saved,
+                results); saved counts journaled claims and results carry
+                their future claim_ids. Without a journal the records are
+                saved before returning.
+        """
+        if not self.journal_path:
+            await self.start()
+            return await asave_verified_claims_batch(records)
+
+        results: List[Dict[str, Any]] = []
+        valid = []
+        for record in records:
+            missing = [field for field in REQUIRED_CLAIM_FIELDS if not record.get(field)]
+            if missing:
+                results.append({"success": False, "claim_id": None, "error": f"Invalid claim: missing {missing[0]}"})
+                continue
+            results.append({"success": True, "claim_id": generate_claim_id(record["url"], record["claim"]), "error": None})
+            valid.append(record)
+        if not valid:
+            return {"success": not records, "message": f"Queued 0/{len(records)} claims", "saved": 0, "results": results}
+
+        await self.start()
+        async with self._changed:
+            await self._changed.wait_for(
+                lambda: self.pending == 0 or self.pending + len(valid) <= self.max_pending
+            )
+
+        # Keep the verification time: the flush may happen much later
+        verified_at = datetime.utcnow().isoformat()
+        valid = [{**record, "verified_at": record.get("verified_at") or verified_at} for record in valid]
+        await asyncio.to_thread(self._append, valid)
+        if self.pending >= self.batch_size:
+            self._wake.set()
+
+        return {
+            "success": len(valid) == len(records),
+            "message": f"Queued {len(valid)}/{len(records)} claims ({self.pending} pending)",
+            "saved": len(valid),
+            "queued": True,
+            "results": results,
+        }
+
+    async def flush(self, timeout: Optional[float] = None) -> bool:
+        """Write everything pending now, retrying failed batches
+
+        Returns:
+            bool: True when the journal is empty; False if timeout expired
+                first (the rest stays journaled for the next start)
+        """
+        await self.start()
+        if not self.journal_path:
+            return True
+        deadline = None if timeout is None else self._loop.time() + timeout
+        while self.pending:
+            try:
+                complete = await self._flush_batch()
+            except Exception as e:
+                logger.error(f"❌ Write-behind flush failed: {e}")
+                complete = False
+            if not complete:
+                if deadline is not None and self._loop.time() + self.flush_interval > deadline:
+                    logger.warning(f"⚠️ {self.pending} claims left in {self.journal_path}")
+                    return False
+                await asyncio.sleep(self.flush_interval)
+        return True
+
+    async def close(self, timeout: Optional[float] = None) -> None:
+        """Flush (up to timeout), stop the background task and close the journal"""
+        await self.flush(timeout)
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        with self._journal_lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def close_at_exit(self, timeout: float = WRITE_BEHIND_CLOSE_TIMEOUT) -> None:
+        """atexit hook: drain the journal on a fresh event loop (the server's loop has finished)"""
+        if self._connection is None:
+            return
+
+        async def drain() -> None:
+            async_db_client.forget_pool()  # the pool belongs to the finished loop
+            try:
+                await self.close(timeout)
+            finally:
+                await async_db_client.disconnect()
+
+        try:
+            asyncio.run(drain())
+        except Exception as e:
+            logger.error(f"❌ Write-behind drain at exit failed ({self.pending} claims stay journaled): {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "pending": self.pending,
+            "flushed": self.flushed,
+            "dead_lettered": self.dead_lettered,
+            "flush_failures": self.flush_failures,
+        }
+
+
+claim_buffer = WriteBehindBuffer()
+
+
+async def asave_claims(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Save claim records through the write-behind buffer, or directly when it is disabled"""
+    if WRITE_BEHIND_ENABLED:
+        return await claim_buffer.submit(records)
+    return await asave_verified_claims_batch(records)
@@ -0,0 +1,228 @@
+"""Streaming export of verified claims to JSONL or Parquet
+
+Usage:
+    python -m agent_service.export claims.jsonl
+    python -m agent_service.export claims.parquet --format parquet --watermark export.wm
+    python -m agent_service.export - --since 2025-01-01T00:00:00
+
+Rows come from a server-side cursor in fetch-size chunks and are written chunk
+by chunk, so memory stays flat regardless of table size. With --watermark the
+last exported (updated_at, id) is stored after a successful export and the next
+run exports rows updated after it. updated_at is the writer's transaction start,
+so a slow transaction can commit rows older than ones already exported; each run
+re-reads EXPORT_SAFETY_WINDOW_SECONDS behind the watermark and skips the
+(id, updated_at) pairs the previous run already wrote.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+from .database import db_client
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional (Parquet output only)
+    pa = None
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FETCH_SIZE = int(os.getenv("EXPORT_FETCH_SIZE", "5000"))
+EXPORT_SAFETY_WINDOW_SECONDS = float(os.getenv("EXPORT_SAFETY_WINDOW_SECONDS", "300"))
+
+# Article text/media come from `content`; rows saved before migration 002 carry their own copies
+EXPORT_SQL = """
+    SELECT
+        cc.id, cc.source, cc.url, cc.content_type, cc.claim, cc.category,
+        cc.verification_status, cc.confidence, cc.evidence,
+        cc.verification_sources, cc.media_references, cc.claim_hash, cc.content_hash,
+        COALESCE(c.raw_text, cc.raw_text) AS raw_text,
+        COALESCE(c.images, cc.images) AS images,
+        COALESCE(c.videos, cc.videos) AS videos,
+        cc.created_at, cc.updated_at
+    FROM crawled_content cc
+    LEFT JOIN content c ON c.content_hash = cc.content_hash
+    WHERE cc.claim IS NOT NULL AND cc.verification_status IS NOT NULL
+      AND (cc.updated_at, cc.id) > (%s, %s)
+    ORDER BY cc.updated_at, cc.id
+"""
+JSON_COLUMNS = {"verification_sources", "media_references", "images", "videos"}
+TIMESTAMP_COLUMNS = {"created_at", "updated_at"}
+
+
+class JsonlWriter:
+    def __init__(self, output: TextIO):
+        self.output = output
+
+    def write(self, columns: List[str], rows: List[tuple]) -> None:
+        self.output.writelines(
+            json.dumps(dict(zip(columns, row)), default=str, ensure_ascii=False) + "\n" for row in rows
+        )
+
+    def close(self) -> None:
+        self.output.flush()
+
+
+class ParquetWriter:
+    """One row group per fetched chunk; JSONB columns are stored as JSON strings"""
+
+    def __init__(self, path: str):
+        if pa is None:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+        self.path = path
+        self._writer = None
+
+    def _schema(self, columns: List[str]):
+        return pa.schema([
+            (column, pa.timestamp("us") if column in TIMESTAMP_COLUMNS
+             else pa.float64() if column == "confidence" else pa.string())
+            for column in columns
+        ])
+
+    def write(self, columns: List[str], rows: List[tuple]) -> None:
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, self._schema(columns), compression="zstd")
+        arrays = []
+        for index, column in enumerate(columns):
+            values = [row[index] for row in rows]
+            if column in JSON_COLUMNS:
+                values = [None if value is None else json.dumps(value) for value in values]
+            arrays.append(values)
+        self._writer.write_batch(pa.record_batch(arrays, schema=self._writer.schema))
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+
+
+def read_watermark(path: Optional[str]) -> Tuple[Tuple[datetime, str], Optional[Dict[str, str]]]:
+    """(updated_at, id) of the last exported row and the {id: updated_at} pairs
+    exported inside the safety window, or the epoch and None for a full export"""
+    if path and os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            saved = json.load(f)
+        return (datetime.fromisoformat(saved["updated_at"]), saved["id"]), saved.get("recent", {})
+    return (datetime.min, ""), None
+
+
+def write_watermark(path: str, last: Tuple[datetime, str], recent: Dict[str, str]) -> None:
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump({"updated_at": last[0].isoformat(), "id": last[1], "recent": recent}, f)
+    os.replace(temp_path, path)
+
+
+def export_claims(
+    writer,
+    since: Tuple[datetime, str],
+    fetch_size: int = EXPORT_FETCH_SIZE,
+    recent: Optional[Dict[str, str]] = None,
+    window_seconds: float = EXPORT_SAFETY_WINDOW_SECONDS,
+) -> Dict[str, Any]:
+    """Stream claims updated after since into writer
+
+    Args:
+        writer: JsonlWriter or ParquetWriter
+        since: (updated_at, id) to export after
+        fetch_size: Rows per server-side fetch and per write
+        recent: {id: updated_at} already exported near since; when given, the
+            scan starts window_seconds earlier and skips these pairs
+        window_seconds: How far behind since late-committed rows are looked for
+
+    Returns:
+        dict: rows exported, the last (updated_at, id) and the recent pairs to save
+    """
+    window = timedelta(seconds=window_seconds)
+    start = since
+    if recent is not None and since[0] > datetime.min + window:
+        start = (since[0] - window, "")
+    recent = dict(recent or {})
+
+    exported = 0
+    last: Optional[Tuple[datetime, str]] = None
+    for columns, rows in db_client.stream(EXPORT_SQL, start, fetch_size):
+        id_index, updated_index = columns.index("id"), columns.index("updated_at")
+        rows = [row for row in rows if recent.get(row[id_index]) != row[updated_index].isoformat()]
+        if not rows:
+            continue
+        writer.write(columns, rows)
+        exported += len(rows)
+        recent.update((row[id_index], row[updated_index].isoformat()) for row in rows)
+        last = max(last or since, (rows[-1][updated_index], rows[-1][id_index]))
+        recent = _prune_recent(recent, last[0], window)
+        logger.info(f"📦 Exported {exported} rows (through {last[0].isoformat()})")
+
+    return {"rows": exported, "last": last, "recent": recent}
+
+
+def _prune_recent(recent: Dict[str, str], newest: datetime, window: timedelta) -> Dict[str, str]:
+    """Pairs still inside the safety window behind newest; rows arrive in
+    updated_at order, so older pairs can no longer be re-read by this scan"""
+    return {
+        claim_id: updated_at for claim_id, updated_at in recent.items()
+        if newest - datetime.fromisoformat(updated_at) <= window
+    }
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Export verified claims")
+    parser.add_argument("output", help="Output file, or - for JSONL on stdout")
+    parser.add_argument("--format", choices=("jsonl", "parquet"), default="jsonl")
+    parser.add_argument("--fetch-size", type=int, default=EXPORT_FETCH_SIZE, help="Rows per server-side fetch")
+    parser.add_argument("--since", type=datetime.fromisoformat, help="Only rows updated after this ISO timestamp")
+    parser.add_argument("--watermark", help="File holding the last exported row (read, then advanced on success)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    if args.format == "parquet" and args.output == "-":
+        logger.error("❌ Parquet export needs an output file")
+        return 2
+
+    since, recent = read_watermark(args.watermark)
+    if args.since and args.since > since[0]:
+        since, recent = (args.since, ""), None
+
+    project_id = os.getenv("NEON_PROJECT_ID", "")
+    if not project_id:
+        logger.error("❌ NEON_PROJECT_ID required")
+        return 2
+    db_client.connect(project_id, os.getenv("NEON_DATABASE_NAME", "neondb"))
+
+    # Write next to the target and rename, so a failed export leaves no partial file
+    temp_path = None if args.output == "-" else f"{args.output}.partial"
+    if args.format == "parquet":
+        writer = ParquetWriter(temp_path)
+    else:
+        writer = JsonlWriter(sys.stdout if temp_path is None else open(temp_path, "w", encoding="utf-8"))
+
+    started = time.monotonic()
+    try:
+        result = export_claims(writer, since, args.fetch_size, recent)
+        writer.close()
+        if temp_path is not None and os.path.exists(temp_path):  # Parquet writes nothing for 0 rows
+            os.replace(temp_path, args.output)
+    finally:
+        if isinstance(writer, JsonlWriter) and writer.output is not sys.stdout:
+            writer.output.close()
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+        db_client.disconnect()
+
+    if args.watermark and result["last"]:
+        write_watermark(args.watermark, result["last"], result["recent"])
+    logger.info(
+        f"✅ Exported {result['rows']} rows in {time.monotonic() - started:.1f}s "
+        f"(watermark {result['last'][0].isoformat() if result['last'] else 'unchanged'})"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Media storage and upload pipeline for user-uploaded images/videos"""
@@ -0,0 +1,187 @@
+"""Optional media pre-processing before claim extraction
+
+Media tokens dominate claim extraction cost, so uploads can be reduced to a
+compact preview artifact the extractor loads instead of the original:
+- Images: downscaled to MEDIA_MAX_DIMENSION and re-encoded as JPEG
+- Videos: periodic keyframes plus scene-change frames tiled into one contact sheet
+
+The original is still uploaded to storage unchanged. Needs Pillow, and ffmpeg
+on PATH (or FFMPEG_BINARY) for videos; without them media passes through as-is.
+
+/tmp is memory-backed on Cloud Run, so videos are not copied there: with
+MEDIA_SPOOL_DIR (the uploader's disk-backed spool volume) the video is written
+there for ffmpeg, otherwise it is piped to ffmpeg's stdin from the bytes already
+in memory. A pipe cannot seek, so MP4s with their index at the end get no
+preview without a spool dir.
+"""
+import io
+import logging
+import math
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from .uploader import MEDIA_SPOOL_DIR, _spool
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+MEDIA_PREPROCESS_ENABLED = os.getenv("MEDIA_PREPROCESS_ENABLED", "false").lower() == "true"
+MEDIA_MAX_DIMENSION = int(os.getenv("MEDIA_MAX_DIMENSION", "1536"))
+MEDIA_JPEG_QUALITY = int(os.getenv("MEDIA_JPEG_QUALITY", "80"))
+VIDEO_FRAME_INTERVAL_SECONDS = float(os.getenv("VIDEO_FRAME_INTERVAL_SECONDS", "5"))
+VIDEO_SCENE_THRESHOLD = float(os.getenv("VIDEO_SCENE_THRESHOLD", "0.3"))
+VIDEO_MAX_FRAMES = int(os.getenv("VIDEO_MAX_FRAMES", "16"))
+VIDEO_FRAME_WIDTH = int(os.getenv("VIDEO_FRAME_WIDTH", "480"))
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+FFMPEG_TIMEOUT_SECONDS = int(os.getenv("FFMPEG_TIMEOUT_SECONDS", "300"))
+
+# Gemini media token accounting: images up to 384px are one 258-token unit,
+# larger ones are tiled in 768px crops; video is ~258 tokens/frame at 1 fps + 32/s audio
+IMAGE_TILE_TOKENS = 258
+VIDEO_TOKENS_PER_SECOND = 290
+
+_DURATION = re.compile(r"Duration: (\d+):(\d+):(\d+(?:\.\d+)?)")
+
+
+@dataclass
+class PreprocessedMedia:
+    data: bytes
+    mime_type: str
+    report: Dict[str, Any]
+
+
+def estimate_image_tokens(width: int, height: int) -> int:
+    """Estimated model tokens for an image of the given size"""
+    if width <= 384 and height <= 384:
+        return IMAGE_TILE_TOKENS
+    return IMAGE_TILE_TOKENS * math.ceil(width / 768) * math.ceil(height / 768)
+
+
+def _report(before_bytes: int, before_tokens: int, data: bytes, after_tokens: int) -> Dict[str, Any]:
+    return {
+        "bytes_before": before_bytes,
+        "bytes_after": len(data),
+        "tokens_before": before_tokens,
+        "tokens_after": after_tokens,
+    }
+
+
+def _encode_jpeg(image: "Image.Image") -> bytes:
+    output = io.BytesIO()
+    image.convert("RGB").save(output, "JPEG", quality=MEDIA_JPEG_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+def _downscale_image(data: bytes) -> Optional[PreprocessedMedia]:
+    with Image.open(io.BytesIO(data)) as image:
+        before_tokens = estimate_image_tokens(*image.size)
+        image.thumbnail((MEDIA_MAX_DIMENSION, MEDIA_MAX_DIMENSION))
+        after_tokens = estimate_image_tokens(*image.size)
+        encoded = _encode_jpeg(image)
+
+    if len(encoded) >= len(data) and after_tokens >= before_tokens:
+        return None
+    return PreprocessedMedia(encoded, "image/jpeg", _report(len(data), before_tokens, encoded, after_tokens))
+
+
+def _extract_frames(source: Optional[Path], work_dir: Path, data: bytes = b"") -> Tuple[list, float]:
+    """Periodic + scene-change frames via ffmpeg; returns (frame paths, duration seconds)
+
+    Reads source, or data through stdin when source is None.
+    """
+    select = (
+        f"select='isnan(prev_selected_t)+gt(scene,{VIDEO_SCENE_THRESHOLD})"
+        f"+gte(t-prev_selected_t,{VIDEO_FRAME_INTERVAL_SECONDS})'"
+    )
+    completed = subprocess.run(
+        [
+            FFMPEG_BINARY, "-hide_banner", "-i", "pipe:0" if source is None else str(source),
+            "-vf", f"{select},scale={VIDEO_FRAME_WIDTH}:-2",
+            "-vsync", "vfr", "-q:v", "4",
+            str(work_dir / "frame_%05d.jpg"),
+        ],
+        input=data if source is None else None,
+        capture_output=True,
+        timeout=FFMPEG_TIMEOUT_SECONDS,
+        check=True,
+    )
+    match = _DURATION.search(completed.stderr.decode("utf-8", "replace"))
+    duration = (
+        int(match.group(1)) * 3600 + int(match.group(2)) * 60 + float(match.group(3))
+        if match else 0.0
+    )
+    return sorted(work_dir.glob("frame_*.jpg")), duration
+
+
+def _video_contact_sheet(data: bytes) -> Optional[PreprocessedMedia]:
+    if not shutil.which(FFMPEG_BINARY):
+        logger.warning("⚠️ ffmpeg not found, video pre-processing skipped")
+        return None
+
+    # Only the small frame JPEGs land in /tmp when no spool dir is configured
+    with tempfile.TemporaryDirectory(prefix="veris_frames_", dir=MEDIA_SPOOL_DIR) as work:
+        work_dir = Path(work)
+        source = Path(_spool(data, work)) if MEDIA_SPOOL_DIR else None
+
+        frames, duration = _extract_frames(source, work_dir, data)
+        if not frames:
+            return None
+
+        # Evenly sample down to the frame budget, keeping time order
+        if len(frames) > VIDEO_MAX_FRAMES:
+            step = len(frames) / VIDEO_MAX_FRAMES
+            frames = [frames[int(i * step)] for i in range(VIDEO_MAX_FRAMES)]
+
+        images = [Image.open(frame) for frame in frames]
+        try:
+            width = max(image.width for image in images)
+            height = max(image.height for image in images)
+            columns = math.ceil(math.sqrt(len(images)))
+            rows = math.ceil(len(images) / columns)
+            sheet = Image.new("RGB", (columns * width, rows * height))
+            for index, image in enumerate(images):
+                sheet.paste(image, ((index % columns) * width, (index // columns) * height))
+        finally:
+            for image in images:
+                image.close()
+
+        sheet.thumbnail((MEDIA_MAX_DIMENSION, MEDIA_MAX_DIMENSION))
+        encoded = _encode_jpeg(sheet)
+
+    before_tokens = int(duration * VIDEO_TOKENS_PER_SECOND)
+    report = _report(len(data), before_tokens, encoded, estimate_image_tokens(*sheet.size))
+    report["frames"] = len(frames)
+    report["duration_seconds"] = round(duration, 1)
+    return PreprocessedMedia(encoded, "image/jpeg", report)
+
+
+def preprocess_media(data: bytes, mime_type: str) -> Optional[PreprocessedMedia]:
+    """Compact preview of an image/video for claim extraction (blocking)
+
+    Returns:
+        PreprocessedMedia with a per-artifact bytes/tokens report, or None when
+        disabled, unsupported, or not smaller than the original
+    """
+    if not MEDIA_PREPROCESS_ENABLED:
+        return None
+    if Image is None:
+        logger.warning("⚠️ Pillow not installed, media pre-processing skipped")
+        return None
+
+    try:
+        if mime_type.startswith("image/"):
+            return _downscale_image(data)
+        if mime_type.startswith("video/"):
+            return _video_contact_sheet(data)
+    except Exception as e:
+        logger.error(f"Media pre-processing failed ({mime_type}): {e}")
+    return None
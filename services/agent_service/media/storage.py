@@ -0,0 +1,118 @@
+"""Pluggable blob storage backends for uploaded media"""
+import logging
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, BinaryIO, Optional
+
+if TYPE_CHECKING:
+    from google.cloud import storage
+
+logger = logging.getLogger(__name__)
+
+GCP_PROJECT = os.getenv("GOOGLE_CLOUD_PROJECT", "veris-478615")
+GOOGLE_CLOUD_BUCKET = os.getenv("GOOGLE_CLOUD_BUCKET", "veris-media")
+MEDIA_STORAGE_BACKEND = os.getenv("MEDIA_STORAGE_BACKEND", "gcs")
+MEDIA_LOCAL_DIR = os.getenv("MEDIA_LOCAL_DIR", "/tmp/veris-media")
+# Resumable upload chunk size (GCS requires a multiple of 256 KiB)
+MEDIA_UPLOAD_CHUNK_BYTES = int(os.getenv("MEDIA_UPLOAD_CHUNK_BYTES", str(8 * 1024 * 1024)))
+
+
+class StorageBackend:
+    """Blob storage for media, addressed by blob path (e.g. "videos/<artifact_id>")"""
+
+    name = "base"
+
+    def warm_up(self) -> None:
+        """Create clients ahead of the first upload (no-op by default)"""
+
+    def public_url(self, blob_path: str) -> str:
+        """URL of the blob, derivable before the upload has happened"""
+        raise NotImplementedError
+
+    def exists(self, blob_path: str) -> bool:
+        raise NotImplementedError
+
+    def upload(self, blob_path: str, source: BinaryIO, content_type: str, size: int) -> None:
+        """Stream size bytes from source into the blob"""
+        raise NotImplementedError
+
+
+class GCSStorageBackend(StorageBackend):
+    """Google Cloud Storage backend sharing one client per process"""
+
+    name = "gcs"
+
+    _client: Optional["storage.Client"] = None
+    _client_lock = threading.Lock()
+
+    def __init__(self, project: str = GCP_PROJECT, bucket_name: str = GOOGLE_CLOUD_BUCKET):
+        self.project = project
+        self.bucket_name = bucket_name
+
+    @classmethod
+    def client(cls, project: str) -> "storage.Client":
+        """Process-wide storage client, created on first use
+
+        google.cloud.storage is imported here too: it is the slowest import in
+        the service and only upload paths need it.
+        """
+        if cls._client is None:
+            with cls._client_lock:
+                if cls._client is None:
+                    from google.cloud import storage
+                    cls._client = storage.Client(project=project)
+        return cls._client
+
+    def warm_up(self) -> None:
+        self.client(self.project)
+
+    def _blob(self, blob_path: str) -> "storage.Blob":
+        return self.client(self.project).bucket(self.bucket_name).blob(blob_path)
+
+    def public_url(self, blob_path: str) -> str:
+        return f"https://storage.googleapis.com/{self.bucket_name}/{blob_path}"
+
+    def exists(self, blob_path: str) -> bool:
+        return self._blob(blob_path).exists()
+
+    def upload(self, blob_path: str, source: BinaryIO, content_type: str, size: int) -> None:
+        # Above 8 MB the client switches to a resumable upload sent in chunk_size pieces
+        blob = self._blob(blob_path)
+        blob.chunk_size = MEDIA_UPLOAD_CHUNK_BYTES
+        blob.upload_from_file(source, content_type=content_type, size=size)
+        blob.make_public()
+
+
+class LocalStorageBackend(StorageBackend):
+    """Local filesystem backend for tests and offline runs"""
+
+    name = "local"
+
+    def __init__(self, root: str = MEDIA_LOCAL_DIR):
+        self.root = Path(root)
+
+    def public_url(self, blob_path: str) -> str:
+        return (self.root / blob_path).resolve().as_uri()
+
+    def exists(self, blob_path: str) -> bool:
+        return (self.root / blob_path).exists()
+
+    def upload(self, blob_path: str, source: BinaryIO, content_type: str, size: int) -> None:
+        path = self.root / blob_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(path.name + ".part")
+        with open(partial, "wb") as target:
+            shutil.copyfileobj(source, target, MEDIA_UPLOAD_CHUNK_BYTES)
+        partial.replace(path)
+
+
+def get_storage_backend() -> Optional[StorageBackend]:
+    """Backend selected by MEDIA_STORAGE_BACKEND (gcs|local); None if GCS is not configured"""
+    if MEDIA_STORAGE_BACKEND == "local":
+        return LocalStorageBackend()
+    if not GCP_PROJECT:
+        logger.warning("⚠️ GOOGLE_CLOUD_PROJECT not set, media uploads disabled")
+        return None
+    return GCSStorageBackend()
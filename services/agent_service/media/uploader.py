@@ -0,0 +1,237 @@
+"""Bounded background upload queue for uploaded media
+
+The blob URL is derived from the content-addressed artifact ID, so callers get
+it immediately and the model request no longer waits for the upload.
+
+Queued uploads share a per-process memory budget: the queue keeps a reference
+to the caller's bytes (no copy), and submitters wait while the budget is used
+up. Only with an explicitly configured MEDIA_SPOOL_DIR (a disk-backed volume)
+are large or over-budget payloads written to a spool file instead, so the
+caller's buffer can be freed at once.
+"""
+import asyncio
+import io
+import logging
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import BinaryIO, List, Optional, Set
+from ..metrics import record_upload, record_upload_queued
+from .storage import MEDIA_UPLOAD_CHUNK_BYTES, StorageBackend, get_storage_backend
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_QUEUE_SIZE = int(os.getenv("MEDIA_UPLOAD_QUEUE_SIZE", "16"))
+UPLOAD_WORKERS = int(os.getenv("MEDIA_UPLOAD_WORKERS", "2"))
+MEDIA_MEMORY_BUDGET_BYTES = int(os.getenv("MEDIA_MEMORY_BUDGET_BYTES", str(256 * 1024 * 1024)))
+MEDIA_SPOOL_THRESHOLD_BYTES = int(os.getenv("MEDIA_SPOOL_THRESHOLD_BYTES", str(32 * 1024 * 1024)))
+# Spooling is off unless set: on Cloud Run /tmp is memory-backed, so spooling
+# there would double memory use. Point it at a mounted disk volume.
+MEDIA_SPOOL_DIR = os.getenv("MEDIA_SPOOL_DIR") or None
+
+
+@dataclass
+class UploadJob:
+    blob_path: str
+    content_type: str
+    size: int
+    data: Optional[bytes] = None
+    spool_path: Optional[str] = None
+
+    def open(self) -> BinaryIO:
+        """Readable stream over the payload (BytesIO over bytes does not copy)"""
+        if self.spool_path:
+            return open(self.spool_path, "rb")
+        return io.BytesIO(self.data)
+
+
+class MemoryBudget:
+    """Byte budget for media buffers held by queued uploads
+
+    acquire() waits until the bytes fit. A payload larger than the whole
+    budget is admitted once nothing else is held, so it cannot wait forever.
+    """
+
+    def __init__(self, limit: int = MEDIA_MEMORY_BUDGET_BYTES):
+        self.limit = limit
+        self.in_use = 0
+        self.waiting = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed: Optional[asyncio.Condition] = None
+
+    def _condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._changed = asyncio.Condition()
+        return self._changed
+
+    def _fits(self, size: int) -> bool:
+        return self.in_use + size <= self.limit or self.in_use == 0
+
+    def try_acquire(self, size: int) -> bool:
+        if self.waiting or not self._fits(size):
+            return False
+        self.in_use += size
+        return True
+
+    async def acquire(self, size: int) -> float:
+        """Wait until size bytes fit in the budget; returns seconds waited"""
+        started = time.monotonic()
+        changed = self._condition()
+        async with changed:
+            self.waiting += 1
+            try:
+                await changed.wait_for(lambda: self._fits(size))
+            finally:
+                self.waiting -= 1
+            self.in_use += size
+        return time.monotonic() - started
+
+    async def release(self, size: int) -> None:
+        changed = self._condition()
+        async with changed:
+            self.in_use = max(0, self.in_use - size)
+            changed.notify_all()
+
+
+def _spool(data: bytes, spool_dir: str) -> str:
+    """Write data to a spool file chunk by chunk (memoryview slices, no copies)"""
+    view = memoryview(data)
+    with tempfile.NamedTemporaryFile(
+        prefix="veris_media_", dir=spool_dir, delete=False
+    ) as spool:
+        for start in range(0, len(view), MEDIA_UPLOAD_CHUNK_BYTES):
+            spool.write(view[start:start + MEDIA_UPLOAD_CHUNK_BYTES])
+        return spool.name
+
+
+class BackgroundUploader:
+    """Upload queue drained by a few worker tasks
+
+    Submitting blocks only while the queue is full (backpressure). Blobs that
+    are already stored, or already queued, are skipped.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[StorageBackend] = None,
+        queue_size: int = UPLOAD_QUEUE_SIZE,
+        workers: int = UPLOAD_WORKERS,
+        budget: Optional[MemoryBudget] = None,
+        spool_threshold: int = MEDIA_SPOOL_THRESHOLD_BYTES,
+        spool_dir: Optional[str] = MEDIA_SPOOL_DIR,
+    ):
+        self.backend = backend
+        self.queue_size = queue_size
+        self.worker_count = workers
+        self.budget = budget or MemoryBudget()
+        self.spool_threshold = spool_threshold
+        self.spool_dir = spool_dir
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._pending: Set[str] = set()
+        self.uploaded = 0
+        self.skipped = 0
+        self.failed = 0
+        self.spooled = 0
+
+    def _ensure_workers(self) -> asyncio.Queue:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+            self._workers = [
+                asyncio.create_task(self._worker()) for _ in range(self.worker_count)
+            ]
+        return self._queue
+
+    async def submit(self, blob_path: str, data: bytes, content_type: str) -> Optional[str]:
+        """Queue an upload and return the blob's public URL (None if storage is disabled)
+
+        Waits while the queue is full or, without a spool directory, while the
+        memory budget is used up.
+        """
+        if self.backend is None:
+            return None
+
+        url = self.backend.public_url(blob_path)
+        if blob_path in self._pending:
+            return url
+
+        queue = self._ensure_workers()
+        self._pending.add(blob_path)
+
+        size = len(data)
+        try:
+            if self.spool_dir and (size > self.spool_threshold or not self.budget.try_acquire(size)):
+                spool_path = await asyncio.to_thread(_spool, data, self.spool_dir)
+                job = UploadJob(blob_path, content_type, size, spool_path=spool_path)
+                self.spooled += 1
+            else:
+                if not self.spool_dir:
+                    waited = await self.budget.acquire(size)
+                    if waited > 1:
+                        logger.info(f"⏳ Waited {waited:.1f}s for media memory budget: {blob_path}")
+                job = UploadJob(blob_path, content_type, size, data=data)
+        except BaseException:
+            self._pending.discard(blob_path)
+            raise
+
+        try:
+            await queue.put(job)
+        except BaseException:
+            await self._release(job)
+            self._pending.discard(blob_path)
+            raise
+        record_upload_queued(size)
+        logger.info(
+            f"📥 Queued upload: {blob_path} ({size} bytes, "
+            f"{'spooled' if job.spool_path else 'in memory'}, queue={queue.qsize()})"
+        )
+        return url
+
+    def _upload(self, job: UploadJob) -> bool:
+        """Blocking upload (runs in a worker thread); False if the blob already existed"""
+        if self.backend.exists(job.blob_path):
+            return False
+        with job.open() as source:
+            self.backend.upload(job.blob_path, source, job.content_type, job.size)
+        return True
+
+    async def _release(self, job: UploadJob) -> None:
+        if job.spool_path:
+            try:
+                os.remove(job.spool_path)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not remove spool file {job.spool_path}: {e}")
+        else:
+            job.data = None
+            await self.budget.release(job.size)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            started = time.monotonic()
+            try:
+                if await asyncio.to_thread(self._upload, job):
+                    self.uploaded += 1
+                    record_upload(self.backend.name, job.size, time.monotonic() - started)
+                    logger.info(f"☁️ Uploaded: {job.blob_path}")
+                else:
+                    self.skipped += 1
+                    logger.info(f"⏭️ Already stored: {job.blob_path}")
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Media upload failed: {job.blob_path} ({e})")
+            finally:
+                await self._release(job)
+                self._pending.discard(job.blob_path)
+                self._queue.task_done()
+
+    async def drain(self) -> None:
+        """Wait until every queued upload has finished"""
+        if self._queue is not None:
+            await self._queue.join()
+
+
+media_uploader = BackgroundUploader(get_storage_backend())
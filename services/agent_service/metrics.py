@@ -0,0 +1,450 @@
+"""In-process latency/token histograms and their exporters
+
+Agents are instrumented with instrument_agent(), which registers agent, model
+and tool timing callbacks. Storage uploads and DB queries record their own
+timings. Each top-level agent run (one user turn, or one batch stage) also
+collects totals of its model calls, tokens, DB round-trips and uploaded bytes.
+
+Exporters (both optional, started by start_exporters()):
+- METRICS_PORT: Prometheus text format on http://0.0.0.0:<port>/metrics
+- METRICS_DUMP_PATH: JSON snapshot rewritten every METRICS_DUMP_INTERVAL_SECONDS
+"""
+import bisect
+import contextvars
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+
+logger = logging.getLogger(__name__)
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_DUMP_PATH = os.getenv("METRICS_DUMP_PATH", "")
+METRICS_DUMP_INTERVAL_SECONDS = float(os.getenv("METRICS_DUMP_INTERVAL_SECONDS", "60"))
+METRICS_RECENT_RUNS = 200
+
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+TOKEN_BUCKETS = (100, 500, 1000, 2000, 5000, 10000, 25000, 50000, 100000, 250000, 1000000)
+BYTE_BUCKETS = tuple(2 ** power for power in range(10, 32, 2))  # 1 KB .. 1 GB
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+
+class Histogram:
+    """Cumulative-bucket histogram per label set (Prometheus semantics)"""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str], buckets: Sequence[float]):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self.series: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = {
+                "counts": [0] * (len(self.buckets) + 1),
+                "sum": 0.0,
+                "count": 0,
+            }
+        series["counts"][bisect.bisect_left(self.buckets, value)] += 1
+        series["sum"] += value
+        series["count"] += 1
+
+    def quantile(self, series: Dict[str, Any], q: float) -> Optional[float]:
+        """Bucket upper bound containing the q-quantile (None if empty or past the last bucket)"""
+        target = q * series["count"]
+        seen = 0
+        for bound, count in zip(self.buckets, series["counts"]):
+            seen += count
+            if seen >= target and series["count"]:
+                return bound
+        return None
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, Dict[Tuple[str, ...], float]] = {}
+        self.counter_labels: Dict[str, Tuple[str, ...]] = {}
+        self.gauges: Dict[str, Dict[Tuple[str, ...], float]] = {}
+        self.gauge_labels: Dict[str, Tuple[str, ...]] = {}
+        self.recent_runs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str], buckets: Sequence[float]) -> Histogram:
+        with self._lock:
+            if name not in self.histograms:
+                self.histograms[name] = Histogram(name, help_text, labels, buckets)
+            return self.histograms[name]
+
+    def observe(self, histogram: Histogram, value: float, *label_values: str) -> None:
+        with self._lock:
+            histogram.observe(value, *label_values)
+
+    def inc(self, name: str, labels: Dict[str, str], amount: float = 1) -> None:
+        with self._lock:
+            self.counter_labels.setdefault(name, tuple(labels))
+            series = self.counters.setdefault(name, {})
+            key = tuple(labels.values())
+            series[key] = series.get(key, 0) + amount
+
+    def set_gauge(self, name: str, labels: Dict[str, str], value: float) -> None:
+        with self._lock:
+            self.gauge_labels.setdefault(name, tuple(labels))
+            self.gauges.setdefault(name, {})[tuple(labels.values())] = value
+
+    def record_run(self, run_id: str, totals: Dict[str, Any]) -> None:
+        with self._lock:
+            self.recent_runs[run_id] = totals
+            while len(self.recent_runs) > METRICS_RECENT_RUNS:
+                self.recent_runs.popitem(last=False)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-serializable view: histograms with p50/p95, counters, gauges, recent run totals"""
+        with self._lock:
+            histograms = {}
+            for name, histogram in self.histograms.items():
+                histograms[name] = [
+                    {
+                        "labels": dict(zip(histogram.labels, label_values)),
+                        "count": series["count"],
+                        "sum": round(series["sum"], 6),
+                        "p50": histogram.quantile(series, 0.5),
+                        "p95": histogram.quantile(series, 0.95),
+                        "buckets": dict(zip([*map(str, histogram.buckets), "+Inf"], series["counts"])),
+                    }
+                    for label_values, series in histogram.series.items()
+                ]
+            counters = {
+                name: [
+                    {"labels": dict(zip(self.counter_labels[name], key)), "value": value}
+                    for key, value in series.items()
+                ]
+                for name, series in self.counters.items()
+            }
+            gauges = {
+                name: [
+                    {"labels": dict(zip(self.gauge_labels[name], key)), "value": value}
+                    for key, value in series.items()
+                ]
+                for name, series in self.gauges.items()
+            }
+            return {
+                "timestamp": time.time(),
+                "histograms": histograms,
+                "counters": counters,
+                "gauges": gauges,
+                "recent_runs": list(self.recent_runs.values()),
+            }
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        def label_text(names, values, extra=""):
+            pairs = [f'{n}="{str(v).replace(chr(34), chr(39))}"' for n, v in zip(names, values)]
+            if extra:
+                pairs.append(extra)
+            return "{" + ",".join(pairs) + "}" if pairs else ""
+
+        lines = []
+        with self._lock:
+            for name, histogram in self.histograms.items():
+                lines += [f"# HELP {name} {histogram.help}", f"# TYPE {name} histogram"]
+                for label_values, series in histogram.series.items():
+                    cumulative = 0
+                    for bound, count in zip([*histogram.buckets, "+Inf"], series["counts"]):
+                        cumulative += count
+                        bucket_labels = label_text(histogram.labels, label_values, f'le="{bound}"')
+                        lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+                    labels = label_text(histogram.labels, label_values)
+                    lines.append(f"{name}_sum{labels} {series['sum']}")
+                    lines.append(f"{name}_count{labels} {series['count']}")
+            for name, series in self.counters.items():
+                lines.append(f"# TYPE {name} counter")
+                for key, value in series.items():
+                    lines.append(f"{name}{label_text(self.counter_labels[name], key)} {value}")
+            for name, series in self.gauges.items():
+                lines.append(f"# TYPE {name} gauge")
+                for key, value in series.items():
+                    lines.append(f"{name}{label_text(self.gauge_labels[name], key)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+AGENT_LATENCY = metrics.histogram("veris_agent_latency_seconds", "Agent run latency", ["agent"], LATENCY_BUCKETS)
+MODEL_LATENCY = metrics.histogram(
+    "veris_model_latency_seconds", "LLM call latency (including quota waits)", ["agent", "model"], LATENCY_BUCKETS
+)
+PROMPT_TOKENS = metrics.histogram("veris_prompt_tokens", "Prompt tokens per LLM call", ["agent"], TOKEN_BUCKETS)
+RESPONSE_TOKENS = metrics.histogram("veris_response_tokens", "Response tokens per LLM call", ["agent"], TOKEN_BUCKETS)
+TOOL_LATENCY = metrics.histogram("veris_tool_latency_seconds", "Tool call latency", ["agent", "tool"], LATENCY_BUCKETS)
+DB_QUERY_LATENCY = metrics.histogram(
+    "veris_db_query_seconds", "Postgres round-trip latency", ["client", "operation"], LATENCY_BUCKETS
+)
+UPLOAD_LATENCY = metrics.histogram("veris_upload_seconds", "Media upload latency", ["backend"], LATENCY_BUCKETS)
+UPLOAD_BYTES = metrics.histogram("veris_upload_bytes", "Bytes per media upload", ["backend"], BYTE_BUCKETS)
+RUN_DB_ROUND_TRIPS = metrics.histogram(
+    "veris_run_db_round_trips", "DB round-trips per top-level run", ["agent"], COUNT_BUCKETS
+)
+RUN_UPLOAD_BYTES = metrics.histogram(
+    "veris_run_upload_bytes", "Media bytes queued for upload per top-level run", ["agent"], BYTE_BUCKETS
+)
+RUN_MODEL_CALLS = metrics.histogram("veris_run_model_calls", "LLM calls per top-level run", ["agent"], COUNT_BUCKETS)
+RUN_LATENCY = metrics.histogram(
+    "veris_run_seconds", "Top-level run latency per priority class", ["agent", "priority"], LATENCY_BUCKETS
+)
+
+
+# ---------------------------------------------------------------------------
+# Per-run totals
+# ---------------------------------------------------------------------------
+
+@dataclass
+class RunTotals:
+    session_id: str
+    invocation_id: str
+    agent: str
+    priority: str
+    started: float = field(default_factory=time.monotonic)
+    model_calls: int = 0
+    model_attempts: int = 0  # Every attempt sent, including failed and retried ones
+    max_model_attempts: Optional[int] = None  # Attempts beyond this fail (ScheduledLlm)
+    prompt_tokens: int = 0
+    response_tokens: int = 0
+    db_round_trips: int = 0
+    db_seconds: float = 0.0
+    upload_bytes: int = 0
+
+
+# Set by the outermost instrumented agent; nested agents (AgentTool child
+# sessions, parallel verifications) add to the same totals
+current_run: contextvars.ContextVar[Optional[RunTotals]] = contextvars.ContextVar("veris_run", default=None)
+
+
+def record_db_query(client: str, operation: str, seconds: float) -> None:
+    """Record one Postgres round-trip"""
+    metrics.observe(DB_QUERY_LATENCY, seconds, client, operation)
+    run = current_run.get()
+    if run:
+        run.db_round_trips += 1
+        run.db_seconds += seconds
+
+
+def record_upload_queued(size: int) -> None:
+    """Attribute queued media bytes to the current run"""
+    run = current_run.get()
+    if run:
+        run.upload_bytes += size
+
+
+def record_upload(backend: str, size: int, seconds: float) -> None:
+    """Record one completed media upload"""
+    metrics.observe(UPLOAD_LATENCY, seconds, backend)
+    metrics.observe(UPLOAD_BYTES, size, backend)
+
+
+# ---------------------------------------------------------------------------
+# Agent callbacks
+# ---------------------------------------------------------------------------
+
+_started: Dict[Tuple[str, ...], Tuple[float, str]] = {}
+_MAX_PENDING = 10000  # Entries orphaned by failed calls are dropped past this
+
+
+def _start(key: Tuple[str, ...], label: str = "") -> None:
+    if len(_started) >= _MAX_PENDING:
+        _started.clear()
+    _started[key] = (time.monotonic(), label)
+
+
+def _elapsed(key: Tuple[str, ...]) -> Tuple[Optional[float], str]:
+    """(seconds since _start, its label), or (None, "") if the start was not seen"""
+    started = _started.pop(key, None)
+    return (None, "") if started is None else (time.monotonic() - started[0], started[1])
+
+
+def record_agent_start(callback_context: CallbackContext) -> None:
+    """Before-agent callback"""
+    from .pipeline.priority import effective_priority
+
+    _start(("agent", callback_context.invocation_id, callback_context.agent_name))
+    if current_run.get() is None:
+        current_run.set(RunTotals(
+            session_id=callback_context.session.id,
+            invocation_id=callback_context.invocation_id,
+            agent=callback_context.agent_name,
+            priority=effective_priority(),
+        ))
+
+
+def record_agent_end(callback_context: CallbackContext) -> None:
+    """After-agent callback; the outermost agent also closes the run totals"""
+    agent = callback_context.agent_name
+    elapsed, _ = _elapsed(("agent", callback_context.invocation_id, agent))
+    if elapsed is not None:
+        metrics.observe(AGENT_LATENCY, elapsed, agent)
+
+    run = current_run.get()
+    if run and run.invocation_id == callback_context.invocation_id and run.agent == agent:
+        current_run.set(None)
+        metrics.observe(RUN_DB_ROUND_TRIPS, run.db_round_trips, agent)
+        metrics.observe(RUN_UPLOAD_BYTES, run.upload_bytes, agent)
+        metrics.observe(RUN_MODEL_CALLS, run.model_calls, agent)
+        totals = asdict(run)
+        totals["seconds"] = round(time.monotonic() - totals.pop("started"), 3)
+        metrics.observe(RUN_LATENCY, totals["seconds"], agent, run.priority)
+        totals["db_seconds"] = round(run.db_seconds, 3)
+        metrics.record_run(run.invocation_id, totals)
+        logger.info(
+            f"📊 {agent} ({run.priority}): {totals['seconds']}s, {run.model_calls} model calls, "
+            f"{run.prompt_tokens}+{run.response_tokens} tokens, {run.db_round_trips} DB round-trips, "
+            f"{run.upload_bytes} bytes uploaded"
+        )
+
+
+async def record_model_start(callback_context: CallbackContext, llm_request: LlmRequest) -> None:
+    """Before-model callback (register last, after callbacks that may short-circuit the call)"""
+    _start(("model", callback_context.invocation_id, callback_context.agent_name), llm_request.model or "")
+
+
+async def record_model_end(callback_context: CallbackContext, llm_response: LlmResponse) -> None:
+    """After-model callback; partial streaming chunks are ignored"""
+    if llm_response.partial:
+        return
+    agent = callback_context.agent_name
+    elapsed, model = _elapsed(("model", callback_context.invocation_id, agent))
+    if elapsed is not None:
+        metrics.observe(MODEL_LATENCY, elapsed, agent, model)
+
+    usage = llm_response.usage_metadata
+    prompt_tokens = (usage.prompt_token_count or 0) if usage else 0
+    response_tokens = (usage.candidates_token_count or 0) if usage else 0
+    metrics.observe(PROMPT_TOKENS, prompt_tokens, agent)
+    metrics.observe(RESPONSE_TOKENS, response_tokens, agent)
+
+    run = current_run.get()
+    if run:
+        run.model_calls += 1
+        run.prompt_tokens += prompt_tokens
+        run.response_tokens += response_tokens
+
+
+async def record_tool_start(tool, args: Dict[str, Any], tool_context) -> None:
+    """Before-tool callback"""
+    _start(("tool", tool_context.invocation_id, tool_context.function_call_id or tool.name))
+
+
+async def record_tool_end(tool, args: Dict[str, Any], tool_context, tool_response: Any) -> None:
+    """After-tool callback"""
+    elapsed, _ = _elapsed(("tool", tool_context.invocation_id, tool_context.function_call_id or tool.name))
+    if elapsed is not None:
+        metrics.observe(TOOL_LATENCY, elapsed, tool_context.agent_name, tool.name)
+
+
+def _with_callback(existing: Any, callback: Any, first: bool = False) -> list:
+    callbacks = [] if existing is None else list(existing) if isinstance(existing, list) else [existing]
+    return [callback, *callbacks] if first else [*callbacks, callback]
+
+
+def instrument_agent(agent):
+    """Register the timing callbacks on an agent (LlmAgent or BaseAgent stage)
+
+    Timing starts run last among before-callbacks and ends run first among
+    after-callbacks, so other callbacks that short-circuit do not skew them.
+    """
+    agent.before_agent_callback = _with_callback(agent.before_agent_callback, record_agent_start)
+    agent.after_agent_callback = _with_callback(agent.after_agent_callback, record_agent_end, first=True)
+    if hasattr(agent, "before_model_callback"):
+        agent.before_model_callback = _with_callback(agent.before_model_callback, record_model_start)
+        agent.after_model_callback = _with_callback(agent.after_model_callback, record_model_end, first=True)
+        agent.before_tool_callback = _with_callback(agent.before_tool_callback, record_tool_start)
+        agent.after_tool_callback = _with_callback(agent.after_tool_callback, record_tool_end, first=True)
+    return agent
+
+
+# ---------------------------------------------------------------------------
+# Exporters
+# ---------------------------------------------------------------------------
+
+_readiness_probe: Optional[Callable[[], Dict[str, Any]]] = None
+
+
+def set_readiness_probe(probe: Callable[[], Dict[str, Any]]) -> None:
+    """Serve probe() on /readyz (200 when its "ready" is true, else 503)"""
+    global _readiness_probe
+    _readiness_probe = probe
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        status = 200
+        path = self.path.split("?")[0]
+        if path == "/metrics":
+            body, content_type = metrics.render_prometheus(), "text/plain; version=0.0.4"
+        elif path == "/metrics.json":
+            body, content_type = json.dumps(metrics.snapshot()), "application/json"
+        elif path == "/healthz":
+            body, content_type = "ok", "text/plain"
+        elif path == "/readyz":
+            report = _readiness_probe() if _readiness_probe else {"ready": False, "checks": {}}
+            body, content_type = json.dumps(report), "application/json"
+            status = 200 if report["ready"] else 503
+        else:
+            self.send_error(404)
+            return
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def dump_metrics(path: str = METRICS_DUMP_PATH) -> None:
+    """Write the JSON snapshot atomically"""
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(metrics.snapshot(), f)
+    os.replace(temp_path, path)
+
+
+def _dump_loop() -> None:
+    while True:
+        time.sleep(METRICS_DUMP_INTERVAL_SECONDS)
+        try:
+            dump_metrics()
+        except Exception as e:
+            logger.error(f"❌ Metrics dump failed: {e}")
+
+
+_exporters_started = False
+
+
+def start_exporters() -> None:
+    """Start the configured exporters in daemon threads (once per process)"""
+    global _exporters_started
+    if _exporters_started:
+        return
+    _exporters_started = True
+
+    if METRICS_PORT:
+        try:
+            server = ThreadingHTTPServer(("0.0.0.0", METRICS_PORT), _MetricsHandler)
+            threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+            logger.info(f"📊 Metrics on :{METRICS_PORT}/metrics")
+        except OSError as e:
+            logger.error(f"❌ Metrics server failed to start: {e}")
+    if METRICS_DUMP_PATH:
+        threading.Thread(target=_dump_loop, name="metrics-dump", daemon=True).start()
+        logger.info(f"📊 Metrics dumped to {METRICS_DUMP_PATH} every {METRICS_DUMP_INTERVAL_SECONDS:.0f}s")
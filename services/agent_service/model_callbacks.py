@@ -1,23 +1,32 @@
 """Model callbacks for handling artifact uploads to GCS"""
+import asyncio
 import logging
 import hashlib
-import os
 from typing import List
 from google.adk.agents.callback_context import CallbackContext
 from google.adk.models import LlmResponse, LlmRequest
-from google.genai.types import Part
-from google.cloud import storage
+from google.genai.types import Blob, Part
+from .media.preprocess import preprocess_media
+from .media.uploader import media_uploader
+from .pipeline.state import CONTENT_ITEM, CONTENT_ITEM_INVOCATION, MEDIA_MARKERS
 
 logger = logging.getLogger(__name__)
 
-GCP_PROJECT = os.getenv("GOOGLE_CLOUD_PROJECT", "veris-478615")
-GOOGLE_CLOUD_BUCKET = os.getenv("GOOGLE_CLOUD_BUCKET", "veris-media")
+FINGERPRINT_SAMPLE_BYTES = 4096
+HASH_CHUNK_BYTES = 1024 * 1024
 
 
 async def before_model_modifier(
     callback_context: CallbackContext, llm_request: LlmRequest
 ) -> LlmResponse | None:
-    """Modify LLM request to include artifact references and upload to GCS."""
+    """Modify LLM request to include artifact references and upload to GCS.
+
+    Inline media already processed in this session is swapped for its stored
+    text marker, so each turn only hashes/uploads media it has not seen.
+    """
+    markers = dict(callback_context.state.get(MEDIA_MARKERS) or {})
+    markers_changed = False
+
     for content in llm_request.contents:
         if not content.parts:
             continue
@@ -26,9 +35,15 @@ async def before_model_modifier(
         for part in content.parts:
             # Handle user-uploaded inline images/videos
             if part.inline_data:
-                processed_parts = await _process_inline_data_part(
-                    part, callback_context
-                )
+                fingerprint = _media_fingerprint(part)
+                if fingerprint in markers:
+                    processed_parts = [Part(text=markers[fingerprint])]
+                else:
+                    processed_parts = await _process_inline_data_part(
+                        part, callback_context
+                    )
+                    markers[fingerprint] = processed_parts[0].text
+                    markers_changed = True
             else:
                 processed_parts = [part]
 
@@ -36,6 +51,9 @@ async def before_model_modifier(
 
         content.parts = modified_parts
 
+    if markers_changed:
+        callback_context.state[MEDIA_MARKERS] = markers
+
 
 async def _process_inline_data_part(
     part: Part, callback_context: CallbackContext
@@ -43,8 +61,9 @@ async def _process_inline_data_part(
     """Process inline data parts (user-uploaded images/videos).
     
     1. Saves as artifact in ADK
-    2. Uploads to GCS for database storage
-    3. Returns text marker with GCS URL + inline media for analysis
+    2. Queues a background upload to GCS for database storage
+    3. Optionally saves a compact preview artifact for claim extraction
+    4. Returns text marker with GCS URL + inline media for analysis
     """
     artifact_id = _generate_artifact_id(part)
     mime_type = part.inline_data.mime_type
@@ -54,55 +73,104 @@ async def _process_inline_data_part(
     logger.info(f"🔑 Artifact ID: {artifact_id}")
 
     # Save artifact
-    if artifact_id not in await callback_context.list_artifacts():
+    existing_artifacts = await callback_context.list_artifacts()
+    if artifact_id not in existing_artifacts:
         await callback_context.save_artifact(filename=artifact_id, artifact=part)
         logger.info(f"💾 Saved artifact: {artifact_id}")
 
     # Upload to GCS
-    gcs_url = await _upload_to_gcs(part, artifact_id)
+    gcs_url = await _upload_media(part, artifact_id)
     logger.info(f"☁️ GCS URL: {gcs_url}")
+    _record_uploaded_media(callback_context, mime_type, gcs_url)
 
-    return [
-        Part(text=f"[User Uploaded Media]\nFile: {display_name}\nArtifact ID: {artifact_id}\nGCS URL: {gcs_url}"),
-    ]
+    marker = f"[User Uploaded Media]\nFile: {display_name}\nArtifact ID: {artifact_id}\nGCS URL: {gcs_url}"
 
+    # Compact preview for extraction (original stays in GCS)
+    preview = await asyncio.to_thread(preprocess_media, part.inline_data.data, mime_type)
+    if preview:
+        preview_id = f"{artifact_id.rsplit('.', 1)[0]}_preview.jpg"
+        if preview_id not in existing_artifacts:
+            await callback_context.save_artifact(
+                filename=preview_id,
+                artifact=Part(inline_data=Blob(
+                    mime_type=preview.mime_type, data=preview.data, display_name=preview_id
+                )),
+            )
+        logger.info(f"🗜️ Preview artifact {preview_id}: {preview.report}")
+        marker += f"\nPreview Artifact ID: {preview_id}"
 
-async def _upload_to_gcs(part: Part, artifact_id: str) -> str:
-    """Upload artifact to Google Cloud Storage and return public URL."""
-    try:
-        if not GCP_PROJECT:
-            logger.warning("⚠️ GOOGLE_CLOUD_PROJECT not set, skipping GCS upload")
-            return f"artifact://{artifact_id}"
-
-        # Initialize GCS client
-        storage_client = storage.Client(project=GCP_PROJECT)
-        bucket = storage_client.bucket(GOOGLE_CLOUD_BUCKET)
-        
-        # Determine folder based on mime type
-        mime_type = part.inline_data.mime_type
-        if mime_type.startswith("image/"):
-            folder = "images"
-        elif mime_type.startswith("video/"):
-            folder = "videos"
-        else:
-            folder = "media"
-        
-        blob_path = f"{folder}/{artifact_id}"
-        blob = bucket.blob(blob_path)
-
-        # Upload
-        image_data = part.inline_data.data
-        blob.upload_from_string(image_data, content_type=mime_type)
-        blob.make_public()
-
-        public_url = blob.public_url
-        logger.info(f"Uploaded to GCS: {public_url}")
-
-        return public_url
+    return [Part(text=marker)]
+
+
+def _record_uploaded_media(
+    callback_context: CallbackContext, mime_type: str, gcs_url: str
+) -> None:
+    """Record the upload as the session's content item so the save stage can use it.
+
+    Uploads of one turn accumulate; the first upload of a later turn starts a new item.
+    """
+    if mime_type.startswith("image/"):
+        content_type, field = "image", "images"
+    elif mime_type.startswith("video/"):
+        content_type, field = "video", "videos"
+    else:
+        return
+
+    content_item = dict(callback_context.state.get(CONTENT_ITEM) or {})
+    if (
+        content_item.get("content_type") != content_type
+        or callback_context.state.get(CONTENT_ITEM_INVOCATION) != callback_context.invocation_id
+    ):
+        content_item = {"source": "User Upload", "url": "user_upload", "content_type": content_type}
+        callback_context.state[CONTENT_ITEM_INVOCATION] = callback_context.invocation_id
+
+    urls = content_item.get(field) or []
+    if gcs_url not in urls:
+        content_item[field] = urls + [gcs_url]
+        callback_context.state[CONTENT_ITEM] = content_item
+
+
+async def _upload_media(part: Part, artifact_id: str) -> str:
+    """Queue artifact upload to media storage and return its URL right away.
+
+    The URL is derived from the content-addressed artifact ID, so the model
+    request does not wait for the upload itself.
+    """
+    mime_type = part.inline_data.mime_type
+    if mime_type.startswith("image/"):
+        folder = "images"
+    elif mime_type.startswith("video/"):
+        folder = "videos"
+    else:
+        folder = "media"
 
+    try:
+        url = await media_uploader.submit(
+            f"{folder}/{artifact_id}", part.inline_data.data, mime_type
+        )
     except Exception as e:
         logger.error(f"GCS upload failed: {e}")
-        return f"artifact://{artifact_id}"
+        url = None
+
+    return url or f"artifact://{artifact_id}"
+
+
+def _media_fingerprint(part: Part) -> str:
+    """Cheap identity of inline media: mime, name, size and sampled bytes.
+
+    Reads at most three small slices instead of hashing the whole payload.
+    """
+    data = part.inline_data.data
+    size = len(data)
+
+    fingerprint = hashlib.blake2b(digest_size=16)
+    fingerprint.update(
+        f"{part.inline_data.mime_type}|{part.inline_data.display_name}|{size}".encode("utf-8")
+    )
+    view = memoryview(data)
+    for start in (0, max(0, (size - FINGERPRINT_SAMPLE_BYTES) // 2), max(0, size - FINGERPRINT_SAMPLE_BYTES)):
+        fingerprint.update(view[start:start + FINGERPRINT_SAMPLE_BYTES])
+    return fingerprint.hexdigest()
 
 
 def _generate_artifact_id(part: Part) -> str:
@@ -112,11 +180,13 @@ def _generate_artifact_id(part: Part) -> str:
         Hash-based artifact ID with proper file extension.
     """
     filename = part.inline_data.display_name or "uploaded_media"
-    media_data = part.inline_data.data
+    media_data = memoryview(part.inline_data.data)
 
-    # Combine filename and data for hash
-    hash_input = filename.encode("utf-8") + media_data
-    content_hash = hashlib.sha256(hash_input).hexdigest()[:16]
+    # Hash filename + data incrementally, without concatenating (copying) the payload
+    hasher = hashlib.sha256(filename.encode("utf-8"))
+    for start in range(0, len(media_data), HASH_CHUNK_BYTES):
+        hasher.update(media_data[start:start + HASH_CHUNK_BYTES])
+    content_hash = hasher.hexdigest()[:16]
 
     # Extract file extension from mime type
     mime_type = part.inline_data.mime_type
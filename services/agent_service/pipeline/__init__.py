@@ -0,0 +1 @@
+"""Deterministic (non-LLM) pipeline stages and session-state helpers"""
@@ -0,0 +1,58 @@
+"""Run an agent in an isolated in-memory session, outside the orchestrator"""
+import logging
+from typing import Any, Dict, Optional, Tuple, Union
+from google.adk.agents import BaseAgent
+from google.adk.runners import InMemoryRunner
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+
+async def run_agent(
+    agent: BaseAgent,
+    request: Union[str, types.Content],
+    state: Optional[Dict[str, Any]] = None,
+    user_id: str = "pipeline",
+) -> Tuple[str, Dict[str, Any]]:
+    """Run agent once on a request in a fresh session
+
+    Each call gets its own session, so concurrent runs of the same agent do not
+    overwrite each other's output_key.
+
+    Args:
+        agent: Agent to run
+        request: User message text, or a full message (e.g. with inline media)
+        state: Initial session state
+        user_id: Session user ID
+
+    Returns:
+        tuple: Final response text and final session state
+    """
+    runner = InMemoryRunner(agent=agent, app_name=agent.name)
+    try:
+        session = await runner.session_service.create_session(
+            app_name=agent.name, user_id=user_id, state=dict(state or {})
+        )
+        message = (
+            request if isinstance(request, types.Content)
+            else types.Content(role="user", parts=[types.Part(text=request)])
+        )
+
+        text = ""
+        async for event in runner.run_async(
+            user_id=user_id, session_id=session.id, new_message=message
+        ):
+            if event.partial or not event.content or not event.content.parts:
+                continue
+            event_text = "".join(
+                part.text for part in event.content.parts if part.text and not part.thought
+            )
+            if event_text:
+                text = event_text
+
+        session = await runner.session_service.get_session(
+            app_name=agent.name, user_id=user_id, session_id=session.id
+        )
+        return text, dict(session.state)
+    finally:
+        await runner.close()
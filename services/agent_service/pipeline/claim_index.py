@@ -0,0 +1,391 @@
+"""Near-duplicate claim index (MinHash + LSH banding), persisted in Postgres
+
+Paraphrased claims ("Q4 2024 inflation" vs "inflation in the fourth quarter of
+2024") hash differently, so exact claim_hash lookups miss them. Each claim is
+reduced to a canonical token set, signed with MinHash and bucketed per band;
+a lookup only compares against claims sharing at least one band bucket.
+
+Figures are kept whole ("5.2", "95%") and must match exactly: claims that
+differ only in a number are different claims, however similar the words.
+
+Every signature is stored in claim_signatures and bucketed in claim_bands
+(migration 007), so lookups stay a few index probes with millions of claims.
+Recently added or matched claims are also kept in memory (about 1 KB each, at
+most NEAR_DUP_MAX_CLAIMS, older half dropped when full) and checked first.
+Claims stored before migration 007 are signed by running this module.
+"""
+import argparse
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import re
+import struct
+import sys
+import zlib
+from array import array
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple, Union
+from ..database import async_db_client
+from ..database.operations import normalize_claim_text
+from ..metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+NEAR_DUP_ENABLED = os.getenv("NEAR_DUP_ENABLED", "true").lower() == "true"
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.8"))
+NEAR_DUP_MAX_CLAIMS = int(os.getenv("NEAR_DUP_MAX_CLAIMS", "100000"))
+NUM_PERM = 32
+BANDS = 8  # 4 rows per band: candidate probability ~0.98 at similarity 0.8
+BACKFILL_BATCH_SIZE = 1000
+MAX_STORED_CANDIDATES = 200  # Per lookup; bounds the cost of crowded buckets
+
+_PRIME = 4294967311  # smallest prime above 2**32
+_MASK = 0xFFFFFFFF
+
+CANONICAL_TOKENS = {
+    "q1": "first quarter",
+    "q2": "second quarter",
+    "q3": "third quarter",
+    "q4": "fourth quarter",
+    "pct": "percent",
+    "per cent": "percent",
+    "bn": "billion",
+    "mn": "million",
+    "us": "united states",
+    "usa": "united states",
+    "uk": "united kingdom",
+}
+# A figure with its unit glued on: "95 %", "95 per cent" and "95pct" all become "95%"
+_PERCENT = re.compile(r"(\d)\s*(?:%|per\s*cent\b|pct\b|percent\b)")
+# Whole numbers, decimals, thousands separators and percents; not digits inside words ("q4", "covid19")
+_NUMBER = re.compile(r"(?<![a-z0-9.,])\d+(?:[.,]\d+)*%?(?![a-z0-9])")
+_CANONICAL = re.compile(r"\b(" + "|".join(re.escape(k) for k in CANONICAL_TOKENS) + r")\b")
+
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "at", "to", "for", "by", "and", "or",
+    "is", "are", "was", "were", "be", "been", "has", "have", "had", "that",
+    "this", "it", "its", "as", "with", "from", "during", "than", "said", "says",
+    "claimed", "claims", "reported", "according",
+}
+
+
+def _split_numbers(claim: str) -> Tuple[FrozenSet[str], str]:
+    """(numbers in the claim, claim text without them)"""
+    text = _PERCENT.sub(r"\1%", claim.lower())
+    numbers = frozenset(
+        match.group(0).replace(",", "") if re.fullmatch(r"\d{1,3}(,\d{3})+%?", match.group(0)) else match.group(0)
+        for match in _NUMBER.finditer(text)
+    )
+    return numbers, _NUMBER.sub(" ", text)
+
+
+def claim_numbers(claim: str) -> FrozenSet[str]:
+    """Figures in a claim, whole ("5.2", "95%", "1,000" as "1000")"""
+    return _split_numbers(claim)[0]
+
+
+def claim_tokens(claim: str) -> Set[str]:
+    """Canonical token set of a claim (word order and filler words ignored, figures whole)"""
+    numbers, text = _split_numbers(claim)
+    text = _CANONICAL.sub(lambda match: CANONICAL_TOKENS[match.group(1)], normalize_claim_text(text))
+    return {token for token in text.split() if token not in STOPWORDS} | numbers
+
+
+def _numbers_key(claim: str) -> int:
+    return zlib.crc32(" ".join(sorted(claim_numbers(claim))).encode())
+
+
+def _pack(values: List[int]) -> bytes:
+    return struct.pack(f"<{len(values)}I", *values)
+
+
+FIND_STORED_SQL = """
+    SELECT s.claim_hash, s.signature
+    FROM claim_bands b
+    JOIN claim_signatures s ON s.claim_hash = b.claim_hash
+    WHERE (b.band, b.bucket) IN (SELECT * FROM unnest(%s::smallint[], %s::bigint[]))
+      AND s.numbers_key = %s
+    LIMIT %s
+"""
+# Distinct stored claims not signed yet, in claim_hash order (migration 005 index)
+UNSIGNED_CLAIMS_SQL = """
+    SELECT DISTINCT ON (cc.claim_hash) cc.claim_hash, cc.claim
+    FROM crawled_content cc
+    WHERE cc.claim_hash > %s AND cc.claim IS NOT NULL
+      AND NOT EXISTS (SELECT 1 FROM claim_signatures s WHERE s.claim_hash = cc.claim_hash)
+    ORDER BY cc.claim_hash
+    LIMIT %s
+"""
+
+
+class ClaimIndex:
+    """MinHash LSH index mapping claim_hash -> signature, with band buckets
+
+    add()/find() work on the in-memory part only; aadd()/afind() also write to
+    and search the claim_bands tables when persistent.
+    """
+
+    def __init__(
+        self,
+        threshold: float = NEAR_DUP_THRESHOLD,
+        num_perm: int = NUM_PERM,
+        bands: int = BANDS,
+        max_claims: int = NEAR_DUP_MAX_CLAIMS,
+        persistent: bool = False,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        self.threshold = threshold
+        self.max_claims = max(1, max_claims)
+        self.persistent = persistent
+        self.evicted = 0
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = random.Random(1)
+        self._perms = [(rng.randrange(1, _PRIME), rng.randrange(0, _PRIME)) for _ in range(num_perm)]
+
+        self._signatures = array("I")  # num_perm values per indexed claim
+        self._number_keys = array("I")  # Hash of each claim's figures; a match needs the same
+        self._keys: List[str] = []
+        self._positions: Dict[str, int] = {}
+        # Per band: bucket hash -> claim position (int) or positions (list) on collision
+        self._buckets: List[Dict[int, Union[int, List[int]]]] = [{} for _ in range(bands)]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def signature(self, claim: str) -> Optional[List[int]]:
+        """MinHash signature, or None for claims with no content tokens"""
+        token_hashes = [zlib.crc32(token.encode()) for token in claim_tokens(claim)]
+        if not token_hashes:
+            return None
+        return [
+            min([(a * value + b) % _PRIME for value in token_hashes]) & _MASK
+            for a, b in self._perms
+        ]
+
+    def _band_keys(self, signature: List[int]) -> List[int]:
+        """Stable 64-bit bucket per band (the same in every process, as stored in claim_bands)"""
+        return [
+            int.from_bytes(
+                hashlib.blake2b(_pack(signature[band * self.rows:(band + 1) * self.rows]), digest_size=8).digest(),
+                "little", signed=True,
+            )
+            for band in range(self.bands)
+        ]
+
+    def _similarity(self, signature: List[int], stored) -> float:
+        return sum(1 for x, y in zip(signature, stored) if x == y) / self.num_perm
+
+    def add(self, key: str, claim: str) -> None:
+        """Index a claim in memory under its claim_hash (no-op if already indexed)"""
+        if key in self._positions:
+            return
+        signature = self.signature(claim)
+        if signature is not None:
+            self._remember(key, signature, _numbers_key(claim))
+
+    def _remember(self, key: str, signature: List[int], numbers_key: int) -> None:
+        if key in self._positions:
+            return
+        if len(self._keys) >= self.max_claims:
+            self._evict_oldest(len(self._keys) // 2 or 1)
+        self._append(key, signature, numbers_key)
+
+    def _append(self, key: str, signature: List[int], numbers_key: int) -> None:
+        position = len(self._keys)
+        self._keys.append(key)
+        self._positions[key] = position
+        self._signatures.extend(signature)
+        self._number_keys.append(numbers_key)
+
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            existing = buckets.get(band_key)
+            if existing is None:
+                buckets[band_key] = position
+            elif isinstance(existing, list):
+                existing.append(position)
+            else:
+                buckets[band_key] = [existing, position]
+
+    def _evict_oldest(self, count: int) -> None:
+        """Drop the count earliest-added claims and rebuild the buckets from the rest"""
+        keys, signatures, number_keys = self._keys[count:], self._signatures, self._number_keys
+        self.clear()
+        for offset, key in enumerate(keys, start=count):
+            start = offset * self.num_perm
+            self._append(key, list(signatures[start:start + self.num_perm]), number_keys[offset])
+        self.evicted += count
+        metrics.inc("veris_near_dup_evictions_total", {}, count)
+        logger.info(f"♻️ Near-duplicate memory full, dropped the {count} oldest claims (still stored)")
+
+    def clear(self) -> None:
+        """Remove every indexed claim"""
+        self._signatures = array("I")
+        self._number_keys = array("I")
+        self._keys.clear()
+        self._positions.clear()
+        for buckets in self._buckets:
+            buckets.clear()
+
+    def find(self, claim: str) -> Optional[Tuple[str, float]]:
+        """Most similar indexed claim at or above the threshold
+
+        Returns:
+            tuple: (claim_hash, estimated Jaccard similarity) or None
+        """
+        signature = self.signature(claim)
+        if signature is None:
+            return None
+        return self._find(signature, _numbers_key(claim))
+
+    def _find(self, signature: List[int], numbers_key: int) -> Optional[Tuple[str, float]]:
+        candidates: Set[int] = set()
+        for buckets, band_key in zip(self._buckets, self._band_keys(signature)):
+            bucket = buckets.get(band_key)
+            if isinstance(bucket, list):
+                candidates.update(bucket)
+            elif bucket is not None:
+                candidates.add(bucket)
+
+        best: Optional[Tuple[str, float]] = None
+        for position in candidates:
+            if self._number_keys[position] != numbers_key:
+                continue  # Different figures: never the same claim
+            start = position * self.num_perm
+            similarity = self._similarity(signature, self._signatures[start:start + self.num_perm])
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (self._keys[position], similarity)
+        return best
+
+    # Persistent index (claim_signatures / claim_bands)
+
+    async def afind(self, claim: str) -> Optional[Tuple[str, float]]:
+        """find(), then the stored index for claims not held in memory"""
+        signature = self.signature(claim)
+        if signature is None:
+            return None
+        numbers_key = _numbers_key(claim)
+        match = self._find(signature, numbers_key)
+        if match is not None or not self.persistent:
+            return match
+
+        try:
+            result = await async_db_client.query(
+                FIND_STORED_SQL,
+                (list(range(self.bands)), self._band_keys(signature), numbers_key, MAX_STORED_CANDIDATES),
+            )
+        except RuntimeError:
+            return None  # Database not connected: in-memory index only
+        best: Optional[Tuple[str, float, Tuple[int, ...]]] = None
+        for row in result.get("rows") or []:
+            stored = struct.unpack(f"<{self.num_perm}I", bytes(row["signature"]))
+            similarity = self._similarity(signature, stored)
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (row["claim_hash"], similarity, stored)
+        if best is None:
+            return None
+        self._remember(best[0], list(best[2]), numbers_key)
+        return best[0], best[1]
+
+    async def aadd(self, key: str, claim: str) -> None:
+        """add(), also storing the signature when persistent"""
+        if key in self._positions:
+            return
+        signature = self.signature(claim)
+        if signature is None:
+            return
+        entry = (key, signature, _numbers_key(claim))
+        self._remember(*entry)
+        if self.persistent:
+            try:
+                await self._store([entry])
+            except Exception as e:
+                logger.warning(f"⚠️ Could not store near-duplicate signature: {e}")
+
+    async def _store(self, entries: List[Tuple[str, List[int], int]]) -> None:
+        """Insert signatures and their band buckets in one statement (existing ones are kept)"""
+        bands = [
+            (band, bucket, key)
+            for key, signature, _ in entries
+            for band, bucket in enumerate(self._band_keys(signature))
+        ]
+        result = await async_db_client.query(
+            "WITH signatures AS ("
+            " INSERT INTO claim_signatures (claim_hash, signature, numbers_key) VALUES "
+            + ", ".join(["(%s, %s, %s)"] * len(entries))
+            + " ON CONFLICT (claim_hash) DO NOTHING) "
+            "INSERT INTO claim_bands (band, bucket, claim_hash) VALUES "
+            + ", ".join(["(%s, %s, %s)"] * len(bands))
+            + " ON CONFLICT DO NOTHING",
+            [
+                *(value for key, signature, numbers_key in entries for value in (key, _pack(signature), numbers_key)),
+                *(value for band in bands for value in band),
+            ],
+        )
+        if "error" in result:
+            raise RuntimeError(result["error"])
+
+    def _sign_rows(self, rows: List[Dict[str, Any]]) -> List[Tuple[str, List[int], int]]:
+        entries = []
+        for row in rows:
+            signature = self.signature(row["claim"])
+            if signature is not None:
+                entries.append((row["claim_hash"], signature, _numbers_key(row["claim"])))
+        return entries
+
+    async def backfill(self, batch_size: int = BACKFILL_BATCH_SIZE) -> int:
+        """Sign stored claims that have no claim_signatures row yet (resumable)
+
+        Signatures are computed in a worker thread, so an event loop serving
+        requests meanwhile stays responsive.
+
+        Returns:
+            int: Number of claims signed
+        """
+        after, signed = "", 0
+        while True:
+            result = await async_db_client.query(UNSIGNED_CLAIMS_SQL, (after, batch_size))
+            if "error" in result:
+                raise RuntimeError(result["error"])
+            rows = result.get("rows")
+            if not rows:
+                break
+            entries = await asyncio.to_thread(self._sign_rows, rows)
+            if entries:
+                await self._store(entries)
+            signed += len(entries)
+            after = rows[-1]["claim_hash"]
+            logger.info(f"✍️ Signed {signed} stored claims")
+        return signed
+
+
+claim_index = ClaimIndex(persistent=True)
+
+
+async def main(argv=None) -> int:
+    """Sign claims stored before migration 007 into the persistent index"""
+    parser = argparse.ArgumentParser(description="Backfill the near-duplicate claim index")
+    parser.add_argument("--batch-size", type=int, default=BACKFILL_BATCH_SIZE, help="Claims per query")
+    args = parser.parse_args(argv)
+
+    project_id = os.getenv("NEON_PROJECT_ID", "")
+    if not project_id:
+        logger.error("❌ NEON_PROJECT_ID required")
+        return 2
+    async_db_client.connect(project_id, os.getenv("NEON_DATABASE_NAME", "neondb"))
+    try:
+        signed = await claim_index.backfill(args.batch_size)
+    finally:
+        await async_db_client.disconnect()
+    logger.info(f"✅ Near-duplicate index backfilled: {signed} claims")
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,212 @@
+"""Context compaction for the orchestrator: finished tool exchanges shrink to summaries
+
+Every pipeline tool call stays in the root agent's history, so without
+compaction each orchestration call re-sends all earlier extraction output,
+verdicts and save results, and prompt size grows with every claim and article.
+Before each model call, exchanges the model has already acted on (anything
+before its latest turn) are rewritten:
+
+- claim_extraction_agent responses → claim count, content type and summary
+- verify_claims_agent responses → claim_id + verification_status per claim
+- save_verified_claim_agent responses → success, saved count, error count
+- function call arguments → truncated to CONTEXT_KEEP_ARG_CHARS
+- media markers already extracted from → artifact ID only
+
+The full responses are kept in state['compacted_tool_results'] (keyed by call
+id, or tool name and history position). Only the request copy is rewritten;
+session events are untouched. Register after before_model_modifier, which turns
+inline media into the markers compacted here.
+"""
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+from ..metrics import TOKEN_BUCKETS, metrics
+from .state import COMPACTED_TOOL_RESULTS, parse_agent_json
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_COMPACTION_ENABLED = os.getenv("CONTEXT_COMPACTION_ENABLED", "true").lower() == "true"
+CONTEXT_KEEP_ARG_CHARS = int(os.getenv("CONTEXT_KEEP_ARG_CHARS", "200"))
+
+CHARS_PER_TOKEN = 4
+MEDIA_PART_TOKENS = 258  # Gemini's per-image cost; inline media normally became a marker already
+MEDIA_MARKER = "[User Uploaded Media]"
+
+CONTEXT_TOKENS = metrics.histogram(
+    "veris_context_tokens", "Estimated prompt tokens per model call, before/after compaction",
+    ["agent", "stage"], TOKEN_BUCKETS,
+)
+
+
+def estimate_tokens(contents: List[types.Content]) -> int:
+    """Rough prompt size: text and serialized function calls/responses at CHARS_PER_TOKEN"""
+    chars = media = 0
+    for content in contents:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            elif part.function_call:
+                chars += len(part.function_call.name or "") + len(json.dumps(part.function_call.args or {}, default=str))
+            elif part.function_response:
+                chars += len(part.function_response.name or "") + len(json.dumps(part.function_response.response or {}, default=str))
+            elif part.inline_data or part.file_data:
+                media += 1
+    return chars // CHARS_PER_TOKEN + media * MEDIA_PART_TOKENS
+
+
+def _tool_output(response: Optional[Dict[str, Any]]) -> Any:
+    """Parsed agent output from an AgentTool response ({"result": text})"""
+    if not isinstance(response, dict):
+        return None
+    return parse_agent_json(response.get("result", response))
+
+
+def _summarize_extraction(output: Any) -> Optional[Dict[str, Any]]:
+    if not isinstance(output, dict):
+        return None
+    claims = output.get("extracted_claims")
+    return {
+        "claims": len(claims) if isinstance(claims, list) else 0,
+        "content_type": output.get("content_type"),
+        "content_summary": output.get("content_summary"),
+    }
+
+
+def _summarize_verification(output: Any) -> Optional[List[Dict[str, Any]]]:
+    if not isinstance(output, list):
+        return None
+    return [
+        {
+            "claim_id": result.get("claim_id"),
+            "verification_status": result.get("verification_status"),
+            **({"error": True} if result.get("error") else {}),
+        }
+        for result in output if isinstance(result, dict)
+    ]
+
+
+def _summarize_save(output: Any) -> Optional[Dict[str, Any]]:
+    if not isinstance(output, dict):
+        return None
+    return {
+        "success": output.get("success"),
+        "saved": output.get("saved"),
+        "errors": len(output.get("errors") or []),
+    }
+
+
+SUMMARIZERS = {
+    "claim_extraction_agent": _summarize_extraction,
+    "verify_claims_agent": _summarize_verification,
+    "save_verified_claim_agent": _summarize_save,
+}
+
+
+def _compact_response(
+    part: types.Part, key: str, archive: Dict[str, Any]
+) -> Optional[types.Part]:
+    """Summary part for a finished tool response, or None to keep it as is"""
+    response = part.function_response
+    summarize = SUMMARIZERS.get(response.name)
+    summary = summarize(_tool_output(response.response)) if summarize else None
+    if summary is None:
+        return None
+    archive.setdefault(key, response.response)
+    return types.Part(function_response=types.FunctionResponse(
+        id=response.id, name=response.name, response={"result": json.dumps(summary), "compacted": True},
+    ))
+
+
+def _compact_call(part: types.Part) -> Optional[types.Part]:
+    """Call part with long string arguments truncated, or None if nothing is long"""
+    call = part.function_call
+    args = call.args or {}
+    if not any(isinstance(value, str) and len(value) > CONTEXT_KEEP_ARG_CHARS for value in args.values()):
+        return None
+    truncated = {
+        name: f"{value[:CONTEXT_KEEP_ARG_CHARS]}… [{len(value)} chars]"
+        if isinstance(value, str) and len(value) > CONTEXT_KEEP_ARG_CHARS else value
+        for name, value in args.items()
+    }
+    return types.Part(function_call=types.FunctionCall(id=call.id, name=call.name, args=truncated))
+
+
+def _compact_marker(text: str) -> str:
+    artifact_ids = [
+        line.split(":", 1)[1].strip() for line in text.splitlines()
+        if line.startswith(("Artifact ID:", "Preview Artifact ID:"))
+    ]
+    return f"{MEDIA_MARKER} {', '.join(artifact_ids)} (claims already extracted)"
+
+
+def compact_contents(
+    contents: List[types.Content], archive: Dict[str, Any]
+) -> Tuple[List[types.Content], int]:
+    """Rewrite finished exchanges in a request's contents
+
+    Args:
+        contents: Request contents (copies of session events; not mutated)
+        archive: Receives the full response of every compacted tool call
+
+    Returns:
+        tuple: New contents list and the number of parts rewritten
+    """
+    last_model = max((index for index, content in enumerate(contents) if content.role == "model"), default=-1)
+    extracted_after = [False] * len(contents)
+    seen_extraction = False
+    for index in range(len(contents) - 1, -1, -1):
+        extracted_after[index] = seen_extraction
+        seen_extraction = seen_extraction or any(
+            part.function_response and part.function_response.name == "claim_extraction_agent"
+            for part in contents[index].parts or []
+        )
+
+    compacted: List[types.Content] = []
+    rewritten = 0
+    for index, content in enumerate(contents):
+        if index >= last_model or not content.parts:
+            compacted.append(content)
+            continue
+
+        parts, changed = [], 0
+        for part in content.parts:
+            replacement = None
+            if part.function_response:
+                key = part.function_response.id or f"{part.function_response.name}#{index}"
+                replacement = _compact_response(part, key, archive)
+            elif part.function_call:
+                replacement = _compact_call(part)
+            elif part.text and part.text.startswith(MEDIA_MARKER) and extracted_after[index]:
+                replacement = types.Part(text=_compact_marker(part.text))
+            parts.append(replacement or part)
+            changed += replacement is not None
+        compacted.append(content.model_copy(update={"parts": parts}) if changed else content)
+        rewritten += changed
+    return compacted, rewritten
+
+
+async def compact_model_context(
+    callback_context: CallbackContext, llm_request: LlmRequest
+) -> Optional[LlmResponse]:
+    """Before-model callback: compact finished tool exchanges and log the token saving"""
+    agent = callback_context.agent_name
+    before = estimate_tokens(llm_request.contents)
+    metrics.observe(CONTEXT_TOKENS, before, agent, "before")
+    if not CONTEXT_COMPACTION_ENABLED:
+        return None
+
+    archive = dict(callback_context.state.get(COMPACTED_TOOL_RESULTS) or {})
+    archived = len(archive)
+    llm_request.contents, rewritten = compact_contents(llm_request.contents, archive)
+    if len(archive) != archived:
+        callback_context.state[COMPACTED_TOOL_RESULTS] = archive
+
+    after = estimate_tokens(llm_request.contents)
+    metrics.observe(CONTEXT_TOKENS, after, agent, "after")
+    if rewritten:
+        logger.info(f"✂️ {agent} context: ~{before} → ~{after} tokens ({rewritten} parts compacted)")
+    return None
@@ -0,0 +1,213 @@
+"""Chunked extraction stage: extract claims from long text in parallel windows
+
+Content whose raw_text reaches EXTRACT_CHUNKING_MIN_CHARS is split into
+paragraph-aligned windows of up to EXTRACT_WINDOW_CHARS that overlap by up to
+EXTRACT_WINDOW_OVERLAP_CHARS. The extractor runs on the windows concurrently,
+and the per-window claims are merged, with claims repeated across overlapping
+windows (exact or near-duplicate) kept once. Shorter content and media go to
+the extractor unchanged.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+from typing import Any, AsyncGenerator, Dict, List, Optional
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+from .agent_runner import run_agent
+from .claim_index import NEAR_DUP_THRESHOLD, claim_numbers, claim_tokens
+from .state import CONTENT_ITEM, EXTRACTED_CLAIMS, parse_agent_json
+
+logger = logging.getLogger(__name__)
+
+EXTRACT_CHUNKING_MIN_CHARS = int(os.getenv("EXTRACT_CHUNKING_MIN_CHARS", "20000"))
+EXTRACT_WINDOW_CHARS = int(os.getenv("EXTRACT_WINDOW_CHARS", "12000"))
+EXTRACT_WINDOW_OVERLAP_CHARS = int(os.getenv("EXTRACT_WINDOW_OVERLAP_CHARS", "1000"))
+EXTRACT_CONCURRENCY = int(os.getenv("EXTRACT_CONCURRENCY", "4"))
+EXTRACT_TIMEOUT_SECONDS = float(os.getenv("EXTRACT_TIMEOUT_SECONDS", "300"))
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def extraction_request(content_item: Dict[str, Any], text: Optional[str] = None) -> str:
+    """Text request for the extractor: content headers, then text (default: the item's raw_text)"""
+    metadata = content_item.get("metadata") or {}
+    lines = []
+    for field, label in (("source", "Source"), ("url", "URL")):
+        if content_item.get(field):
+            lines.append(f"{label}: {content_item[field]}")
+    if metadata.get("title"):
+        lines.append(f"Title: {metadata['title']}")
+    for field, label in (("images", "Image URL"), ("videos", "Video URL")):
+        lines.extend(f"{label}: {url}" for url in content_item.get(field) or [])
+    text = content_item.get("raw_text") if text is None else text
+    if text:
+        lines.extend(["", text] if lines else [text])
+    return "\n".join(lines)
+
+
+def _pieces(text: str, window_chars: int) -> List[str]:
+    """Paragraphs, with oversized ones split at sentence ends (or hard-wrapped)"""
+    pieces = []
+    for paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = paragraph.strip()
+        if len(paragraph) <= window_chars:
+            if paragraph:
+                pieces.append(paragraph)
+            continue
+        buffer = ""
+        for sentence in _SENTENCE_END.split(paragraph):
+            while len(sentence) > window_chars:
+                if buffer:
+                    pieces.append(buffer)
+                    buffer = ""
+                pieces.append(sentence[:window_chars])
+                sentence = sentence[window_chars:]
+            if buffer and len(buffer) + 1 + len(sentence) > window_chars:
+                pieces.append(buffer)
+                buffer = sentence
+            else:
+                buffer = f"{buffer} {sentence}" if buffer else sentence
+        if buffer:
+            pieces.append(buffer)
+    return pieces
+
+
+def split_windows(
+    text: str, window_chars: int = EXTRACT_WINDOW_CHARS, overlap_chars: int = EXTRACT_WINDOW_OVERLAP_CHARS
+) -> List[str]:
+    """Paragraph-aligned windows; each repeats trailing paragraphs of the previous one up to overlap_chars"""
+    pieces = _pieces(text, window_chars)
+    windows = []
+    start = 0
+    while start < len(pieces):
+        end, size = start, 0
+        while end < len(pieces) and (end == start or size + len(pieces[end]) + 2 <= window_chars):
+            size += len(pieces[end]) + 2
+            end += 1
+        windows.append("\n\n".join(pieces[start:end]))
+        if end >= len(pieces):
+            break
+        back, carried = end, 0
+        while back - 1 > start and carried + len(pieces[back - 1]) <= overlap_chars:
+            back -= 1
+            carried += len(pieces[back])
+        start = back
+    return windows
+
+
+def merge_extractions(outputs: List[Dict[str, Any]], content_type: str = "text") -> Dict[str, Any]:
+    """One extracted_claims document from per-window outputs, near-duplicates dropped
+
+    Claims whose figures differ ("rose 12%" / "rose 21%") are never duplicates.
+    """
+    claims: List[Dict[str, Any]] = []
+    kept = []
+    for output in outputs:
+        for claim in output.get("extracted_claims") or []:
+            if not isinstance(claim, dict) or not claim.get("claim"):
+                continue
+            tokens, numbers = claim_tokens(claim["claim"]), claim_numbers(claim["claim"])
+            if any(
+                numbers == other_numbers
+                and len(tokens & other) / max(1, len(tokens | other)) >= NEAR_DUP_THRESHOLD
+                for other, other_numbers in kept
+            ):
+                continue
+            kept.append((tokens, numbers))
+            claims.append(claim)
+
+    summaries = [output.get("content_summary") for output in outputs if output.get("content_summary")]
+    return {
+        "extracted_claims": claims,
+        "content_summary": summaries[0] if summaries else "",
+        "content_type": content_type,
+    }
+
+
+async def extract_windows(
+    extractor: BaseAgent,
+    content_item: Dict[str, Any],
+    windows: List[str],
+    concurrency: int = EXTRACT_CONCURRENCY,
+    timeout: float = EXTRACT_TIMEOUT_SECONDS,
+) -> Dict[str, Any]:
+    """Run extractor on every window concurrently and merge the results
+
+    Returns:
+        dict: Merged extraction output plus "windows" and "failed_windows";
+            "error" is set when no window produced parseable output
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def extract_one(index: int, window: str) -> Optional[Dict[str, Any]]:
+        request = extraction_request(
+            content_item,
+            f"[Part {index + 1} of {len(windows)} of a longer text; extract claims from this part only]\n\n{window}",
+        )
+        async with semaphore:
+            try:
+                text, _ = await asyncio.wait_for(run_agent(extractor, request), timeout)
+            except asyncio.TimeoutError:
+                logger.error(f"⏱️ Extraction of window {index + 1}/{len(windows)} timed out after {timeout}s")
+                return None
+            except Exception as e:
+                logger.error(f"❌ Extraction of window {index + 1}/{len(windows)} failed: {e}")
+                return None
+        output = parse_agent_json(text)
+        return output if isinstance(output, dict) else None
+
+    outputs = await asyncio.gather(*(extract_one(index, window) for index, window in enumerate(windows)))
+    parsed = [output for output in outputs if output is not None]
+    merged = merge_extractions(parsed, content_item.get("content_type") or "text")
+    merged["windows"] = len(windows)
+    merged["failed_windows"] = len(windows) - len(parsed)
+    if not parsed:
+        merged["error"] = "No window produced parseable output"
+    return merged
+
+
+class ChunkedExtractionStage(BaseAgent):
+    """Claim extraction that fans long state['content_item'] text out over windows
+
+    Short text and media runs the extractor in this invocation (so it can load
+    session artifacts). Either way the output lands in state['extracted_claims'].
+    """
+
+    extractor: BaseAgent
+    min_chars: int = EXTRACT_CHUNKING_MIN_CHARS
+    window_chars: int = EXTRACT_WINDOW_CHARS
+    overlap_chars: int = EXTRACT_WINDOW_OVERLAP_CHARS
+    concurrency: int = EXTRACT_CONCURRENCY
+    timeout: float = EXTRACT_TIMEOUT_SECONDS
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        content_item = ctx.session.state.get(CONTENT_ITEM) or {}
+        raw_text = content_item.get("raw_text") or ""
+        if len(raw_text) < self.min_chars:
+            async for event in self.extractor.run_async(ctx):
+                yield event
+            return
+
+        windows = split_windows(raw_text, self.window_chars, self.overlap_chars)
+        logger.info(f"✂️ Extracting from {len(windows)} windows of {len(raw_text)} chars (concurrency={self.concurrency})")
+        merged = await extract_windows(self.extractor, content_item, windows, self.concurrency, self.timeout)
+        logger.info(
+            f"📊 {len(merged['extracted_claims'])} claims from {merged['windows']} windows "
+            f"({merged['failed_windows']} failed)"
+        )
+
+        output = json.dumps(merged)
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=output)]),
+            actions=EventActions(state_delta={EXTRACTED_CLAIMS: output}),
+        )
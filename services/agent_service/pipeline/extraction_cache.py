@@ -0,0 +1,214 @@
+"""Persistent cache of claim_extraction_agent output, keyed by normalized content
+
+Reposts of one article (RSS feeds, Reddit) differ only in URL and boilerplate,
+so the key is a hash of:
+- uploaded media: the content-addressed artifact IDs in the request, or
+- text: the request with source/URL lines and boilerplate removed, lowercased
+  and whitespace-collapsed,
+together with a version hash of CLAIM_EXTRACTION_PROMPT and the model. Entries
+of other versions are deleted on first use, so a prompt change invalidates the
+cache. The disk backend is bounded by EXTRACTION_CACHE_MAX_BYTES (least
+recently used files are evicted first).
+
+Without an explicit EXTRACTION_CACHE_DIR the cache lives in the temp dir,
+which is memory-backed on Cloud Run, so the default cap is then only 16 MB;
+point EXTRACTION_CACHE_DIR at a disk volume for the 256 MB default.
+"""
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional
+from google.adk.agents.callback_context import CallbackContext
+from google.genai import types
+from ..metrics import metrics
+from .state import EXTRACTED_CLAIMS, parse_agent_json
+
+logger = logging.getLogger(__name__)
+
+EXTRACTION_CACHE_ENABLED = os.getenv("EXTRACTION_CACHE_ENABLED", "true").lower() == "true"
+EXTRACTION_CACHE_DIR = os.getenv("EXTRACTION_CACHE_DIR") or None
+EXTRACTION_CACHE_MAX_BYTES = int(
+    os.getenv("EXTRACTION_CACHE_MAX_BYTES") or (256 if EXTRACTION_CACHE_DIR else 16) * 1024 * 1024
+)
+if EXTRACTION_CACHE_DIR is None:
+    EXTRACTION_CACHE_DIR = os.path.join(tempfile.gettempdir(), "veris-extraction-cache")
+
+_ARTIFACT_ID = re.compile(r"veris_media_[0-9a-f]{16}(?:_preview)?\.[a-z0-9]+")
+_HEADER_LINE = re.compile(r"^\s*(source|url|link|permalink)\s*:.*$", re.IGNORECASE | re.MULTILINE)
+_BOILERPLATE_LINE = re.compile(
+    r"^.*\b(read more|continue reading|share (this|on)|subscribe|sign up|newsletter|advertisement|"
+    r"click here|follow us|all rights reserved|cookie|related articles?|posted by|submitted by|"
+    r"\d+ comments?|upvotes?)\b.*$|^\s*(©|copyright\b).*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+_URL = re.compile(r"https?://\S+")
+
+
+def normalize_content(request: str) -> str:
+    """Content identity of an extraction request (see module docstring)"""
+    artifact_ids = sorted(set(_ARTIFACT_ID.findall(request)))
+    if artifact_ids:
+        return "media:" + ",".join(artifact_ids)
+
+    submitted = parse_agent_json(request)
+    if isinstance(submitted, dict) and submitted.get("raw_text"):
+        media = [*(submitted.get("images") or []), *(submitted.get("videos") or [])]
+        request = "\n".join([submitted["raw_text"], *media])
+
+    text = _BOILERPLATE_LINE.sub(" ", _HEADER_LINE.sub(" ", request))
+    # Tracking parameters differ between feeds; keep only the URL path as content
+    text = _URL.sub(lambda match: match.group(0).split("?")[0], text)
+    return "text:" + " ".join(text.lower().split())
+
+
+class ExtractionCache:
+    """Disk-backed, size-bounded cache of extraction outputs"""
+
+    def __init__(self, directory: str, version: str, max_bytes: int = EXTRACTION_CACHE_MAX_BYTES):
+        self.root = Path(directory)
+        self.version = version
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def directory(self) -> Path:
+        return self.root / self.version
+
+    def key(self, request: str) -> str:
+        return hashlib.sha256(normalize_content(request).encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def _ensure_ready(self) -> None:
+        """First use: drop other versions' entries and measure the current size"""
+        if self._size is not None:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for stale in self.root.iterdir():
+            if stale.is_dir() and stale.name != self.version:
+                shutil.rmtree(stale, ignore_errors=True)
+                logger.info(f"🗑️ Extraction cache invalidated: {stale.name}")
+        self._size = sum(path.stat().st_size for path in self.directory.glob("*/*.json"))
+
+    def get(self, request: str) -> Optional[str]:
+        """Cached extraction output for the request's content, or None"""
+        path = self._path(self.key(request))
+        with self._lock:
+            self._ensure_ready()
+            try:
+                output = path.read_text(encoding="utf-8")
+                os.utime(path)  # mtime doubles as the LRU timestamp
+            except FileNotFoundError:
+                self.misses += 1
+                metrics.inc("veris_extraction_cache_lookups_total", {"result": "miss"})
+                return None
+            self.hits += 1
+            metrics.inc("veris_extraction_cache_lookups_total", {"result": "hit"})
+            return output
+
+    def put(self, request: str, output: str) -> None:
+        """Store an extraction output, evicting least recently used entries past max_bytes"""
+        path = self._path(self.key(request))
+        data = output.encode("utf-8")
+        with self._lock:
+            self._ensure_ready()
+            path.parent.mkdir(exist_ok=True)
+            previous = path.stat().st_size if path.exists() else 0
+            temp_path = path.with_suffix(".tmp")
+            temp_path.write_bytes(data)
+            temp_path.replace(path)
+            self._size += len(data) - previous
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        entries = sorted(
+            ((path.stat().st_mtime, path) for path in self.directory.glob("*/*.json")),
+            key=lambda entry: entry[0],
+        )
+        target = self.max_bytes * 0.9  # Evict in chunks, not on every put
+        for _, path in entries:
+            if self._size <= target:
+                break
+            size = path.stat().st_size
+            path.unlink(missing_ok=True)
+            self._size -= size
+
+    def clear(self) -> None:
+        """Delete this version's entries and reset the counters"""
+        with self._lock:
+            shutil.rmtree(self.directory, ignore_errors=True)
+            self._size = None
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters; every hit is one extraction model run avoided"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "bytes": self._size or 0,
+        }
+
+
+def prompt_version(prompt: str, model: str) -> str:
+    """Cache version for an extraction prompt and model"""
+    return hashlib.sha256(f"{model}\n{prompt}".encode()).hexdigest()[:12]
+
+
+def _request_text(callback_context: CallbackContext) -> str:
+    message = callback_context.user_content
+    if not message or not message.parts:
+        return ""
+    return "\n".join(part.text for part in message.parts if part.text)
+
+
+def extraction_cache_callbacks(cache: ExtractionCache):
+    """(before_agent, after_agent) callbacks serving and filling the cache for an extraction agent"""
+
+    def serve_cached_extraction(callback_context: CallbackContext) -> Optional[types.Content]:
+        if not EXTRACTION_CACHE_ENABLED:
+            return None
+        request = _request_text(callback_context)
+        if not request:
+            return None
+        try:
+            output = cache.get(request)
+        except OSError as e:
+            logger.warning(f"⚠️ Extraction cache read failed: {e}")
+            return None
+        if output is None:
+            return None
+
+        logger.info(f"♻️ Reusing cached claim extraction ({cache.stats()['hit_rate']:.0%} hit rate)")
+        callback_context.state[EXTRACTED_CLAIMS] = output
+        return types.Content(role="model", parts=[types.Part(text=output)])
+
+    def store_extraction(callback_context: CallbackContext) -> None:
+        if not EXTRACTION_CACHE_ENABLED:
+            return None
+        request = _request_text(callback_context)
+        output = callback_context.state.get(EXTRACTED_CLAIMS)
+        parsed = parse_agent_json(output)
+        if not request or not isinstance(output, str) or not isinstance(parsed, dict):
+            return None
+        if not isinstance(parsed.get("extracted_claims"), list):
+            return None
+        try:
+            cache.put(request, output)
+        except OSError as e:
+            logger.warning(f"⚠️ Extraction cache write failed: {e}")
+        return None
+
+    return serve_cached_extraction, store_extraction
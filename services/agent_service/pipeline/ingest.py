@@ -0,0 +1,88 @@
+"""Extract → verify → save for one crawled content item, without the orchestrator LLM"""
+import logging
+from typing import Any, Dict
+from ..database.write_behind import asave_claims
+from ..sub_agents.claim_extraction_agent.claim_extration_agent import claim_extraction_agent
+from ..sub_agents.verify_claim_agent.verify_claim_agent import verify_claim_tiers
+from .agent_runner import run_agent
+from .extract_stage import extraction_request
+from .state import (
+    CONTENT_ITEM,
+    EXTRACTED_CLAIMS,
+    VERIFICATION_RESULTS,
+    build_claim_records,
+    get_extracted_claims,
+    parse_agent_json,
+)
+from .verdict_cache import VERDICT_CACHE_ENABLED, verdict_cache
+from .verify_stage import VERIFY_CONCURRENCY, verify_claims
+
+logger = logging.getLogger(__name__)
+
+
+def content_item_from_raw(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a crawler RawContentItem (camelCase) to the content_item state layout
+
+    "mixed" items are stored under their primary modality: text when there is
+    text, otherwise images, otherwise video.
+    """
+    content_type = raw.get("contentType") or raw.get("content_type") or "text"
+    raw_text = raw.get("rawText") or raw.get("raw_text")
+    images = raw.get("images") or []
+    videos = raw.get("videos") or []
+
+    if content_type == "mixed":
+        content_type = "text" if raw_text else "image" if images else "video"
+
+    return {
+        "source": raw.get("source") or "Crawler",
+        "url": raw["url"],
+        "content_type": content_type,
+        "raw_text": raw_text,
+        "images": images,
+        "videos": videos,
+        "metadata": raw.get("metadata") or {},
+    }
+
+
+async def process_content_item(
+    content_item: Dict[str, Any], verify_concurrency: int = VERIFY_CONCURRENCY
+) -> Dict[str, Any]:
+    """Run extract → verify → save for one content item
+
+    Returns:
+        dict: url, claims, verified, failed, saved and success (True only when
+            every claim was verified and saved)
+    """
+    _, state = await run_agent(
+        claim_extraction_agent,
+        extraction_request(content_item),
+        state={CONTENT_ITEM: content_item},
+    )
+    extracted = parse_agent_json(state.get(EXTRACTED_CLAIMS))
+    if extracted is None or (isinstance(extracted, dict) and extracted.get("error")):
+        raise ValueError("Claim extraction returned no parseable output")
+
+    claims = get_extracted_claims(state)
+    summary = {"url": content_item["url"], "claims": len(claims), "verified": 0, "failed": 0, "saved": 0}
+    if not claims:
+        return {**summary, "success": True}
+
+    results = await verify_claims(
+        claims,
+        verify_claim_tiers[0],
+        concurrency=verify_concurrency,
+        cache=verdict_cache if VERDICT_CACHE_ENABLED else None,
+        escalate_to=verify_claim_tiers[1:],
+    )
+    state[VERIFICATION_RESULTS] = results
+    summary["failed"] = sum(1 for result in results if result.get("error"))
+    summary["verified"] = len(results) - summary["failed"]
+
+    records = build_claim_records(state)
+    if records:
+        saved = await asave_claims(records)
+        summary["saved"] = saved["saved"]
+
+    summary["success"] = summary["failed"] == 0 and summary["saved"] == len(records)
+    return summary
@@ -0,0 +1,299 @@
+"""Quota-aware scheduler shared by every LlmAgent's model calls
+
+Agents get their model through scheduled(), which wraps it in ScheduledLlm, so
+every call goes through its model's lane:
+
+- Request and token buckets from MODEL_RPM_LIMITS / MODEL_TPM_LIMITS
+  ("gemini-2.5-pro=60,gemini-3-pro-preview=30"). Calls are charged the
+  estimated prompt plus MODEL_OUTPUT_TOKEN_ESTIMATE tokens, corrected with the
+  reported usage when they return. Models without limits are not throttled.
+- An adaptive (AIMD) concurrency limit per model: +1 per limit's worth of calls
+  that finish within MODEL_LATENCY_TOLERANCE x the latency baseline, -10% when
+  slower, halved on a rate-limit error. Slots go out by priority class (see
+  priority.py).
+- On 429/503 the whole lane pauses for the server's retry delay, or jittered
+  exponential backoff, and the call is retried (up to MODEL_MAX_ATTEMPTS).
+- Every attempt, retried or failed, is added to the current run's
+  model_attempts; a run with max_model_attempts set gets
+  ModelCallLimitExceeded instead of going past it.
+
+Queue depth, calls in flight and the concurrency limit are gauges; waits are a
+histogram; calls are counted by outcome.
+"""
+import asyncio
+import logging
+import os
+import random
+import re
+import time
+from typing import Any, AsyncGenerator, Dict, Optional, Union
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.models.registry import LLMRegistry
+from ..metrics import LATENCY_BUCKETS, current_run, metrics
+from .context_compaction import CHARS_PER_TOKEN, estimate_tokens
+from .priority import PriorityGate, effective_priority
+from .rate_limit import RateLimiter, parse_limits
+
+logger = logging.getLogger(__name__)
+
+MODEL_RPM_LIMITS = os.getenv("MODEL_RPM_LIMITS", "")
+MODEL_TPM_LIMITS = os.getenv("MODEL_TPM_LIMITS", "")
+MODEL_MAX_CONCURRENCY = int(os.getenv("MODEL_MAX_CONCURRENCY", "16"))
+MODEL_MAX_ATTEMPTS = int(os.getenv("MODEL_MAX_ATTEMPTS", "5"))
+MODEL_BACKOFF_BASE_SECONDS = float(os.getenv("MODEL_BACKOFF_BASE_SECONDS", "1.0"))
+MODEL_BACKOFF_MAX_SECONDS = float(os.getenv("MODEL_BACKOFF_MAX_SECONDS", "60"))
+MODEL_LATENCY_TOLERANCE = float(os.getenv("MODEL_LATENCY_TOLERANCE", "3.0"))
+MODEL_OUTPUT_TOKEN_ESTIMATE = int(os.getenv("MODEL_OUTPUT_TOKEN_ESTIMATE", "1024"))
+
+OVERLOAD_CODES = {429, 503}
+_RETRY_DELAY = re.compile(r"^([\d.]+)s$")
+
+MODEL_WAIT = metrics.histogram(
+    "veris_model_wait_seconds", "Time a model call waited for quota and a concurrency slot", ["model"], LATENCY_BUCKETS
+)
+
+
+class ModelCallLimitExceeded(RuntimeError):
+    """The current run has used up its max_model_attempts"""
+
+
+def is_overloaded(error: Exception) -> bool:
+    """Rate-limit (429) or overload (503) error from the model API"""
+    return getattr(error, "code", None) in OVERLOAD_CODES
+
+
+def retry_delay(error: Exception, attempt: int) -> float:
+    """Server-suggested delay (RetryInfo), else jittered exponential backoff"""
+    details = getattr(error, "details", None)
+    if isinstance(details, dict):
+        for detail in (details.get("error") or {}).get("details") or []:
+            match = _RETRY_DELAY.match(str(detail.get("retryDelay", "")))
+            if match:
+                return min(float(match.group(1)), MODEL_BACKOFF_MAX_SECONDS)
+    ceiling = min(MODEL_BACKOFF_MAX_SECONDS, MODEL_BACKOFF_BASE_SECONDS * 2 ** attempt)
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+def estimate_request_tokens(llm_request: LlmRequest) -> int:
+    """Prompt estimate (contents and system instruction) plus the expected output"""
+    config = llm_request.config
+    instruction = config.system_instruction if config and isinstance(config.system_instruction, str) else ""
+    output = (config.max_output_tokens if config else None) or MODEL_OUTPUT_TOKEN_ESTIMATE
+    return estimate_tokens(llm_request.contents) + len(instruction) // CHARS_PER_TOKEN + output
+
+
+class ModelLane:
+    """Quota buckets, adaptive concurrency limit and pause state for one model
+
+    Slots up to the concurrency limit are handed out by priority class
+    through a PriorityGate.
+    """
+
+    def __init__(self, model: str, rpm: Optional[float] = None, tpm: Optional[float] = None):
+        self.model = model
+        self.requests = RateLimiter(rpm) if rpm else None
+        self.tokens = RateLimiter(tpm, burst=tpm) if tpm else None
+        self.limit = float(MODEL_MAX_CONCURRENCY)
+        self.gate = PriorityGate(f"model:{model}", lambda: int(self.limit))
+        self.queued = 0
+        self.paused_until = 0.0
+        self.baseline: Optional[float] = None
+        self.calls: Dict[str, int] = {"ok": 0, "throttled": 0, "error": 0}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed: Optional[asyncio.Condition] = None
+
+    @property
+    def in_flight(self) -> int:
+        return sum(self.gate.in_flight.values())
+
+    def _condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._changed = asyncio.Condition()
+        return self._changed
+
+    def _publish(self) -> None:
+        labels = {"model": self.model}
+        metrics.set_gauge("veris_model_queue_depth", labels, self.queued)
+        metrics.set_gauge("veris_model_in_flight", labels, self.in_flight)
+        metrics.set_gauge("veris_model_concurrency_limit", labels, int(self.limit))
+
+    async def _wait_unpaused(self) -> None:
+        changed = self._condition()
+        async with changed:
+            while (pause := self.paused_until - time.monotonic()) > 0:
+                try:
+                    await asyncio.wait_for(changed.wait(), pause)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def acquire(self, tokens: int, priority: str) -> float:
+        """Wait out pauses, a slot for the priority class and quota; returns seconds waited"""
+        started = time.monotonic()
+        self.queued += 1
+        self._publish()
+        try:
+            await self._wait_unpaused()
+            await self.gate.acquire(priority)
+            try:
+                await self._wait_unpaused()  # A call may have been throttled meanwhile
+                if self.requests:
+                    await self.requests.acquire()
+                if self.tokens:
+                    await self.tokens.acquire(tokens)
+            except BaseException:
+                await self.gate.release(priority)
+                raise
+        finally:
+            self.queued -= 1
+            self._publish()
+        waited = time.monotonic() - started
+        metrics.observe(MODEL_WAIT, waited, self.model)
+        return waited
+
+    async def release(
+        self, priority: str, outcome: str, latency: float, estimated_tokens: int, usage: Any = None, pause: float = 0.0
+    ) -> None:
+        """Free the slot and adapt: outcome is "ok", "throttled" or "error" """
+        if self.tokens and usage is not None:
+            actual = usage.total_token_count or (usage.prompt_token_count or 0) + (usage.candidates_token_count or 0)
+            self.tokens.adjust(actual - estimated_tokens)
+
+        self.calls[outcome] += 1
+        if outcome == "ok":
+            if self.baseline is None or latency <= self.baseline * MODEL_LATENCY_TOLERANCE:
+                self.limit = min(MODEL_MAX_CONCURRENCY, self.limit + 1 / self.limit)
+            else:
+                self.limit = max(1.0, self.limit * 0.9)
+            self.baseline = latency if self.baseline is None else 0.95 * self.baseline + 0.05 * latency
+        elif outcome == "throttled":
+            now = time.monotonic()
+            if now >= self.paused_until:  # Calls rejected in the same burst halve the limit once
+                self.limit = max(1.0, self.limit / 2)
+            self.paused_until = max(self.paused_until, now + pause)
+            changed = self._condition()
+            async with changed:
+                changed.notify_all()
+        await self.gate.release(priority)
+        metrics.inc("veris_model_calls_total", {"model": self.model, "outcome": outcome, "priority": priority})
+        self._publish()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queued,
+            "in_flight": self.in_flight,
+            "concurrency_limit": int(self.limit),
+            "priorities": self.gate.stats(),
+            "latency_baseline_seconds": None if self.baseline is None else round(self.baseline, 3),
+            "calls": dict(self.calls),
+        }
+
+
+def _check_limit(model: str, limit: float) -> None:
+    if limit < 0:
+        raise ValueError(f"{model}: per-minute limit must be 0 (unlimited) or positive, got {limit}")
+
+
+class ModelScheduler:
+    """Lanes per model name, created on first use with the configured limits"""
+
+    def __init__(self, rpm_limits: Dict[str, float], tpm_limits: Dict[str, float]):
+        for model, limit in {**rpm_limits, **tpm_limits}.items():
+            _check_limit(model, limit)
+        self.rpm_limits = rpm_limits
+        self.tpm_limits = tpm_limits
+        self.lanes: Dict[str, ModelLane] = {}
+
+    def lane(self, model: str) -> ModelLane:
+        if model not in self.lanes:
+            self.lanes[model] = ModelLane(model, self.rpm_limits.get(model), self.tpm_limits.get(model))
+        return self.lanes[model]
+
+    def set_limits(self, model: str, rpm: Optional[float] = None, tpm: Optional[float] = None) -> None:
+        """Set (or replace) a model's requests- and/or tokens-per-minute limit (0: unlimited)"""
+        for limit in (rpm, tpm):
+            if limit is not None:
+                _check_limit(model, limit)
+        if rpm is not None:
+            self.rpm_limits[model] = rpm
+        if tpm is not None:
+            self.tpm_limits[model] = tpm
+        lane = self.lanes.get(model)
+        if lane:
+            lane.requests = RateLimiter(self.rpm_limits[model]) if self.rpm_limits.get(model) else None
+            lane.tokens = RateLimiter(self.tpm_limits[model], burst=self.tpm_limits[model]) if self.tpm_limits.get(model) else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {model: lane.stats() for model, lane in self.lanes.items()}
+
+
+model_scheduler = ModelScheduler(parse_limits(MODEL_RPM_LIMITS), parse_limits(MODEL_TPM_LIMITS))
+
+
+def set_model_rpm(model: str, rpm: float) -> None:
+    """Set (or replace) the requests-per-minute limit for a model"""
+    model_scheduler.set_limits(model, rpm=rpm)
+
+
+class ScheduledLlm(BaseLlm):
+    """Model whose calls go through model_scheduler (quota, concurrency, 429 retries)"""
+
+    llm: BaseLlm
+
+    def __str__(self) -> str:
+        return self.model
+
+    @property
+    def capabilities(self):
+        return self.llm.capabilities
+
+    def connect(self, llm_request: LlmRequest):
+        return self.llm.connect(llm_request)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        lane = model_scheduler.lane(self.llm.model)
+        estimated = estimate_request_tokens(llm_request)
+        priority = effective_priority()
+        for attempt in range(MODEL_MAX_ATTEMPTS):
+            run = current_run.get()
+            if run:
+                if run.max_model_attempts is not None and run.model_attempts >= run.max_model_attempts:
+                    raise ModelCallLimitExceeded(
+                        f"{self.llm.model}: run limit of {run.max_model_attempts} model calls reached"
+                    )
+                run.model_attempts += 1
+            waited = await lane.acquire(estimated, priority)
+            if waited > 1:
+                logger.info(f"⏳ {self.llm.model}: waited {waited:.1f}s for quota")
+            started = time.monotonic()
+            outcome, usage, pause, yielded = "error", None, 0.0, False
+            try:
+                async for response in self.llm.generate_content_async(llm_request, stream):
+                    usage = response.usage_metadata or usage
+                    yielded = True
+                    yield response
+                outcome = "ok"
+            except Exception as e:
+                # Only retry calls that failed before yielding anything
+                if yielded or not is_overloaded(e):
+                    raise
+                outcome, pause = "throttled", retry_delay(e, attempt)
+                if attempt == MODEL_MAX_ATTEMPTS - 1:
+                    logger.error(f"❌ {self.llm.model} still rate limited after {MODEL_MAX_ATTEMPTS} attempts")
+                    raise
+                logger.warning(f"⚠️ {self.llm.model} rate limited ({e.code}), retrying in {pause:.1f}s")
+            finally:
+                await lane.release(priority, outcome, time.monotonic() - started, estimated, usage, pause)
+            if outcome == "ok":
+                return
+
+
+def scheduled(model: Union[str, BaseLlm]) -> ScheduledLlm:
+    """Wrap a model name or BaseLlm so its calls go through model_scheduler"""
+    if isinstance(model, ScheduledLlm):
+        return model
+    llm = model if isinstance(model, BaseLlm) else LLMRegistry.new_llm(model)
+    return ScheduledLlm(model=llm.model, llm=llm)
@@ -0,0 +1,168 @@
+"""Priority classes for pipeline work: interactive ahead of crawler backlog ahead of re-verification
+
+Work runs under the class held in current_priority (default interactive, the
+root agent serving users); batch ingestion runs under crawler and the
+re-verification job under reverify. Tasks inherit the class of the code that
+created them.
+
+Shared capacity (model concurrency per lane, async DB connections) is handed
+out through a PriorityGate. Each class may hold at most its
+PRIORITY_MAX_SHARE of the capacity, and the unused part of each class's
+PRIORITY_RESERVED_SHARE is held back from the other classes. When capacity
+frees up, queued work of a higher class goes first, ahead of lower-class work
+that was queued earlier. Running work is never interrupted.
+"""
+import asyncio
+import contextvars
+import logging
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Callable, Dict, Iterator, Optional, Union
+from ..metrics import LATENCY_BUCKETS, metrics
+from .rate_limit import parse_limits
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+CRAWLER = "crawler"
+REVERIFY = "reverify"
+PRIORITY_CLASSES = (INTERACTIVE, CRAWLER, REVERIFY)  # Highest first
+
+PRIORITY_ENABLED = os.getenv("PRIORITY_ENABLED", "true").lower() == "true"
+PRIORITY_MAX_SHARE = {
+    INTERACTIVE: 1.0, CRAWLER: 0.75, REVERIFY: 0.25,
+    **parse_limits(os.getenv("PRIORITY_MAX_SHARE", "")),
+}
+PRIORITY_RESERVED_SHARE = {
+    INTERACTIVE: 0.25, CRAWLER: 0.0, REVERIFY: 0.0,
+    **parse_limits(os.getenv("PRIORITY_RESERVED_SHARE", "")),
+}
+
+PRIORITY_WAIT = metrics.histogram(
+    "veris_priority_wait_seconds", "Time queued for shared capacity per priority class",
+    ["gate", "priority"], LATENCY_BUCKETS,
+)
+
+current_priority: contextvars.ContextVar[str] = contextvars.ContextVar("veris_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def priority_class(name: str) -> Iterator[None]:
+    """Run the block (and tasks it creates) under a priority class"""
+    if name not in PRIORITY_CLASSES:
+        raise ValueError(f"Unknown priority class: {name}")
+    token = current_priority.set(name)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+def effective_priority() -> str:
+    """Class of the current work (everything is interactive when PRIORITY_ENABLED=false)"""
+    return current_priority.get() if PRIORITY_ENABLED else INTERACTIVE
+
+
+class PriorityGate:
+    """Priority-ordered semaphore over a (possibly changing) capacity"""
+
+    def __init__(self, name: str, capacity: Union[int, Callable[[], int]]):
+        self.name = name
+        self._capacity = capacity if callable(capacity) else (lambda: capacity)
+        self.in_flight: Dict[str, int] = {priority: 0 for priority in PRIORITY_CLASSES}
+        self.waiting: Dict[str, int] = {priority: 0 for priority in PRIORITY_CLASSES}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed: Optional[asyncio.Condition] = None
+
+    def _condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._changed = asyncio.Condition()
+        return self._changed
+
+    def _admissible(self, name: str, capacity: int) -> bool:
+        if self.in_flight[name] >= max(1, int(capacity * PRIORITY_MAX_SHARE[name])):
+            return False
+        held_back = sum(
+            max(0, int(capacity * PRIORITY_RESERVED_SHARE[other]) - self.in_flight[other])
+            for other in PRIORITY_CLASSES if other != name
+        )
+        return sum(self.in_flight.values()) + held_back < capacity
+
+    def _may_enter(self, name: str) -> bool:
+        capacity = max(1, self._capacity())
+        if not self._admissible(name, capacity):
+            return False
+        higher = PRIORITY_CLASSES[:PRIORITY_CLASSES.index(name)]
+        return not any(self.waiting[other] and self._admissible(other, capacity) for other in higher)
+
+    def _publish(self, name: str) -> None:
+        labels = {"gate": self.name, "priority": name}
+        metrics.set_gauge("veris_priority_queue_depth", labels, self.waiting[name])
+        metrics.set_gauge("veris_priority_in_flight", labels, self.in_flight[name])
+
+    async def acquire(self, name: Optional[str] = None, timeout: Optional[float] = None) -> float:
+        """Wait for a slot for the class (default: the current one); returns seconds waited
+
+        With a timeout, asyncio.TimeoutError is raised if no slot came in time.
+        A slot granted just as the timeout fires or the caller is cancelled is
+        given back, never leaked.
+        """
+        name = name or effective_priority()
+        if timeout is None:
+            return await self._acquire(name)
+        granting = asyncio.ensure_future(self._acquire(name))
+        try:
+            return await asyncio.wait_for(asyncio.shield(granting), timeout)
+        except BaseException:
+            # cancel() is False once the slot was granted (or acquiring failed)
+            if not granting.cancel() and not granting.cancelled() and granting.exception() is None:
+                await asyncio.shield(self.release(name))
+            raise
+
+    async def _acquire(self, name: str) -> float:
+        started = time.monotonic()
+        changed = self._condition()
+        async with changed:
+            self.waiting[name] += 1
+            self._publish(name)
+            try:
+                await changed.wait_for(lambda: self._may_enter(name))
+            finally:
+                self.waiting[name] -= 1
+                changed.notify_all()  # Lower classes may have been waiting behind this one
+            self.in_flight[name] += 1
+            self._publish(name)
+        waited = time.monotonic() - started
+        metrics.observe(PRIORITY_WAIT, waited, self.name, name)
+        return waited
+
+    async def release(self, name: str) -> None:
+        changed = self._condition()
+        async with changed:
+            self.in_flight[name] -= 1
+            self._publish(name)
+            changed.notify_all()
+
+    async def notify(self) -> None:
+        """Re-check waiters after the capacity changed"""
+        changed = self._condition()
+        async with changed:
+            changed.notify_all()
+
+    @asynccontextmanager
+    async def slot(self, name: Optional[str] = None) -> AsyncIterator[str]:
+        name = name or effective_priority()
+        await self.acquire(name)
+        try:
+            yield name
+        finally:
+            await self.release(name)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        return {
+            priority: {"in_flight": self.in_flight[priority], "waiting": self.waiting[priority]}
+            for priority in PRIORITY_CLASSES
+        }
@@ -0,0 +1,44 @@
+"""Token buckets and "model=N,..." limit specs for the model scheduler"""
+import asyncio
+import time
+from typing import Dict, Optional
+
+
+class RateLimiter:
+    """Async token bucket allowing rate_per_minute acquisitions, bursting up to burst"""
+
+    def __init__(self, rate_per_minute: float, burst: Optional[float] = None):
+        if rate_per_minute <= 0 or (burst is not None and burst <= 0):
+            raise ValueError(f"Rate limit must be positive, got {rate_per_minute}/min (burst {burst})")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = burst or max(1.0, rate_per_minute / 10.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, tokens: float = 1.0) -> float:
+        """Wait for tokens (at most capacity is ever required); returns seconds waited"""
+        tokens = min(tokens, self.capacity)
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return now - started
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+    def adjust(self, tokens: float) -> None:
+        """Charge (positive) or refund (negative) tokens after the fact, e.g. estimate vs actual usage"""
+        self.tokens = min(self.capacity, self.tokens - tokens)
+
+
+def parse_limits(spec: str) -> Dict[str, float]:
+    """{"gemini-2.5-pro": 60.0, ...} from "gemini-2.5-pro=60,gemini-3-pro-preview=30" """
+    limits = {}
+    for entry in filter(None, (item.strip() for item in spec.split(","))):
+        model, _, limit = entry.partition("=")
+        limits[model.strip()] = float(limit)
+    return limits
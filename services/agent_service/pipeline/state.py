@@ -0,0 +1,140 @@
+"""Session-state keys and helpers shared by the pipeline stages
+
+State layout:
+    content_item: Original content (source, url, content_type, raw_text, images, videos, metadata)
+    content_item_invocation: Invocation (user turn) that captured content_item
+    extracted_claims: claim_extraction_agent output
+    verification_result: Latest verify_claim_agent output
+    verification_results: Parsed verification results collected for the current article
+    media_markers: Fingerprint -> text marker of inline media already processed this session
+    compacted_tool_results: Full responses of tool calls compacted out of the orchestrator's context
+"""
+import json
+import logging
+import os
+import re
+from typing import Any, Dict, List, Optional
+from google.adk.agents.callback_context import CallbackContext
+
+logger = logging.getLogger(__name__)
+
+CONTENT_ITEM = "content_item"
+CONTENT_ITEM_INVOCATION = "content_item_invocation"
+EXTRACTED_CLAIMS = "extracted_claims"
+VERIFICATION_RESULT = "verification_result"
+VERIFICATION_RESULTS = "verification_results"
+SAVE_RESULT = "save_result"
+MEDIA_MARKERS = "media_markers"
+COMPACTED_TOOL_RESULTS = "compacted_tool_results"
+
+CONTENT_FIELDS = ("source", "url", "content_type", "raw_text", "images", "videos", "metadata")
+# Pasted text at least this long replaces the session's content item; shorter
+# messages are follow-ups about it ("also check the second paragraph")
+CONTENT_CAPTURE_MIN_CHARS = int(os.getenv("CONTENT_CAPTURE_MIN_CHARS", "280"))
+
+_JSON_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+
+
+def parse_agent_json(value: Any) -> Optional[Any]:
+    """Parse JSON emitted by an agent (plain, fenced in ```json, or already decoded)"""
+    if value is None or isinstance(value, (dict, list)):
+        return value
+
+    text = str(value).strip()
+    fenced = _JSON_FENCE.search(text)
+    if fenced:
+        text = fenced.group(1).strip()
+
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        # Fall back to the outermost object embedded in prose
+        start, end = text.find("{"), text.rfind("}")
+        if start != -1 and end > start:
+            try:
+                return json.loads(text[start:end + 1])
+            except json.JSONDecodeError:
+                pass
+    return None
+
+
+def get_extracted_claims(state: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Claims list from the extraction output in state"""
+    extracted = parse_agent_json(state.get(EXTRACTED_CLAIMS)) or {}
+    claims = extracted.get("extracted_claims", []) if isinstance(extracted, dict) else extracted
+    return [claim for claim in claims if isinstance(claim, dict) and claim.get("claim")]
+
+
+def capture_content_item(callback_context: CallbackContext) -> None:
+    """Before-agent callback for the orchestrator: keep the submitted content in state.
+
+    A JSON content item (source, url, raw_text, ...) or pasted text becomes the
+    session's content item, so the save stage reads it from state and the
+    orchestrator never re-emits article text in a tool call. Media uploads are
+    recorded by before_model_modifier instead.
+
+    The callback runs on every user turn, so only turns that carry new content
+    replace the item: a JSON content item, pasted text of at least
+    CONTENT_CAPTURE_MIN_CHARS, or any text while nothing is captured yet.
+    """
+    message = callback_context.user_content
+    if not message or not message.parts or any(part.inline_data for part in message.parts):
+        return None
+    text = "".join(part.text or "" for part in message.parts).strip()
+    if not text:
+        return None
+
+    submitted = parse_agent_json(text)
+    if isinstance(submitted, dict) and (submitted.get("url") or submitted.get("raw_text")):
+        content_item = {field: submitted[field] for field in CONTENT_FIELDS if submitted.get(field)}
+    elif len(text) >= CONTENT_CAPTURE_MIN_CHARS or not callback_context.state.get(CONTENT_ITEM):
+        content_item = {"content_type": "text", "raw_text": text}
+    else:
+        return None
+    callback_context.state[CONTENT_ITEM] = content_item
+    callback_context.state[CONTENT_ITEM_INVOCATION] = callback_context.invocation_id
+    return None
+
+
+def build_claim_records(
+    state: Dict[str, Any], request: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """Combine content item, extracted claims and verification results into save records
+
+    Content fields come from state. The caller's source/url (named by the user
+    in prose) override it; its other fields are used only where state has none.
+
+    Args:
+        state: Session state
+        request: Content fields passed by the caller
+
+    Returns:
+        list: Claim dicts accepted by save_verified_claims_batch
+    """
+    content = {field: (request or {}).get(field) for field in CONTENT_FIELDS}
+    content.update({k: v for k, v in (state.get(CONTENT_ITEM) or {}).items() if v})
+    content.update({k: v for k, v in (request or {}).items() if k in ("source", "url") and v})
+    content["source"] = content.get("source") or "User Upload"
+    content["url"] = content.get("url") or "user_upload"
+    content["content_type"] = content.get("content_type") or "text"
+
+    categories = {claim["claim"]: claim.get("category") for claim in get_extracted_claims(state)}
+
+    records = []
+    for result in state.get(VERIFICATION_RESULTS) or []:
+        if result.get("error"):
+            continue
+        records.append({
+            **content,
+            "claim": result["claim"],
+            "category": result.get("category") or categories.get(result["claim"]) or "general",
+            "verification_status": result.get("verification_status") or "unverifiable",
+            "confidence": result.get("confidence") or 0,
+            "evidence": result.get("evidence") or "",
+            "sources": result.get("sources") or [],
+            "media_references": result.get("media_references") or [],
+            "verified_at": result.get("verified_at"),
+            "near_duplicate_of": result.get("near_duplicate_of"),
+            "similarity": result.get("similarity"),
+        })
+    return records
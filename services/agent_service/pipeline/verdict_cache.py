@@ -0,0 +1,175 @@
+"""Verdict cache: reuse stored verdicts for repeated claims before verifying them
+
+In-process LRU keyed on the normalized claim hash, backed by crawled_content
+(claim_hash column, migration 001). Entries expire by verification_status:
+settled verdicts live long, unresolved ones are retried soon. Exact misses
+fall back to the near-duplicate claim index, so paraphrases reuse verdicts.
+"""
+import logging
+import os
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from ..database import async_db_client
+from ..database.operations import claim_hash
+from .claim_index import NEAR_DUP_ENABLED, ClaimIndex, claim_index
+
+logger = logging.getLogger(__name__)
+
+VERDICT_CACHE_ENABLED = os.getenv("VERDICT_CACHE_ENABLED", "true").lower() == "true"
+VERDICT_CACHE_SIZE = int(os.getenv("VERDICT_CACHE_SIZE", "10000"))
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# TTL in seconds per verification_status (override with VERDICT_TTL_<STATUS>)
+VERDICT_TTLS = {
+    status: int(os.getenv(f"VERDICT_TTL_{status.upper()}", default))
+    for status, default in {
+        "verified": 30 * DAY,
+        "false": 30 * DAY,
+        "partially_true": 7 * DAY,
+        "disputed": DAY,
+        "unverifiable": 6 * HOUR,
+    }.items()
+}
+
+VERDICT_FIELDS = ("verification_status", "confidence", "evidence", "sources")
+
+
+class VerdictCache:
+    """LRU of verdicts keyed by claim hash, with status-dependent TTLs"""
+
+    def __init__(
+        self,
+        max_entries: int = VERDICT_CACHE_SIZE,
+        ttls: Dict[str, int] = None,
+        index: Optional[ClaimIndex] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttls = ttls or VERDICT_TTLS
+        self.index = index
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = 0
+        self.db_hits = 0
+        self.near_dup_hits = 0
+        self.misses = 0
+
+    def _ttl(self, verdict: Dict[str, Any]) -> int:
+        return self.ttls.get(verdict.get("verification_status"), 0)
+
+    def _store(self, key: str, verdict: Dict[str, Any], verified_at: datetime) -> None:
+        age = (datetime.utcnow() - verified_at).total_seconds()
+        remaining = self._ttl(verdict) - age
+        if remaining <= 0:
+            return
+
+        self._entries[key] = (time.monotonic() + remaining, verdict)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def _load(self, key: str) -> Optional[Tuple[Dict[str, Any], datetime]]:
+        """Most recent stored verdict for the claim hash"""
+        try:
+            result = await async_db_client.query(
+                """
+                SELECT verification_status, confidence, evidence,
+                       verification_sources AS sources, verified_at
+                FROM crawled_content
+                WHERE claim_hash = %s
+                ORDER BY verified_at DESC
+                LIMIT 1
+                """,
+                (key,),
+            )
+        except RuntimeError:
+            return None  # Database not connected: in-process cache only
+
+        rows = result.get("rows")
+        if not rows:
+            return None
+        row = rows[0]
+        return {field: row[field] for field in VERDICT_FIELDS}, row["verified_at"]
+
+    async def _lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Unexpired verdict for a claim hash, in-process first, then the table"""
+        entry = self._entries.get(key)
+        if entry and entry[0] > time.monotonic():
+            self._entries.move_to_end(key)
+            return dict(entry[1])
+        if entry:
+            del self._entries[key]
+
+        loaded = await self._load(key)
+        if loaded:
+            verdict, verified_at = loaded
+            if (datetime.utcnow() - verified_at).total_seconds() < self._ttl(verdict):
+                verdict["verified_at"] = verified_at.isoformat()
+                self._store(key, verdict, verified_at)
+                self.db_hits += 1
+                return dict(verdict)
+        return None
+
+    async def get(self, claim: str) -> Optional[Dict[str, Any]]:
+        """Cached verdict for claim (or a near-duplicate of it), None when missing or expired
+
+        The returned dict carries verified_at, which the save path stores as
+        is so reuse does not extend the verdict's lifetime. Near-duplicate
+        hits also carry near_duplicate_of (claim hash) and similarity.
+        """
+        key = claim_hash(claim)
+
+        verdict = await self._lookup(key)
+        if verdict:
+            self.hits += 1
+            return verdict
+
+        if self.index is not None:
+            match = await self.index.afind(claim)
+            if match and match[0] != key:
+                verdict = await self._lookup(match[0])
+                if verdict:
+                    await self.index.aadd(key, claim)
+                    self.hits += 1
+                    self.near_dup_hits += 1
+                    return {**verdict, "near_duplicate_of": match[0], "similarity": round(match[1], 3)}
+
+        self.misses += 1
+        return None
+
+    async def put(self, claim: str, result: Dict[str, Any]) -> None:
+        """Cache a fresh verification result (and index the claim for near-duplicate lookups)"""
+        if result.get("error"):
+            return
+        verdict = {field: result.get(field) for field in VERDICT_FIELDS}
+        verified_at = datetime.utcnow()
+        verdict["verified_at"] = verified_at.isoformat()
+        key = claim_hash(claim)
+        self._store(key, verdict, verified_at)
+        if self.index is not None:
+            await self.index.aadd(key, claim)
+
+    def clear(self) -> None:
+        """Drop cached verdicts, the near-duplicate index and the counters"""
+        self._entries.clear()
+        if self.index is not None:
+            self.index.clear()
+        self.hits = self.db_hits = self.near_dup_hits = self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters; every hit is one verify_claim_agent run avoided"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "db_hits": self.db_hits,
+            "near_dup_hits": self.near_dup_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "verifications_saved": self.hits,
+        }
+
+
+verdict_cache = VerdictCache(index=claim_index if NEAR_DUP_ENABLED else None)
@@ -0,0 +1,235 @@
+"""Parallel verification stage: fan out verify_claim_agent across extracted claims
+
+Optionally tiered: each claim goes to the cheapest verifier first and is
+escalated to the next tier only when the verdict is low-confidence, in an
+escalation status (disputed/unverifiable by default), or the run failed.
+"""
+import asyncio
+import json
+import logging
+import os
+from collections import Counter
+from typing import Any, AsyncGenerator, Dict, List, Optional, Sequence
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+from ..database.operations import generate_claim_id
+from ..metrics import metrics
+from .agent_runner import run_agent
+from .state import CONTENT_ITEM, VERIFICATION_RESULTS, get_extracted_claims, parse_agent_json
+from .verdict_cache import VERDICT_CACHE_ENABLED, VerdictCache, verdict_cache
+
+logger = logging.getLogger(__name__)
+
+VERIFY_CONCURRENCY = int(os.getenv("VERIFY_CONCURRENCY", "4"))
+VERIFY_TIMEOUT_SECONDS = float(os.getenv("VERIFY_TIMEOUT_SECONDS", "180"))
+VERIFY_ESCALATE_BELOW_CONFIDENCE = int(os.getenv("VERIFY_ESCALATE_BELOW_CONFIDENCE", "70"))
+VERIFY_ESCALATE_STATUSES = {
+    status.strip()
+    for status in os.getenv("VERIFY_ESCALATE_STATUSES", "disputed,unverifiable").split(",")
+    if status.strip()
+}
+
+
+class CascadeStats:
+    """Claims resolved per verifier tier, and escalations by reason"""
+
+    def __init__(self):
+        self.resolved: Counter = Counter()
+        self.escalated: Counter = Counter()
+        self.escalation_failed: Counter = Counter()
+
+    def record_resolved(self, tier: str) -> None:
+        self.resolved[tier] += 1
+        metrics.inc("veris_verify_resolved_total", {"tier": tier})
+
+    def record_escalated(self, tier: str, reason: str) -> None:
+        self.escalated[reason] += 1
+        metrics.inc("veris_verify_escalations_total", {"tier": tier, "reason": reason})
+
+    def record_escalation_failed(self, tier: str) -> None:
+        self.escalation_failed[tier] += 1
+        metrics.inc("veris_verify_escalation_failures_total", {"tier": tier})
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "resolved": dict(self.resolved),
+            "escalated": dict(self.escalated),
+            "escalation_failed": dict(self.escalation_failed),
+        }
+
+
+cascade_stats = CascadeStats()
+
+
+def escalation_reason(result: Dict[str, Any]) -> Optional[str]:
+    """Why a verdict should go to the next tier, or None if it is settled"""
+    if result.get("verification_status") in VERIFY_ESCALATE_STATUSES:
+        return result["verification_status"]
+    try:
+        confidence = float(result.get("confidence") or 0)
+    except (TypeError, ValueError):
+        confidence = 0
+    if confidence < VERIFY_ESCALATE_BELOW_CONFIDENCE:
+        return "low_confidence"
+    return None
+
+
+def _verification_request(claim: Dict[str, Any]) -> str:
+    """Request text for one claim"""
+    request = f"Claim: {claim['claim']}"
+    if claim.get("context"):
+        request += f"\nContext: {claim['context']}"
+    return request
+
+
+def _failed_result(claim: Dict[str, Any], error: str) -> Dict[str, Any]:
+    """Placeholder result for a claim whose verification failed (not saved)"""
+    return {
+        "claim": claim["claim"],
+        "category": claim.get("category"),
+        "verification_status": "unverifiable",
+        "confidence": 0,
+        "evidence": "",
+        "sources": [],
+        "error": error,
+    }
+
+
+async def verify_claims(
+    claims: List[Dict[str, Any]],
+    verifier: BaseAgent,
+    concurrency: int = VERIFY_CONCURRENCY,
+    timeout: float = VERIFY_TIMEOUT_SECONDS,
+    cache: Optional[VerdictCache] = None,
+    escalate_to: Sequence[BaseAgent] = (),
+) -> List[Dict[str, Any]]:
+    """Verify claims concurrently
+
+    Args:
+        claims: Extracted claims (claim, context, category)
+        verifier: Agent that verifies one claim per run (the first tier)
+        concurrency: Maximum claims verified at once
+        timeout: Per-claim, per-tier timeout in seconds
+        cache: Verdict cache checked before, and filled after, each verification
+        escalate_to: Stronger verifiers tried in order when escalation_reason()
+            rejects the previous tier's verdict
+
+    Returns:
+        list: Verification results in the same order as claims, each with the
+            resolving "tier". When an escalation fails, the last tier that
+            produced a verdict resolves the claim and "escalation_failed"
+            holds the error; such verdicts are not cached. A claim whose every
+            tier failed yields a result with an "error" key instead of
+            aborting the others.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    tiers = [verifier, *escalate_to]
+
+    async def run_tier(agent: BaseAgent, claim: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            text, _ = await asyncio.wait_for(
+                run_agent(agent, _verification_request(claim)), timeout
+            )
+        except asyncio.TimeoutError:
+            logger.error(f"⏱️ Verification timed out after {timeout}s: {claim['claim'][:50]}...")
+            return _failed_result(claim, f"Timed out after {timeout}s")
+        except Exception as e:
+            logger.error(f"❌ Verification failed: {claim['claim'][:50]}... ({e})")
+            return _failed_result(claim, str(e))
+
+        result = parse_agent_json(text)
+        if not isinstance(result, dict):
+            return _failed_result(claim, "Unparseable verification output")
+        return result
+
+    async def verify_one(claim: Dict[str, Any]) -> Dict[str, Any]:
+        if cache:
+            cached = await cache.get(claim["claim"])
+            if cached:
+                logger.info(f"♻️ Reusing cached verdict: {claim['claim'][:50]}...")
+                return {**cached, "claim": claim["claim"], "category": claim.get("category"), "cached": True}
+
+        kept = None  # Last tier verdict that did not fail, with its agent
+        async with semaphore:
+            for index, agent in enumerate(tiers):
+                result = await run_tier(agent, claim)
+                if not result.get("error"):
+                    kept = (result, agent)
+                if index == len(tiers) - 1:
+                    break
+                reason = "error" if result.get("error") else escalation_reason(result)
+                if reason is None:
+                    break
+                cascade_stats.record_escalated(agent.name, reason)
+                logger.info(f"⬆️ Escalating ({reason}) past {agent.name}: {claim['claim'][:50]}...")
+
+        if kept is None:
+            return result
+
+        error = result.get("error")
+        result, agent = kept
+        if error:
+            cascade_stats.record_escalation_failed(agent.name)
+            logger.warning(f"⚠️ Escalation failed, keeping the {agent.name} verdict: {claim['claim'][:50]}...")
+            result["escalation_failed"] = error
+
+        cascade_stats.record_resolved(agent.name)
+        result["claim"] = claim["claim"]
+        result["tier"] = agent.name
+        result.setdefault("category", claim.get("category"))
+        if cache and not error:
+            await cache.put(claim["claim"], result)
+        return result
+
+    return list(await asyncio.gather(*(verify_one(claim) for claim in claims)))
+
+
+class ParallelVerifyStage(BaseAgent):
+    """Verify every claim in state['extracted_claims'] concurrently.
+
+    Full results go to state['verification_results'] (read by the save stage);
+    the response only carries a compact per-claim summary.
+    """
+
+    verifier: BaseAgent
+    escalate_to: List[BaseAgent] = []
+    concurrency: int = VERIFY_CONCURRENCY
+    timeout: float = VERIFY_TIMEOUT_SECONDS
+    use_verdict_cache: bool = VERDICT_CACHE_ENABLED
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        claims = get_extracted_claims(ctx.session.state)
+        logger.info(f"🔍 Verifying {len(claims)} claims (concurrency={self.concurrency})")
+
+        cache = verdict_cache if self.use_verdict_cache else None
+        results = await verify_claims(
+            claims, self.verifier, self.concurrency, self.timeout, cache, self.escalate_to
+        )
+        if cache:
+            logger.info(f"📊 Verdict cache: {cache.stats()}")
+        if self.escalate_to:
+            logger.info(f"📊 Verification tiers: {cascade_stats.stats()}")
+        # claim_id matches the ID the save stage will store (and what compaction keeps)
+        url = (ctx.session.state.get(CONTENT_ITEM) or {}).get("url") or "user_upload"
+        summary = [
+            {
+                "claim_id": generate_claim_id(url, result["claim"]),
+                "claim": result["claim"],
+                "verification_status": result.get("verification_status"),
+                "confidence": result.get("confidence"),
+                **({"error": result["error"]} if result.get("error") else {}),
+            }
+            for result in results
+        ]
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=json.dumps(summary))]),
+            actions=EventActions(state_delta={VERIFICATION_RESULTS: results}),
+        )
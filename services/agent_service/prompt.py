@@ -15,33 +15,31 @@ File: filename.mp4
 Artifact ID: veris_media_abc123.mp4
 GCS URL: https://storage.googleapis.com/veris-media/videos/..."
 Note that this is example actualy file names and url may vary.
+It may also include "Preview Artifact ID: veris_media_abc123_preview.jpg" - a compact
+preview (downscaled image, or keyframe contact sheet for videos).
 
 Pipeline Steps:
 
 1. EXTRACT CLAIMS
    - For uploaded media: Extract Artifact ID from message and call `claim_extraction_agent` with it
+     (pass the Preview Artifact ID instead when one is present)
    - For text: Call `claim_extraction_agent` with the text directly
    - Claim extractor agent will use load_artifacts() to access uploaded media
    - Agent returns: claims list, content_type, content_summary
    - If no claims → stop, return "No verifiable claims found"
 
-2. VERIFY EACH CLAIM
-   - For EACH claim:
-     - Call `verify_claim_agent` with claim + context
-     - Get: verification_status, confidence, evidence, sources
-     - Continue even if one fails
+2. VERIFY CLAIMS
+   - Call `verify_claims_agent` ONCE (request: "verify extracted claims")
+   - It verifies every extracted claim concurrently and returns, in order:
+     claim, verification_status, confidence (and error if that claim failed)
+   - A failed claim does not stop the others
 
 3. SAVE TO DATABASE
-   - For EACH verified claim:
-     - Call `save_verified_claim_agent` with:
-       * source: "User Upload" (for media) or source name
-       * url: "user_upload" (for media) or article URL
-       * content_type: "text" | "image" | "video"
-       * claim, category, verification_status, confidence, evidence, sources
-       * For uploaded media: Extract GCS URL from step 1 message
-         - images='["GCS_URL"]' for images
-         - videos='["GCS_URL"]' for videos
-       * For text: raw_text="content"
+   - After ALL claims are verified, call `save_verified_claim_agent` ONCE
+   - Verification results and the submitted content (text, source, url, media URLs) are
+     already kept in session state - do NOT repeat claims, verdicts or the article text
+   - request: {}
+   - Only if the user named a source/url in prose, pass just those: {"source": "BBC News", "url": "https://..."}
 
 4. FINAL REPORT
    - Total claims: X
@@ -0,0 +1,328 @@
+"""Re-verification of unresolved verdicts: re-run verification on stale claims
+
+Usage:
+    python -m agent_service.reverify --max-model-calls 200
+    python -m agent_service.reverify --status disputed --min-age-hours 72 --interval 3600
+
+Candidates are claims in REVERIFY_STATUSES (unverifiable and disputed by
+default, often "too recent, no coverage yet") with confidence at most
+REVERIFY_MAX_CONFIDENCE, not verified or rechecked in the last
+REVERIFY_MIN_AGE_HOURS, oldest first (index from migrations 004/005). Only the
+verification tiers run; extraction is not repeated. Rows sharing a claim hash
+are verified once. A row is updated only when its verdict moved (new status, or
+confidence off by REVERIFY_CONFIDENCE_DELTA or more); otherwise only its
+rechecked_at is touched. Each claim reserves its worst case (every tier
+retried MODEL_MAX_ATTEMPTS times) from REVERIFY_MAX_MODEL_CALLS and cannot send
+more model calls than that; it is charged every attempt sent, or the whole
+reservation if verification failed. Claims that no longer fit stay candidates
+for the next run. Runs go at reverify priority and are recorded in reverify_runs.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence
+from .database import async_db_client
+from .metrics import METRICS_DUMP_PATH, RunTotals, current_run, dump_metrics, metrics, start_exporters
+from .pipeline.model_scheduler import MODEL_MAX_ATTEMPTS, model_scheduler
+from .pipeline.priority import REVERIFY, priority_class
+from .pipeline.verify_stage import verify_claims
+from .sub_agents.verify_claim_agent.verify_claim_agent import verify_claim_tiers
+
+logger = logging.getLogger(__name__)
+
+REVERIFY_STATUSES = [
+    status.strip() for status in os.getenv("REVERIFY_STATUSES", "unverifiable,disputed").split(",") if status.strip()
+]
+REVERIFY_MAX_CONFIDENCE = float(os.getenv("REVERIFY_MAX_CONFIDENCE", "70"))
+REVERIFY_MIN_AGE_HOURS = float(os.getenv("REVERIFY_MIN_AGE_HOURS", "24"))
+REVERIFY_BATCH_SIZE = int(os.getenv("REVERIFY_BATCH_SIZE", "500"))
+REVERIFY_MAX_MODEL_CALLS = int(os.getenv("REVERIFY_MAX_MODEL_CALLS", "200"))
+REVERIFY_CONCURRENCY = int(os.getenv("REVERIFY_CONCURRENCY", "4"))
+REVERIFY_CONFIDENCE_DELTA = float(os.getenv("REVERIFY_CONFIDENCE_DELTA", "20"))
+REVERIFY_INTERVAL_SECONDS = float(os.getenv("REVERIFY_INTERVAL_SECONDS", "0"))
+
+# Served by idx_crawled_content_status_checked (migrations 004 and 005)
+SELECT_CANDIDATES_SQL = """
+    SELECT id, claim, category, claim_hash, verification_status, confidence, updated_at
+    FROM crawled_content
+    WHERE claim IS NOT NULL
+      AND verification_status = ANY(%s)
+      AND GREATEST(verified_at, rechecked_at) < %s
+      AND confidence <= %s
+    ORDER BY GREATEST(verified_at, rechecked_at), id
+    LIMIT %s
+"""
+# Skips rows re-saved by ingestion since they were selected
+UPDATE_VERDICT_SQL = """
+    UPDATE crawled_content SET
+        verification_status = %s, confidence = %s, evidence = %s,
+        verification_sources = %s::jsonb, verified_at = %s, rechecked_at = %s, updated_at = now()
+    WHERE id = %s AND updated_at = %s
+"""
+TOUCH_RECHECKED_SQL = "UPDATE crawled_content SET rechecked_at = %s WHERE id = ANY(%s)"
+RECORD_RUN_SQL = """
+    INSERT INTO reverify_runs
+        (started_at, finished_at, candidates, verified, moved, failed, deferred, model_calls, transitions)
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s::jsonb)
+"""
+
+
+class ModelCallBudget:
+    """Per-run cap on model calls: reserve the worst case up front, settle with the attempts charged"""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.spent = 0
+        self.reserved = 0
+
+    def reserve(self, calls: int) -> bool:
+        if self.spent + self.reserved + calls > self.limit:
+            return False
+        self.reserved += calls
+        return True
+
+    def settle(self, reserved: int, used: int) -> None:
+        self.reserved -= reserved
+        self.spent += used
+
+
+class ReverifyStats:
+    def __init__(self, budget: ModelCallBudget):
+        self.started = time.monotonic()
+        self.started_at = datetime.utcnow()
+        self.budget = budget
+        self.candidates = 0
+        self.claims = 0
+        self.verified = 0
+        self.moved = 0
+        self.unchanged = 0
+        self.failed = 0
+        self.deferred = 0
+        self.superseded = 0  # Re-saved by ingestion while being re-verified
+        self.transitions: Counter = Counter()
+
+    def record(self, outcome: str, rows: int = 1) -> None:
+        setattr(self, outcome, getattr(self, outcome) + rows)
+        metrics.inc("veris_reverify_rows_total", {"outcome": outcome}, rows)
+
+    def record_moved(self, old_status: str, new_status: str) -> None:
+        self.record("moved")
+        self.transitions[f"{old_status}→{new_status}"] += 1
+        metrics.inc("veris_reverify_moved_total", {"from": old_status, "to": new_status})
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "candidates": self.candidates,
+            "claims": self.claims,
+            "verified": self.verified,
+            "moved": self.moved,
+            "unchanged": self.unchanged,
+            "failed": self.failed,
+            "deferred": self.deferred,
+            "superseded": self.superseded,
+            "transitions": dict(self.transitions),
+            "model_calls": self.budget.spent,
+            "model_call_budget": self.budget.limit,
+            "elapsed_seconds": round(time.monotonic() - self.started, 1),
+            "model_scheduler": model_scheduler.stats(),
+        }
+
+
+def _confidence(verdict: Dict[str, Any]) -> float:
+    try:
+        return float(verdict.get("confidence") or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def verdict_moved(
+    row: Dict[str, Any], result: Dict[str, Any], confidence_delta: float = REVERIFY_CONFIDENCE_DELTA
+) -> bool:
+    """New status, or confidence off by at least confidence_delta"""
+    if result.get("verification_status") != row["verification_status"]:
+        return True
+    return abs(_confidence(result) - _confidence(row)) >= confidence_delta
+
+
+async def select_candidates(
+    statuses: Sequence[str], min_age_hours: float, max_confidence: float, limit: int
+) -> List[Dict[str, Any]]:
+    """Stale unresolved claim rows, least recently checked first"""
+    cutoff = datetime.utcnow() - timedelta(hours=min_age_hours)
+    result = await async_db_client.query(SELECT_CANDIDATES_SQL, (list(statuses), cutoff, max_confidence, limit))
+    if "error" in result:
+        raise RuntimeError(f"Candidate query failed: {result['error']}")
+    return result.get("rows", [])
+
+
+async def _apply(rows: List[Dict[str, Any]], result: Dict[str, Any], stats: ReverifyStats) -> None:
+    """Update rows whose verdict moved, touch rechecked_at on the rest (one transaction)"""
+    now = datetime.utcnow()
+    moved, unchanged = [], []
+    for row in rows:
+        (moved if verdict_moved(row, result) else unchanged).append(row)
+    confidence = int(_confidence(result))
+    updated = []
+    async with async_db_client.transaction() as cursor:
+        for row in moved:
+            await cursor.execute(UPDATE_VERDICT_SQL, (
+                result["verification_status"], confidence, result.get("evidence") or "",
+                json.dumps(result.get("sources") or []), now, now, row["id"], row["updated_at"],
+            ))
+            if cursor.rowcount:
+                updated.append(row)
+        if unchanged:
+            await cursor.execute(TOUCH_RECHECKED_SQL, (now, [row["id"] for row in unchanged]))
+
+    if len(updated) < len(moved):
+        stats.record("superseded", len(moved) - len(updated))
+    for row in updated:
+        stats.record_moved(row["verification_status"], result["verification_status"])
+        logger.info(
+            f"♻️ {row['verification_status']} → {result['verification_status']} "
+            f"({row['confidence']} → {confidence}): {row['claim'][:50]}..."
+        )
+    if unchanged:
+        stats.record("unchanged", len(unchanged))
+
+
+async def _reverify_claim(
+    rows: List[Dict[str, Any]], budget: ModelCallBudget, slots: asyncio.Semaphore, stats: ReverifyStats
+) -> None:
+    """Verify one claim (shared by rows) within the budget and apply the verdict"""
+    async with slots:
+        reserved = len(verify_claim_tiers) * MODEL_MAX_ATTEMPTS  # Every tier, every retry
+        if not budget.reserve(reserved):
+            stats.record("deferred", len(rows))
+            return
+
+        # Nested agent runs add their model attempts to this run's totals (ScheduledLlm)
+        run = RunTotals(
+            session_id="reverify", invocation_id=rows[0]["id"], agent="reverify", priority=REVERIFY,
+            max_model_attempts=reserved,
+        )
+        current_run.set(run)
+        claim = {"claim": rows[0]["claim"], "category": rows[0].get("category")}
+        result = None
+        try:
+            # No verdict cache: it would hand back the verdict being re-checked
+            result = (await verify_claims(
+                [claim], verify_claim_tiers[0], concurrency=1, escalate_to=verify_claim_tiers[1:]
+            ))[0]
+        finally:
+            # A failed or timed-out tier may have been billed for more than was seen
+            failed = result is None or result.get("error") or result.get("escalation_failed")
+            budget.settle(reserved, max(run.model_attempts, reserved) if failed else run.model_attempts)
+
+    stats.claims += 1
+    if result.get("error"):
+        stats.record("failed", len(rows))
+        return
+    stats.verified += len(rows)
+    try:
+        await _apply(rows, result, stats)
+    except Exception as e:
+        logger.error(f"❌ Could not apply re-verified verdict: {claim['claim'][:50]}... ({e})")
+        stats.record("failed", len(rows))
+
+
+async def run_reverify(
+    statuses: Sequence[str] = REVERIFY_STATUSES,
+    min_age_hours: float = REVERIFY_MIN_AGE_HOURS,
+    max_confidence: float = REVERIFY_MAX_CONFIDENCE,
+    limit: int = REVERIFY_BATCH_SIZE,
+    max_model_calls: int = REVERIFY_MAX_MODEL_CALLS,
+    concurrency: int = REVERIFY_CONCURRENCY,
+) -> Dict[str, Any]:
+    """One re-verification pass at reverify priority
+
+    Returns:
+        dict: Run report (candidates, verified, moved, unchanged, failed,
+            deferred, transitions, model calls against the budget)
+    """
+    if not verify_claim_tiers:
+        raise RuntimeError("verify_claim_agent is not available")
+
+    budget = ModelCallBudget(max_model_calls)
+    stats = ReverifyStats(budget)
+    with priority_class(REVERIFY):
+        rows = await select_candidates(statuses, min_age_hours, max_confidence, limit)
+        stats.candidates = len(rows)
+
+        # Rows repeating a claim (other URLs) share one verification
+        groups: Dict[str, List[Dict[str, Any]]] = {}
+        for row in rows:
+            groups.setdefault(row["claim_hash"] or row["claim"], []).append(row)
+        logger.info(f"🔍 Re-verifying {len(rows)} rows ({len(groups)} claims, budget {max_model_calls} model calls)")
+
+        slots = asyncio.Semaphore(max(1, concurrency))
+        await asyncio.gather(*(_reverify_claim(group, budget, slots, stats) for group in groups.values()))
+
+        report = stats.report()
+        result = await async_db_client.query(RECORD_RUN_SQL, (
+            stats.started_at, datetime.utcnow(), stats.candidates, stats.verified, stats.moved,
+            stats.failed, stats.deferred, budget.spent, json.dumps(report["transitions"]),
+        ))
+        if "error" in result:
+            logger.warning(f"⚠️ Run not recorded in reverify_runs: {result['error']}")
+
+    logger.info(
+        f"📊 Re-verification: {stats.moved}/{stats.verified} verdicts moved, {stats.failed} failed, "
+        f"{stats.deferred} deferred, {budget.spent}/{budget.limit} model calls"
+    )
+    return report
+
+
+def _parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Re-verify stale unresolved verdicts")
+    parser.add_argument(
+        "--status", action="append", dest="statuses", metavar="STATUS",
+        help=f"Verdict status to re-check (repeatable; default {','.join(REVERIFY_STATUSES)})",
+    )
+    parser.add_argument("--min-age-hours", type=float, default=REVERIFY_MIN_AGE_HOURS, help="Skip rows checked more recently")
+    parser.add_argument("--max-confidence", type=float, default=REVERIFY_MAX_CONFIDENCE, help="Skip rows above this confidence")
+    parser.add_argument("--limit", type=int, default=REVERIFY_BATCH_SIZE, help="Candidate rows per run")
+    parser.add_argument("--max-model-calls", type=int, default=REVERIFY_MAX_MODEL_CALLS, help="Model call budget per run")
+    parser.add_argument("--concurrency", type=int, default=REVERIFY_CONCURRENCY, help="Claims verified in parallel")
+    parser.add_argument(
+        "--interval", type=float, default=REVERIFY_INTERVAL_SECONDS, help="Repeat every N seconds (0 = run once)"
+    )
+    return parser.parse_args(argv)
+
+
+async def main(argv=None) -> int:
+    args = _parse_args(argv)
+    project_id = os.getenv("NEON_PROJECT_ID", "")
+    if not project_id:
+        logger.error("❌ NEON_PROJECT_ID required")
+        return 2
+    async_db_client.connect(project_id, os.getenv("NEON_DATABASE_NAME", "neondb"))
+
+    start_exporters()
+    report: Optional[Dict[str, Any]] = None
+    try:
+        while True:
+            report = await run_reverify(
+                args.statuses or REVERIFY_STATUSES, args.min_age_hours, args.max_confidence,
+                args.limit, args.max_model_calls, args.concurrency,
+            )
+            print(json.dumps(report, indent=2, ensure_ascii=False), flush=True)
+            if args.interval <= 0:
+                break
+            await asyncio.sleep(args.interval)
+    finally:
+        await async_db_client.disconnect()
+        if METRICS_DUMP_PATH:
+            dump_metrics()
+    return 1 if report and report["failed"] else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(asyncio.run(main()))
@@ -1,3 +1,3 @@
-from .claim_extration_agent import claim_extraction_agent
+from .claim_extration_agent import claim_extraction_agent, claim_extractor
 
-__all__ = ['claim_extraction_agent']
\ No newline at end of file
+__all__ = ['claim_extraction_agent', 'claim_extractor']
\ No newline at end of file
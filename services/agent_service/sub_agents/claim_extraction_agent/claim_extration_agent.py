@@ -3,22 +3,54 @@ import os
 from google.adk.agents import LlmAgent
 from google.adk.tools import load_artifacts
 from . import prompt
+from ...metrics import instrument_agent
+from ...pipeline.extract_stage import ChunkedExtractionStage
+from ...pipeline.extraction_cache import (
+    EXTRACTION_CACHE_DIR,
+    ExtractionCache,
+    extraction_cache_callbacks,
+    prompt_version,
+)
+from ...pipeline.model_scheduler import scheduled
 
 logger = logging.getLogger(__name__)
 
 GEMINI_MODEL = os.getenv("GEMINI_MODEL_MEDIUM", "gemini-2.5-pro")
+
+extraction_cache = ExtractionCache(EXTRACTION_CACHE_DIR, prompt_version(prompt.CLAIM_EXTRACTION_PROMPT, GEMINI_MODEL))
+serve_cached_extraction, store_extraction = extraction_cache_callbacks(extraction_cache)
+
 DESCRIPTION = "Extract atomic, verifiable claims from text or uploaded media. Uses load_artifacts to access uploaded images/videos."
+EXTRACTOR_DESCRIPTION = "Extract atomic, verifiable claims from one text, text window or uploaded media item."
 
-claim_extraction_agent = None
+claim_extractor = None
 try:
-    claim_extraction_agent = LlmAgent(
-        model=GEMINI_MODEL,
-        name="claim_extraction_agent",
-        description=DESCRIPTION,
+    claim_extractor = instrument_agent(LlmAgent(
+        model=scheduled(GEMINI_MODEL),
+        name="claim_extractor",
+        description=EXTRACTOR_DESCRIPTION,
         instruction=prompt.CLAIM_EXTRACTION_PROMPT,
         output_key="extracted_claims",
         tools=[load_artifacts],
-    )
-    logger.info(f"✅ Agent '{claim_extraction_agent.name}' created using model '{GEMINI_MODEL}'.")
+        before_agent_callback=serve_cached_extraction,
+        after_agent_callback=store_extraction,
+    ))
+    logger.info(f"✅ Agent '{claim_extractor.name}' created using model '{GEMINI_MODEL}'.")
 except Exception as e:
-    logger.error(f"❌ Could not create claim extraction agent. Error: {e}")
\ No newline at end of file
+    logger.error(f"❌ Could not create claim extractor. Error: {e}")
+
+# Long text is extracted in parallel windows; everything else goes to claim_extractor as is
+claim_extraction_agent = None
+if claim_extractor:
+    try:
+        claim_extraction_agent = instrument_agent(ChunkedExtractionStage(
+            name="claim_extraction_agent",
+            description=DESCRIPTION,
+            extractor=claim_extractor,
+        ))
+        logger.info(
+            f"✅ Agent '{claim_extraction_agent.name}' created (windows of {claim_extraction_agent.window_chars} "
+            f"chars above {claim_extraction_agent.min_chars}, concurrency={claim_extraction_agent.concurrency})."
+        )
+    except Exception as e:
+        logger.error(f"❌ Could not create claim extraction agent. Error: {e}")
\ No newline at end of file
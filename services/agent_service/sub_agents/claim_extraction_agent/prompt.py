@@ -9,6 +9,8 @@ For uploaded media:
 1. You'll see an Artifact ID (e.g., "veris_media_abc123.mp4")
 2. Call load_artifacts tool to access the media file, remember never guess the content of the file if you are not able to fetch
 the media file tell user about it but don't hallucinate or guess the content of the file.
+   Preview artifacts ("..._preview.jpg") are compact versions of the upload: a downscaled image,
+   or for videos a contact sheet of keyframes in time order (left to right, top to bottom, no audio).
 3. Analyze the visual content:
    - Images: text overlays, infographics, charts, statistics, memes
    - Videos: visual elements, audio, chyrons, banners, on-screen text
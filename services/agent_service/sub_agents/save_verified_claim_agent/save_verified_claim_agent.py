@@ -1,110 +1,76 @@
-import logging
-import os
 import json
-from google.adk.agents import LlmAgent
-from google.adk.tools import FunctionTool
-from . import prompt
-from ...database import save_verified_claim
+import logging
+from typing import AsyncGenerator
+from google.adk.agents import BaseAgent
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.events import Event, EventActions
+from google.genai import types
+from ...database.write_behind import asave_claims
+from ...metrics import instrument_agent
+from ...pipeline.state import (
+    SAVE_RESULT,
+    VERIFICATION_RESULTS,
+    build_claim_records,
+    parse_agent_json,
+)
 
 logger = logging.getLogger(__name__)
 
-GEMINI_MODEL = os.getenv("GEMINI_MODEL_ROOT", "gemini-2.5-flash")
-DESCRIPTION = "Save verified claims to database with full context (verification results + original content metadata). Maps verification output to database schema."
+DESCRIPTION = "Save all verified claims of the current content to the database in one batch. Reads the content and verification results from session state; request is {} or only overrides source/url."
 
 
-from typing import Optional
+class SaveVerifiedClaimStage(BaseAgent):
+    """Deterministic save stage - no model call.
 
-def save_claim_to_database(
-    source: str,
-    url: str,
-    content_type: str,
-    claim: str,
-    category: str,
-    verification_status: str,
-    confidence: int,
-    evidence: str,
-    sources: str,
-    media_references: str = "[]",
-    raw_text: Optional[str] = None,
-    images: str = "[]",
-    videos: str = "[]",
-    metadata: str = "{}"
-) -> dict:
+    Builds claim records from session state (content_item, extracted_claims,
+    verification_results) and hands them to the write-behind buffer (or
+    writes them with one batched upsert when it is disabled).
     """
-    Save verified claim to Neon database with full context
-    
-    Args:
-        source: Original content source name (e.g., "BBC News", "User Upload")
-        url: Original source URL (article link, social media URL, or "user_upload")
-        content_type: Type of content (text|image|video) - NEVER mixed
-        claim: The verified claim text
-        category: Claim category (health|politics|science|technology|finance|general)
-        verification_status: Verification result (verified|false|partially_true|unverifiable|disputed)
-        confidence: Confidence score (0-100)
-        evidence: Summary of evidence found during verification
-        sources: Verification source URLs as JSON string array
-        media_references: Media references as JSON string array
-        raw_text: Original article text (only for text content)
-        images: Image URL as JSON array (GCS URL for uploaded, e.g., '["https://storage.googleapis.com/..."]')
-        videos: Video URL as JSON array (GCS URL for uploaded, e.g., '["https://storage.googleapis.com/..."]')
-        metadata: Original content metadata as JSON object (optional)
-        
-    Returns:
-        dict: Success status with message and claim_id
-        
-    Note:
-        - url: Source/origin ("user_upload" for uploaded media, article URL for text)
-        - images/videos: Actual media URLs (GCS URLs for uploaded files)
-    """
-    try:
-        # Parse JSON strings
-        sources_list = json.loads(sources) if isinstance(sources, str) else sources or []
-        media_list = json.loads(media_references) if isinstance(media_references, str) else media_references or []
-        images_list = json.loads(images) if isinstance(images, str) else images or []
-        videos_list = json.loads(videos) if isinstance(videos, str) else videos or []
-        metadata_dict = json.loads(metadata) if isinstance(metadata, str) else metadata or {}
-        
-        logger.info(f"💾 Saving claim: {claim[:50]}... | {category} | {verification_status}")
-        
-        result = save_verified_claim(
-            source=source,
-            url=url,
-            content_type=content_type,
-            claim=claim,
-            category=category,
-            verification_status=verification_status,
-            confidence=confidence,
-            evidence=evidence,
-            sources=sources_list,
-            media_references=media_list,
-            raw_text=raw_text,
-            images=images_list,
-            videos=videos_list,
-            metadata=metadata_dict
+
+    async def _run_async_impl(
+        self, ctx: InvocationContext
+    ) -> AsyncGenerator[Event, None]:
+        request_text = ""
+        if ctx.user_content and ctx.user_content.parts:
+            request_text = "".join(part.text or "" for part in ctx.user_content.parts)
+        request = parse_agent_json(request_text)
+
+        records = build_claim_records(
+            ctx.session.state, request if isinstance(request, dict) else None
         )
-        
-        if result.get("success"):
-            logger.info(f"✅ Saved claim ID: {result.get('claim_id')}")
+
+        if records:
+            logger.info(f"💾 Saving {len(records)} claims from session state")
+            result = await asave_claims(records)
+            summary = {
+                "success": result["success"],
+                "message": result["message"],
+                "saved": result["saved"],
+                "claim_ids": [row["claim_id"] for row in result["results"]],
+                "errors": [row["error"] for row in result["results"] if row["error"]],
+            }
         else:
-            logger.error(f"❌ Save failed: {result.get('message')}")
-        
-        return result
-        
-    except Exception as e:
-        logger.error(f"❌ Exception saving claim: {e}")
-        return {"success": False, "message": str(e)}
+            logger.warning("⚠️ No verification results in state to save")
+            summary = {"success": False, "message": "No verification results to save", "saved": 0}
+
+        yield Event(
+            invocation_id=ctx.invocation_id,
+            author=self.name,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=json.dumps(summary))]),
+            actions=EventActions(state_delta={
+                SAVE_RESULT: summary,
+                VERIFICATION_RESULTS: [],
+            }),
+        )
 
 
 save_verified_claim_agent = None
 try:
-    save_verified_claim_agent = LlmAgent(
-        model=GEMINI_MODEL,
+    save_verified_claim_agent = instrument_agent(SaveVerifiedClaimStage(
         name="save_verified_claim_agent",
         description=DESCRIPTION,
-        instruction=prompt.SAVE_CLAIM_PROMPT,
-        output_key="save_result",
-        tools=[FunctionTool(save_claim_to_database)]
-    )
-    logger.info(f"✅ Agent '{save_verified_claim_agent.name}' created using model '{GEMINI_MODEL}'.")
+    ))
+    logger.info(f"✅ Agent '{save_verified_claim_agent.name}' created (deterministic save stage).")
 except Exception as e:
-    logger.error(f"❌ Could not create save verified claim agent. Error: {e}")
\ No newline at end of file
+    logger.error(f"❌ Could not create save verified claim agent. Error: {e}")
@@ -1,3 +1,3 @@
-from .verify_claim_agent import verify_claim_agent
+from .verify_claim_agent import verify_claim_agent, verify_claim_tiers, verify_claims_agent
 
-__all__ = ['verify_claim_agent']
\ No newline at end of file
+__all__ = ['verify_claim_agent', 'verify_claim_tiers', 'verify_claims_agent']
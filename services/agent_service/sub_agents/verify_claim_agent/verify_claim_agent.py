@@ -3,24 +3,55 @@ import os
 from google.adk.agents import LlmAgent
 from google.adk.tools import google_search
 from . import prompt
-from dotenv import load_dotenv
+from ...metrics import instrument_agent
+from ...pipeline.model_scheduler import scheduled
+from ...pipeline.verify_stage import ParallelVerifyStage
 
-load_dotenv()
 logger = logging.getLogger(__name__)
 
 GEMINI_MODEL = os.getenv("GEMINI_MODEL_LATEST", "gemini-3-pro-preview")
+# Cheaper models tried before GEMINI_MODEL, in order (e.g. "gemini-2.5-flash"); empty = pro only
+VERIFY_CASCADE_MODELS = [
+    model.strip() for model in os.getenv("VERIFY_CASCADE_MODELS", "").split(",") if model.strip()
+]
+PARALLEL_DESCRIPTION = "Verify ALL extracted claims of the current content concurrently (reads them from session state). Returns per-claim verdict and confidence; full evidence is kept in session state."
 DESCRIPTION = "Verify claims using tiered source strategy (gov/academic → trusted media → experts). Returns verdict, confidence, evidence summary, and source URLs."
 
 verify_claim_agent = None
 try:
-    verify_claim_agent = LlmAgent(
-        model=GEMINI_MODEL,
+    verify_claim_agent = instrument_agent(LlmAgent(
+        model=scheduled(GEMINI_MODEL),
         name="verify_claim_agent",
         description=DESCRIPTION,
         instruction=prompt.VERIFY_CLAIM_PROMPT,
         output_key="verification_result",
-        tools=[google_search]
-    )
+        tools=[google_search],
+    ))
     logger.info(f"✅ Agent '{verify_claim_agent.name}' created using model '{GEMINI_MODEL}'.")
 except Exception as e:
-    logger.error(f"❌ Could not create verify claim agent. Error: {e}")
\ No newline at end of file
+    logger.error(f"❌ Could not create verify claim agent. Error: {e}")
+
+# Verification tiers, cheapest first; the last tier is always verify_claim_agent
+verify_claim_tiers = []
+if verify_claim_agent:
+    verify_claim_tiers = [
+        verify_claim_agent.clone(update={"name": f"verify_claim_agent_tier{index + 1}", "model": scheduled(model)})
+        for index, model in enumerate(VERIFY_CASCADE_MODELS)
+    ] + [verify_claim_agent]
+
+verify_claims_agent = None
+if verify_claim_agent:
+    try:
+        verify_claims_agent = instrument_agent(ParallelVerifyStage(
+            name="verify_claims_agent",
+            description=PARALLEL_DESCRIPTION,
+            verifier=verify_claim_tiers[0],
+            escalate_to=verify_claim_tiers[1:],
+        ))
+        tiers = " → ".join(str(agent.model) for agent in verify_claim_tiers)
+        logger.info(
+            f"✅ Agent '{verify_claims_agent.name}' created "
+            f"(concurrency={verify_claims_agent.concurrency}, tiers: {tiers})."
+        )
+    except Exception as e:
+        logger.error(f"❌ Could not create parallel verify stage. Error: {e}")
@@ -0,0 +1,89 @@
+"""Near-duplicate claim matching: paraphrases match, different figures never do"""
+import asyncio
+import pytest
+from agent_service.pipeline import claim_index as claim_index_module
+from agent_service.pipeline.claim_index import ClaimIndex, _pack, claim_numbers, claim_tokens
+
+
+@pytest.mark.parametrize("claim, numbers", [
+    ("The vaccine was 95% effective", {"95%"}),
+    ("GDP grew 5.2 percent in Q4 2024", {"5.2%", "2024"}),
+    ("Exports rose 12 per cent", {"12%"}),
+    ("The city has 1,000,000 residents", {"1000000"}),
+    ("Covid19 cases fell", set()),
+])
+def test_claim_numbers_are_kept_whole(claim, numbers):
+    assert claim_numbers(claim) == numbers
+
+
+def test_decimals_are_not_split():
+    assert {"5.2%"} <= claim_tokens("Unemployment was 5.2% in March")
+    assert "5" not in claim_tokens("Unemployment was 5.2% in March")
+
+
+@pytest.mark.parametrize("stored, lookup", [
+    ("The vaccine was 95% effective in clinical trials", "The vaccine was 59% effective in clinical trials"),
+    ("Unemployment fell to 5.2 percent in March 2024", "Unemployment fell to 5.3 percent in March 2024"),
+    ("The bridge cost 1.5 billion dollars to build", "The bridge cost 15 billion dollars to build"),
+    ("Exports rose 12% in the fourth quarter of 2023", "Exports rose 12% in the fourth quarter of 2024"),
+    ("Crime dropped 10% across the whole country last year", "Crime dropped across the whole country last year"),
+])
+def test_claims_differing_only_in_figures_never_match(stored, lookup):
+    index = ClaimIndex(threshold=0.5)
+    index.add("stored", stored)
+    assert index.find(lookup) is None
+
+
+@pytest.mark.parametrize("stored, lookup", [
+    ("The vaccine was 95% effective in clinical trials", "In clinical trials the vaccine was 95 percent effective"),
+    ("Inflation in Q4 2024 was 3.1%", "Inflation in the fourth quarter of 2024 was 3.1 per cent"),
+    ("The city has 1,000,000 residents", "The city has 1000000 residents"),
+])
+def test_paraphrases_with_same_figures_match(stored, lookup):
+    index = ClaimIndex()
+    index.add("stored", stored)
+    match = index.find(lookup)
+    assert match is not None and match[0] == "stored"
+
+
+def test_index_is_capped_and_keeps_newest():
+    index = ClaimIndex(max_claims=10)
+    for number in range(25):
+        index.add(f"claim-{number}", f"Claim number {number} about the national budget deficit")
+    assert len(index) <= 10
+    assert index.evicted == 25 - len(index)
+    assert index.find("Claim number 24 about the national budget deficit")[0] == "claim-24"
+    assert index.find("Claim number 0 about the national budget deficit") is None
+
+
+class StoredIndex:
+    """async_db_client stand-in answering the claim_bands lookup with fixed rows"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    async def query(self, sql, params=None):
+        self.queries.append((sql, params))
+        return {"rows": self.rows} if sql.lstrip().startswith("SELECT") else {"rowcount": 1}
+
+
+def test_claims_evicted_from_memory_are_found_in_the_stored_index(monkeypatch):
+    stored = "The vaccine was 95% effective in clinical trials"
+    signature = ClaimIndex().signature(stored)
+    database = StoredIndex([{"claim_hash": "stored", "signature": _pack(signature)}])
+    monkeypatch.setattr(claim_index_module, "async_db_client", database)
+    index = ClaimIndex(persistent=True)
+
+    match = asyncio.run(index.afind("In clinical trials the vaccine was 95 percent effective"))
+
+    assert match is not None and match[0] == "stored"
+    _, params = database.queries[0]
+    assert params[1] == index._band_keys(index.signature("In clinical trials the vaccine was 95 percent effective"))
+    assert index.find(stored)[0] == "stored"  # kept in memory for the next lookup
+
+
+def test_band_keys_are_stable_across_processes():
+    signature = list(range(32))
+    assert ClaimIndex()._band_keys(signature) == ClaimIndex()._band_keys(signature)
+    assert ClaimIndex()._band_keys(signature)[0] == -387804988308644362  # as stored in claim_bands
@@ -0,0 +1,65 @@
+"""Incremental export: safety-window skips and the bounded recent set"""
+from datetime import datetime, timedelta
+from agent_service import export
+
+COLUMNS = ["id", "updated_at"]
+START = datetime(2025, 1, 1)
+
+
+class FakeStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.starts = []
+
+    def stream(self, sql, start, fetch_size):
+        self.starts.append(start)
+        for rows in self.chunks:
+            yield COLUMNS, rows
+
+
+class ListWriter:
+    def __init__(self):
+        self.rows = []
+
+    def write(self, columns, rows):
+        self.rows.extend(rows)
+
+
+def test_recent_stays_bounded_across_a_wide_time_range(monkeypatch):
+    # 20 chunks an hour apart, 5 rows a minute apart in each
+    chunks = [
+        [(f"c{hour}-{minute}", START + timedelta(hours=hour, minutes=minute)) for minute in range(5)]
+        for hour in range(20)
+    ]
+    monkeypatch.setattr(export, "db_client", FakeStream(chunks))
+    sizes = []
+    prune = export._prune_recent
+
+    def spy(recent, newest, window):
+        pruned = prune(recent, newest, window)
+        sizes.append(len(pruned))
+        return pruned
+
+    monkeypatch.setattr(export, "_prune_recent", spy)
+    writer = ListWriter()
+    result = export.export_claims(writer, (START - timedelta(hours=1), ""), recent={}, window_seconds=300)
+
+    assert result["rows"] == len(writer.rows) == 100
+    assert len(sizes) == 20 and max(sizes) == 5
+    assert result["last"] == (START + timedelta(hours=19, minutes=4), "c19-4")
+    assert sorted(result["recent"]) == [f"c19-{minute}" for minute in range(5)]
+
+
+def test_rows_already_exported_inside_the_window_are_skipped(monkeypatch):
+    since = (START, "b")
+    fake = FakeStream([[("a", START - timedelta(seconds=30)), ("late", START - timedelta(seconds=10)),
+                        ("b", START), ("c", START + timedelta(seconds=5))]])
+    monkeypatch.setattr(export, "db_client", fake)
+    writer = ListWriter()
+    recent = {"a": (START - timedelta(seconds=30)).isoformat(), "b": START.isoformat()}
+    result = export.export_claims(writer, since, recent=recent, window_seconds=60)
+
+    assert fake.starts == [(START - timedelta(seconds=60), "")]
+    assert [row[0] for row in writer.rows] == ["late", "c"]
+    assert result["last"] == (START + timedelta(seconds=5), "c")
+    assert set(result["recent"]) == {"a", "late", "b", "c"}
@@ -0,0 +1,25 @@
+"""Merging per-window extractions: overlap duplicates go, distinct figures stay"""
+from agent_service.pipeline.extract_stage import merge_extractions
+
+
+def _windows(*claims):
+    return [{"extracted_claims": [{"claim": claim}]} for claim in claims]
+
+
+def test_overlap_duplicate_is_dropped():
+    merged = merge_extractions(_windows(
+        "Exports rose 12% in the fourth quarter of 2023",
+        "Exports rose 12% in the fourth quarter of 2023.",
+    ))
+    assert len(merged["extracted_claims"]) == 1
+
+
+def test_claims_differing_only_in_figures_are_kept():
+    merged = merge_extractions(_windows(
+        "Exports of German machine tools to China rose 12% in the fourth quarter of 2023",
+        "Exports of German machine tools to China rose 21% in the fourth quarter of 2023",
+    ))
+    assert [claim["claim"] for claim in merged["extracted_claims"]] == [
+        "Exports of German machine tools to China rose 12% in the fourth quarter of 2023",
+        "Exports of German machine tools to China rose 21% in the fourth quarter of 2023",
+    ]
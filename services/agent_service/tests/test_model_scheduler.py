@@ -0,0 +1,78 @@
+"""Model scheduler: 429 retries only before output, per-minute limit validation"""
+import asyncio
+import pytest
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from agent_service.metrics import RunTotals, current_run
+from agent_service.pipeline.model_scheduler import ModelCallLimitExceeded, ModelScheduler, scheduled
+from agent_service.pipeline.rate_limit import RateLimiter
+
+
+class Overloaded(Exception):
+    code = 429
+
+
+class FlakyLlm(BaseLlm):
+    """Streams one chunk without usage metadata, then fails with a 429"""
+
+    calls: int = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        self.calls += 1
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="partial")]))
+        raise Overloaded("quota exceeded mid-stream")
+
+
+def test_call_is_not_retried_after_a_response_was_yielded():
+    llm = FlakyLlm(model="flaky-test-model")
+
+    async def run():
+        chunks = []
+        with pytest.raises(Overloaded):
+            async for response in scheduled(llm).generate_content_async(LlmRequest(), stream=True):
+                chunks.append(response)
+        return chunks
+
+    assert len(asyncio.run(run())) == 1
+    assert llm.calls == 1
+
+
+def test_attempts_past_the_run_limit_are_refused():
+    llm = FlakyLlm(model="limited-test-model")
+    run = RunTotals(session_id="s", invocation_id="i", agent="a", priority="interactive", max_model_attempts=2)
+
+    async def call():
+        async for _ in scheduled(llm).generate_content_async(LlmRequest()):
+            pass
+
+    async def run_calls():
+        current_run.set(run)
+        for _ in range(2):
+            with pytest.raises(Overloaded):
+                await call()
+        with pytest.raises(ModelCallLimitExceeded):
+            await call()
+
+    asyncio.run(run_calls())
+    assert llm.calls == 2 and run.model_attempts == 2
+
+
+def test_zero_limit_means_unlimited():
+    scheduler = ModelScheduler({"model": 0}, {})
+    assert scheduler.lane("model").requests is None
+    scheduler.set_limits("model", rpm=60)
+    assert scheduler.lane("model").requests is not None
+    scheduler.set_limits("model", rpm=0)
+    assert scheduler.lane("model").requests is None
+
+
+@pytest.mark.parametrize("make", [
+    lambda: RateLimiter(0),
+    lambda: ModelScheduler({"model": -1}, {}),
+    lambda: ModelScheduler({}, {}).set_limits("model", tpm=-5),
+])
+def test_invalid_limits_are_rejected(make):
+    with pytest.raises(ValueError):
+        make()
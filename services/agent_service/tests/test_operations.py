@@ -0,0 +1,176 @@
+"""Batch claim saves: VALUES vs COPY paths, per-row results, (url, claim) dedupe"""
+import asyncio
+import csv
+import io
+from contextlib import asynccontextmanager, contextmanager
+import pytest
+from agent_service.database import operations
+from agent_service.database.operations import CLAIM_COLUMNS, CONTENT_COLUMNS
+
+ID, URL, CLAIM = CLAIM_COLUMNS.index("id"), CLAIM_COLUMNS.index("url"), CLAIM_COLUMNS.index("claim")
+
+
+class FakeCursor:
+    """Records SQL, parameters and COPY payloads; RETURNING echoes the claim rows written"""
+
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+        self.statements = []
+        self.copies = []
+        self._returning = []
+
+    def execute(self, sql, params=None):
+        if self.fail_on and self.fail_on in sql:
+            raise RuntimeError("duplicate key value violates unique constraint")
+        self.statements.append((sql, params))
+        if "FROM crawled_content_staging" in sql:
+            rows = self.copies[-1][1]
+        elif sql.startswith("INSERT INTO crawled_content ("):
+            width = len(CLAIM_COLUMNS)
+            rows = [params[start:start + width] for start in range(0, len(params), width)]
+        else:
+            return
+        self._returning = [{"id": row[ID], "url": row[URL], "claim": row[CLAIM]} for row in rows]
+
+    def fetchall(self):
+        return self._returning
+
+    def copy_expert(self, sql, buffer):
+        payload = buffer.read()
+        self.copies.append((sql, list(csv.reader(io.StringIO(payload))), payload))
+
+
+class AsyncFakeCursor(FakeCursor):
+    async def execute(self, sql, params=None):
+        FakeCursor.execute(self, sql, params)
+
+    async def fetchall(self):
+        return self._returning
+
+    @asynccontextmanager
+    async def copy(self, sql):
+        rows = []
+
+        class Copy:
+            async def write_row(self, row):
+                rows.append(row)
+
+        yield Copy()
+        self.copies.append((sql, rows, None))
+
+
+class FakeClient:
+    def __init__(self, cursor):
+        self.cursor = cursor
+
+    @contextmanager
+    def transaction(self):
+        yield self.cursor
+
+
+class AsyncFakeClient(FakeClient):
+    @asynccontextmanager
+    async def transaction(self):
+        yield self.cursor
+
+
+def _claim(n, **overrides):
+    return {
+        "source": "Test", "url": f"https://example.com/{n % 2}", "content_type": "text",
+        "claim": f"Claim number {n}", "verification_status": "verified", "confidence": 80,
+        "evidence": "", "sources": [], **overrides,
+    }
+
+
+@pytest.fixture
+def cursor(monkeypatch):
+    cursor = FakeCursor()
+    monkeypatch.setattr(operations, "db_client", FakeClient(cursor))
+    monkeypatch.setattr(operations, "COPY_THRESHOLD", 3)
+    return cursor
+
+
+@pytest.fixture
+def async_cursor(monkeypatch):
+    cursor = AsyncFakeCursor()
+    monkeypatch.setattr(operations, "async_db_client", AsyncFakeClient(cursor))
+    monkeypatch.setattr(operations, "COPY_THRESHOLD", 3)
+    return cursor
+
+
+def test_small_batch_is_one_values_upsert(cursor):
+    result = operations.save_verified_claims_batch([_claim(0), _claim(1)])
+
+    assert result["success"] and result["saved"] == 2
+    content_sql, content_params = cursor.statements[0]
+    assert content_sql.startswith("INSERT INTO content (")
+    assert len(content_params) == 2 * len(CONTENT_COLUMNS)  # two articles, one row each
+    claim_sql, claim_params = cursor.statements[1]
+    assert claim_sql.count("%s::jsonb") == 2 * 2  # verification_sources, media_references per row
+    assert "ON CONFLICT (url, claim)" in claim_sql and "RETURNING id, url, claim" in claim_sql
+    assert len(claim_params) == 2 * len(CLAIM_COLUMNS)
+    assert not cursor.copies
+
+
+def test_batch_at_threshold_is_copied_and_merged(cursor):
+    claims = [_claim(n) for n in range(3)]
+    claims[1]["near_duplicate_of"], claims[1]["similarity"] = "abc123", 0.9
+
+    result = operations.save_verified_claims_batch(claims)
+
+    assert result["saved"] == 3
+    assert cursor.statements[1][0].startswith("CREATE TEMP TABLE crawled_content_staging")
+    sql, rows, payload = cursor.copies[0]
+    assert "FORCE_NULL (near_duplicate_of, near_duplicate_similarity)" in sql
+    assert all(line.startswith('"') and line.endswith('"') for line in payload.splitlines())  # QUOTE_ALL
+    near_dup = CLAIM_COLUMNS.index("near_duplicate_of")
+    assert [row[near_dup] for row in rows] == ["", "abc123", ""]  # "" is read back as NULL
+    assert cursor.statements[-1][0].startswith("INSERT INTO crawled_content (")
+    assert "FROM crawled_content_staging" in cursor.statements[-1][0]
+
+
+def test_duplicates_and_invalid_rows_are_reported_per_row(cursor):
+    claims = [
+        _claim(0, confidence=10),
+        _claim(1, verification_status=None),
+        _claim(0, confidence=90),  # same (url, claim): last one wins
+        _claim(2, confidence="high"),
+    ]
+
+    result = operations.save_verified_claims_batch(claims)
+
+    assert [row["success"] for row in result["results"]] == [True, False, True, False]
+    assert result["results"][0]["claim_id"] == result["results"][2]["claim_id"]
+    assert result["results"][1]["error"] == "Invalid claim: missing verification_status"
+    assert result["results"][3]["error"].startswith("Invalid claim:")
+    _, params = cursor.statements[1]
+    assert len(params) == len(CLAIM_COLUMNS)
+    assert params[CLAIM_COLUMNS.index("confidence")] == 90
+    assert result["message"] == "Saved 2/4 claims"
+
+
+def test_database_error_fails_every_valid_row(cursor):
+    cursor.fail_on = "INSERT INTO crawled_content ("
+
+    result = operations.save_verified_claims_batch([_claim(0), _claim(1, claim=None)])
+
+    assert [row["success"] for row in result["results"]] == [False, False]
+    assert result["results"][0]["error"] == "duplicate key value violates unique constraint"
+    assert result["results"][1]["error"] == "Invalid claim: missing claim"
+
+
+@pytest.mark.parametrize("count, copied", [(2, False), (3, True)])
+def test_async_batch_uses_the_same_threshold(async_cursor, count, copied):
+    result = asyncio.run(operations.asave_verified_claims_batch([_claim(n) for n in range(count)]))
+
+    assert result["saved"] == count
+    assert bool(async_cursor.copies) == copied
+    if copied:
+        assert [row[CLAIM] for row in async_cursor.copies[0][1]] == [f"Claim number {n}" for n in range(count)]
+
+
+def test_content_hash_matches_the_migration_backfill_for_non_ascii_media():
+    # md5(concat_ws('|', source, url, images::text, '[]', md5(raw_text))) as computed by migration 002
+    assert operations.content_hash(
+        "User Upload", "user_upload", ["gs://veris/images/café_日本.png"], None, "Foto del puente"
+    ) == "82b82c1f814ed86ea5fa6585dd467c83"
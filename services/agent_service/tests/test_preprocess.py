@@ -0,0 +1,51 @@
+"""Video previews: the video reaches ffmpeg without a copy in memory-backed /tmp"""
+import subprocess
+from pathlib import Path
+import pytest
+from agent_service.media import preprocess
+
+Image = pytest.importorskip("PIL.Image")
+
+VIDEO = b"\x00\x00\x00\x18ftypmp42" + b"\x01" * 4096
+
+
+@pytest.fixture
+def ffmpeg(monkeypatch):
+    calls = []
+
+    def run(args, input=None, **kwargs):
+        source = args[args.index("-i") + 1]
+        calls.append({
+            "source": source,
+            "stdin": input,
+            "spooled": None if source == "pipe:0" else Path(source).read_bytes(),
+        })
+        output = Path(args[-1])
+        for index in range(1, 4):
+            Image.new("RGB", (48, 27), (index * 60, 0, 0)).save(output.parent / (output.name % index))
+        return subprocess.CompletedProcess(args, 0, b"", b"  Duration: 00:00:12.00, start: 0.000000")
+
+    monkeypatch.setattr(preprocess, "MEDIA_PREPROCESS_ENABLED", True)
+    monkeypatch.setattr(preprocess.shutil, "which", lambda binary: binary)
+    monkeypatch.setattr(preprocess.subprocess, "run", run)
+    return calls
+
+
+def test_video_is_piped_to_ffmpeg_without_a_spool_dir(monkeypatch, ffmpeg):
+    monkeypatch.setattr(preprocess, "MEDIA_SPOOL_DIR", None)
+    preview = preprocess.preprocess_media(VIDEO, "video/mp4")
+
+    assert ffmpeg == [{"source": "pipe:0", "stdin": VIDEO, "spooled": None}]
+    assert preview.mime_type == "image/jpeg"
+    assert preview.report["frames"] == 3 and preview.report["duration_seconds"] == 12.0
+
+
+def test_video_is_spooled_to_the_spool_dir(monkeypatch, ffmpeg, tmp_path):
+    monkeypatch.setattr(preprocess, "MEDIA_SPOOL_DIR", str(tmp_path))
+    preview = preprocess.preprocess_media(VIDEO, "video/mp4")
+
+    [call] = ffmpeg
+    assert Path(call["source"]).is_relative_to(tmp_path)
+    assert call["stdin"] is None and call["spooled"] == VIDEO
+    assert preview.report["frames"] == 3
+    assert list(tmp_path.iterdir()) == []  # Work dir removed afterwards
@@ -0,0 +1,35 @@
+"""PriorityGate: timed-out or cancelled acquires never leak a slot"""
+import asyncio
+import pytest
+from agent_service.pipeline.priority import INTERACTIVE, PriorityGate
+
+
+def test_acquire_times_out_without_taking_a_slot():
+    gate = PriorityGate("test", 1)
+
+    async def run():
+        await gate.acquire(INTERACTIVE)
+        with pytest.raises(asyncio.TimeoutError):
+            await gate.acquire(INTERACTIVE, timeout=0.05)
+
+    asyncio.run(run())
+    assert gate.in_flight[INTERACTIVE] == 1
+    assert gate.waiting[INTERACTIVE] == 0
+
+
+def test_slot_granted_as_the_caller_is_cancelled_is_released():
+    gate = PriorityGate("test", 1)
+
+    async def run():
+        await gate.acquire(INTERACTIVE)
+        caller = asyncio.ensure_future(gate.acquire(INTERACTIVE, timeout=10))
+        await asyncio.sleep(0.01)  # caller is queued
+        await gate.release(INTERACTIVE)  # grants the slot to the caller...
+        caller.cancel()  # ...which is cancelled before it resumes
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        await asyncio.sleep(0.01)
+
+    asyncio.run(run())
+    assert gate.in_flight[INTERACTIVE] == 0
+    assert gate.waiting[INTERACTIVE] == 0
@@ -0,0 +1,102 @@
+"""Claim listing: keyset cursors and the short-TTL query cache"""
+from datetime import datetime
+import pytest
+from agent_service.database import queries
+from agent_service.database.queries import (
+    ClaimFilter, ClaimPage, QueryCache, build_list_query, decode_cursor, encode_cursor,
+)
+
+UPDATED_AT = datetime(2025, 3, 1, 12, 30, 15, 123456)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(queries.time, "monotonic", clock)
+    return clock
+
+
+def _page(claim_id):
+    return ClaimPage(claims=[{"id": claim_id, "verification_sources": [{"url": "https://a.example"}]}])
+
+
+def test_cursor_round_trips_the_sort_key():
+    cursor = encode_cursor({"updated_at": UPDATED_AT, "id": "claim-1"})
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (UPDATED_AT, "claim-1")
+
+
+@pytest.mark.parametrize("cursor", ["not a cursor", encode_cursor({"updated_at": UPDATED_AT, "id": "x"})[:-4], ""])
+def test_malformed_cursor_is_a_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_cursor_continues_after_the_last_row_in_sort_direction():
+    cursor = encode_cursor({"updated_at": UPDATED_AT, "id": "claim-1"})
+    sql, params = build_list_query(ClaimFilter(category="health"), cursor, limit=10)
+    assert "(updated_at, id) < (%s, %s)" in sql and "ORDER BY updated_at DESC, id DESC" in sql
+    assert params == ("health", UPDATED_AT, "claim-1", 11)
+
+    sql, _ = build_list_query(ClaimFilter(ascending=True), cursor)
+    assert "(updated_at, id) > (%s, %s)" in sql and "ORDER BY updated_at ASC, id ASC" in sql
+
+
+def test_entries_expire_after_the_ttl(clock):
+    cache = QueryCache(ttl=10, max_entries=4)
+    cache.put(("q", (1,)), _page("a"))
+    clock.now += 9
+    assert cache.get(("q", (1,))).claims[0]["id"] == "a"
+    clock.now += 2
+    assert cache.get(("q", (1,))) is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 0}
+
+
+def test_least_recently_used_entry_is_evicted(clock):
+    cache = QueryCache(ttl=10, max_entries=2)
+    cache.put(("q", (1,)), _page("a"))
+    cache.put(("q", (2,)), _page("b"))
+    cache.get(("q", (1,)))
+    cache.put(("q", (3,)), _page("c"))
+    assert cache.get(("q", (2,))) is None
+    assert cache.get(("q", (1,))) is not None and cache.get(("q", (3,))) is not None
+
+
+def test_zero_ttl_disables_caching(clock):
+    cache = QueryCache(ttl=0)
+    cache.put(("q", ()), _page("a"))
+    assert cache.get(("q", ())) is None
+
+
+def test_callers_cannot_modify_cached_rows(clock, monkeypatch):
+    class FakeClient:
+        calls = 0
+
+        def query(self, sql, params):
+            self.calls += 1
+            return {"rows": [{"id": "a", "updated_at": UPDATED_AT, "verification_sources": [{"url": "https://a.example"}]}]}
+
+    client = FakeClient()
+    monkeypatch.setattr(queries, "db_client", client)
+    monkeypatch.setattr(queries, "query_cache", QueryCache(ttl=10))
+
+    first = queries.claims_for_url("https://a.example")
+    first.claims[0]["id"] = "changed"
+    first.claims[0]["verification_sources"].append({"url": "https://b.example"})
+    first.claims.clear()
+
+    second = queries.claims_for_url("https://a.example")
+    second.claims[0]["verification_sources"].clear()
+    third = queries.claims_for_url("https://a.example")
+
+    assert client.calls == 1
+    assert second.claims[0]["id"] == third.claims[0]["id"] == "a"
+    assert third.claims[0]["verification_sources"] == [{"url": "https://a.example"}]
@@ -0,0 +1,157 @@
+"""Re-verification: grouping, moved/unchanged, the updated_at guard and the model call budget"""
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from google.adk.agents import LlmAgent
+from agent_service import reverify
+from agent_service.bench.fake_db import InMemoryDatabase
+from agent_service.bench.scripted_llm import VERDICTS, ScriptedLlm
+from agent_service.database.operations import CLAIM_COLUMNS, claim_hash, generate_claim_id
+from agent_service.metrics import instrument_agent
+from agent_service.pipeline import model_scheduler
+from agent_service.pipeline.model_scheduler import MODEL_MAX_ATTEMPTS, scheduled
+
+STALE = datetime.utcnow() - timedelta(days=3)
+DELTA = reverify.REVERIFY_CONFIDENCE_DELTA
+
+
+class Overloaded(Exception):
+    code = 429
+
+
+class FlakyLlm(ScriptedLlm):
+    """ScriptedLlm that is rate limited `throttled` times, then fails with `error` if set"""
+
+    throttled: int = 0
+    error: str = ""
+
+    async def generate_content_async(self, llm_request, stream=False):
+        if self.throttled:
+            self.throttled -= 1
+            raise Overloaded("quota exceeded")
+        if self.error:
+            raise RuntimeError(self.error)
+        async for response in super().generate_content_async(llm_request, stream):
+            yield response
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = InMemoryDatabase()
+    client = SimpleNamespace()
+    database.install(SimpleNamespace(), client)
+    monkeypatch.setattr(reverify, "async_db_client", client)
+    monkeypatch.setattr(model_scheduler, "retry_delay", lambda error, attempt: 0.0)
+    return database
+
+
+@pytest.fixture
+def llm(monkeypatch, request):
+    llm = FlakyLlm(model=f"gemini-test-reverify-{request.node.name}", role="verify")
+    agent = instrument_agent(LlmAgent(model=scheduled(llm), name="verify_claim_agent", instruction="Verify the claim."))
+    monkeypatch.setattr(reverify, "verify_claim_tiers", [agent])
+    return llm
+
+
+def _verdict(claim):
+    return ScriptedLlm(model="gemini-test", role="verify")._verify(f"Claim: {claim}")
+
+
+def _row(database, claim, url, status, confidence, checked_at=STALE):
+    row = dict.fromkeys(CLAIM_COLUMNS)
+    row.update(
+        id=generate_claim_id(url, claim), url=url, claim=claim, claim_hash=claim_hash(claim),
+        verification_status=status, confidence=confidence, verified_at=checked_at,
+        updated_at=checked_at, rechecked_at=None,
+    )
+    database.rows[(url, claim)] = row
+    return row
+
+
+def _run(**kwargs):
+    options = {"statuses": list(VERDICTS), "max_confidence": 100, "max_model_calls": 100, "concurrency": 2}
+    return asyncio.run(reverify.run_reverify(**{**options, **kwargs}))
+
+
+def test_rows_sharing_a_claim_are_verified_once(database, llm):
+    _row(database, "Claim A", "https://a.example/1", "disputed", 40)
+    _row(database, "Claim A", "https://a.example/2", "disputed", 40)
+    _row(database, "Claim B", "https://b.example/1", "unverifiable", 10)
+    _row(database, "Claim C", "https://c.example/1", "disputed", 40, checked_at=datetime.utcnow())  # Too recent
+    _row(database, "Claim D", "https://d.example/1", "disputed", 95)  # Too confident
+
+    report = _run(max_confidence=70)
+
+    assert report["candidates"] == 3 and report["claims"] == 2
+    assert llm.calls == 2 and report["model_calls"] == 2
+    assert len(database.reverify_runs) == 1
+
+
+def test_only_moved_verdicts_are_updated(database, llm):
+    claim = "Unemployment fell to 3.1 percent in March"
+    status, confidence = _verdict(claim)["verification_status"], _verdict(claim)["confidence"]
+    other = next(verdict for verdict in VERDICTS if verdict != status)
+    sign = -1 if confidence >= DELTA else 1
+    unchanged = _row(database, claim, "https://a.example", status, confidence + sign * (DELTA - 1))
+    off_by_delta = _row(database, claim, "https://b.example", status, confidence + sign * DELTA)
+    new_status = _row(database, claim, "https://c.example", other, confidence)
+
+    report = _run()
+
+    assert (report["moved"], report["unchanged"]) == (2, 1)
+    assert report["transitions"] == {f"{status}→{status}": 1, f"{other}→{status}": 1}
+    assert unchanged["updated_at"] == STALE and unchanged["rechecked_at"] > STALE
+    assert unchanged["confidence"] == confidence + sign * (DELTA - 1)
+    assert off_by_delta["confidence"] == confidence and off_by_delta["updated_at"] > STALE
+    assert new_status["verification_status"] == status
+
+
+def test_rows_resaved_meanwhile_are_not_overwritten(database, llm, monkeypatch):
+    claim = "The new bridge cost 1.5 billion dollars"
+    status = _verdict(claim)["verification_status"]
+    row = _row(database, claim, "https://a.example", next(verdict for verdict in VERDICTS if verdict != status), 30)
+    select = reverify.select_candidates
+
+    async def select_then_resave(*args):
+        rows = await select(*args)
+        row.update(verification_status="verified", confidence=99, updated_at=datetime.utcnow())  # Ingestion re-saved it
+        return rows
+
+    monkeypatch.setattr(reverify, "select_candidates", select_then_resave)
+    report = _run()
+
+    assert (report["moved"], report["superseded"]) == (0, 1)
+    assert (row["verification_status"], row["confidence"]) == ("verified", 99)
+
+
+def test_claims_past_the_budget_are_deferred(database, llm):
+    for index in range(4):
+        _row(database, f"Claim {index}", "https://a.example", "disputed", 40)
+
+    # One claim reserves MODEL_MAX_ATTEMPTS calls (one tier) and spends one
+    report = _run(max_model_calls=MODEL_MAX_ATTEMPTS + 1, concurrency=1)
+
+    assert (report["claims"], report["deferred"]) == (2, 2)
+    assert llm.calls == 2 and report["model_calls"] == 2
+    assert database.reverify_runs[0][6] == 2  # deferred column
+
+
+def test_rate_limited_attempts_are_charged(database, llm):
+    _row(database, "Claim A", "https://a.example", "disputed", 40)
+    llm.throttled = 2
+
+    report = _run()
+
+    assert report["verified"] == 1
+    assert report["model_calls"] == 3  # Two 429s and the call that answered
+
+
+def test_failed_claims_are_charged_their_reservation(database, llm):
+    _row(database, "Claim A", "https://a.example", "disputed", 40)
+    llm.error = "model unavailable"
+
+    report = _run()
+
+    assert report["failed"] == 1
+    assert report["model_calls"] == MODEL_MAX_ATTEMPTS
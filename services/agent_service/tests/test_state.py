@@ -0,0 +1,54 @@
+"""Content capture: follow-up turns keep the article, new content replaces it"""
+import json
+from types import SimpleNamespace
+from google.genai import types
+from agent_service.model_callbacks import _record_uploaded_media
+from agent_service.pipeline.state import CONTENT_ITEM, capture_content_item
+
+ARTICLE = "Officials said on Monday that the new bridge cost 1.5 billion dollars. " * 5
+
+
+def _turn(state, invocation_id, text=None):
+    parts = [types.Part(text=text)] if text else []
+    context = SimpleNamespace(
+        user_content=types.Content(role="user", parts=parts), state=state, invocation_id=invocation_id
+    )
+    capture_content_item(context)
+    return context
+
+
+def test_short_follow_up_keeps_the_captured_article():
+    state = {}
+    _turn(state, "i1", ARTICLE)
+    _turn(state, "i2", "also check the second paragraph")
+    assert state[CONTENT_ITEM] == {"content_type": "text", "raw_text": ARTICLE.strip()}
+
+
+def test_new_article_replaces_the_captured_one():
+    state = {}
+    _turn(state, "i1", ARTICLE)
+    _turn(state, "i2", json.dumps({"source": "BBC", "url": "https://bbc.co.uk/a", "raw_text": "Short text."}))
+    assert state[CONTENT_ITEM] == {"source": "BBC", "url": "https://bbc.co.uk/a", "raw_text": "Short text."}
+    _turn(state, "i3", ARTICLE.upper())
+    assert state[CONTENT_ITEM]["raw_text"] == ARTICLE.upper().strip()
+
+
+def test_first_short_message_is_captured():
+    state = {}
+    _turn(state, "i1", "The Eiffel Tower is 500 metres tall")
+    assert state[CONTENT_ITEM]["raw_text"] == "The Eiffel Tower is 500 metres tall"
+
+
+def test_uploads_accumulate_within_a_turn_only():
+    state = {}
+    first = _turn(state, "i1")
+    _record_uploaded_media(first, "image/png", "gs://bucket/a.png")
+    _record_uploaded_media(first, "image/png", "gs://bucket/b.png")
+    assert state[CONTENT_ITEM]["images"] == ["gs://bucket/a.png", "gs://bucket/b.png"]
+
+    _turn(state, "i2", "is the second one edited?")
+    assert state[CONTENT_ITEM]["images"] == ["gs://bucket/a.png", "gs://bucket/b.png"]
+
+    later = _turn(state, "i3")
+    _record_uploaded_media(later, "image/png", "gs://bucket/c.png")
+    assert state[CONTENT_ITEM]["images"] == ["gs://bucket/c.png"]
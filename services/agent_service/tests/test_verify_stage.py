@@ -0,0 +1,76 @@
+"""Verification cascade: failed escalations fall back to the last valid verdict"""
+import asyncio
+import json
+from types import SimpleNamespace
+import pytest
+from agent_service.pipeline import verify_stage
+from agent_service.pipeline.verify_stage import CascadeStats, verify_claims
+
+WEAK, STRONG = SimpleNamespace(name="weak"), SimpleNamespace(name="strong")
+CLAIM = {"claim": "The bridge cost 1.5 billion dollars", "category": "economy"}
+LOW_CONFIDENCE = {"verification_status": "verified", "confidence": 40, "evidence": "one source", "sources": []}
+
+
+class RecordingCache:
+    def __init__(self):
+        self.puts = []
+
+    async def get(self, claim):
+        return None
+
+    async def put(self, claim, result):
+        self.puts.append(claim)
+
+
+@pytest.fixture
+def stats(monkeypatch):
+    stats = CascadeStats()
+    monkeypatch.setattr(verify_stage, "cascade_stats", stats)
+    return stats
+
+
+def _script(monkeypatch, replies):
+    async def run_agent(agent, request):
+        reply = replies[agent.name]
+        if isinstance(reply, Exception):
+            raise reply
+        if reply == "hang":
+            await asyncio.sleep(10)
+        return json.dumps(reply), []
+
+    monkeypatch.setattr(verify_stage, "run_agent", run_agent)
+
+
+@pytest.mark.parametrize("strong_reply", [RuntimeError("model overloaded"), "hang"])
+def test_failed_escalation_keeps_the_weak_verdict(monkeypatch, stats, strong_reply):
+    _script(monkeypatch, {"weak": LOW_CONFIDENCE, "strong": strong_reply})
+    cache = RecordingCache()
+    [result] = asyncio.run(verify_claims([CLAIM], WEAK, timeout=0.05, cache=cache, escalate_to=[STRONG]))
+
+    assert "error" not in result
+    assert result["tier"] == "weak" and result["confidence"] == 40
+    assert result["escalation_failed"]
+    assert stats.stats() == {
+        "resolved": {"weak": 1},
+        "escalated": {"low_confidence": 1},
+        "escalation_failed": {"weak": 1},
+    }
+    assert cache.puts == []
+
+
+def test_every_tier_failing_yields_an_error(monkeypatch, stats):
+    _script(monkeypatch, {"weak": RuntimeError("down"), "strong": RuntimeError("down too")})
+    [result] = asyncio.run(verify_claims([CLAIM], WEAK, escalate_to=[STRONG]))
+
+    assert result["error"] == "down too"
+    assert stats.stats()["resolved"] == {}
+
+
+def test_successful_escalation_resolves_at_the_strong_tier(monkeypatch, stats):
+    _script(monkeypatch, {"weak": LOW_CONFIDENCE, "strong": {**LOW_CONFIDENCE, "confidence": 90}})
+    cache = RecordingCache()
+    [result] = asyncio.run(verify_claims([CLAIM], WEAK, cache=cache, escalate_to=[STRONG]))
+
+    assert result["tier"] == "strong" and result["confidence"] == 90
+    assert "escalation_failed" not in result
+    assert cache.puts == [CLAIM["claim"]]
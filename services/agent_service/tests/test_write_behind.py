@@ -0,0 +1,97 @@
+"""Write-behind journal: crash replay, poison records and outages"""
+import asyncio
+import pytest
+from agent_service.database import write_behind
+from agent_service.database.write_behind import WriteBehindBuffer
+
+
+def _claims(*texts):
+    return [
+        {"source": "test", "url": f"https://example.com/{text}", "content_type": "article",
+         "claim": text, "verification_status": "verified"}
+        for text in texts
+    ]
+
+
+class FakeDatabase:
+    """asave_verified_claims_batch stand-in: a batch holding a poison claim fails as a whole"""
+
+    def __init__(self, up=True, poison=()):
+        self.up = up
+        self.poison = set(poison)
+        self.written = []
+
+    async def save(self, claims):
+        if not self.up or self.poison & {claim["claim"] for claim in claims}:
+            error = "connection refused" if not self.up else "value out of range"
+            return {"results": [{"success": False, "claim_id": None, "error": error} for _ in claims]}
+        self.written += [claim["claim"] for claim in claims]
+        return {"results": [{"success": True, "claim_id": claim["claim"], "error": None} for claim in claims]}
+
+    async def is_up(self):
+        return self.up
+
+
+@pytest.fixture
+def database(monkeypatch):
+    database = FakeDatabase()
+    monkeypatch.setattr(write_behind, "asave_verified_claims_batch", database.save)
+    monkeypatch.setattr(WriteBehindBuffer, "_database_up", staticmethod(database.is_up))
+    return database
+
+
+def _buffer(tmp_path, **kwargs):
+    return WriteBehindBuffer(
+        str(tmp_path / "journal.sqlite3"), batch_size=10, flush_interval=0.01, max_attempts=3, **kwargs
+    )
+
+
+def test_records_left_by_a_crash_are_replayed(tmp_path, database):
+    database.up = False
+    crashed = _buffer(tmp_path, max_pending=100)
+    asyncio.run(crashed.submit(_claims("a", "b", "c")))
+    crashed._connection.close()  # the process dies with the records journaled
+
+    database.up = True
+    restarted = _buffer(tmp_path)
+    assert asyncio.run(restarted.flush(timeout=1))
+    assert sorted(database.written) == ["a", "b", "c"]
+    assert restarted.pending == 0
+
+
+def test_poison_record_is_dead_lettered_without_blocking_the_batch(tmp_path, database):
+    database.poison = {"bad"}
+    buffer = _buffer(tmp_path)
+
+    async def run():
+        await buffer.submit(_claims("good-1", "bad", "good-2"))
+        return await buffer.flush(timeout=1)
+
+    assert asyncio.run(run())
+    assert sorted(database.written) == ["good-1", "good-2"]
+    [dead] = buffer.dead_letters()
+    assert dead["record"]["claim"] == "bad"
+    assert dead["error"] == "value out of range"
+    assert dead["attempts"] == 3
+    assert buffer.stats()["dead_lettered"] == 1
+    assert buffer.pending == 0
+
+
+def test_outage_keeps_records_journaled(tmp_path, database):
+    database.up = False
+    buffer = _buffer(tmp_path)
+
+    async def run():
+        await buffer.submit(_claims("a", "b"))
+        return await buffer.flush(timeout=0.1)
+
+    assert not asyncio.run(run())
+    assert buffer.pending == 2
+    assert buffer.dead_letters() == []
+
+
+def test_without_journal_claims_are_saved_directly(database):
+    buffer = WriteBehindBuffer(None)
+    result = asyncio.run(buffer.submit(_claims("a")))
+    assert database.written == ["a"]
+    assert "queued" not in result
@@ -24,14 +24,17 @@ export async function queryClaims(): Promise<Claim[]> {
       ssl: { rejectUnauthorized: false }
     });
 
+    // Article text/media live once per article in `content`; rows saved before
+    // the content table existed still carry their own copies
     const result = await pool.query(`
       SELECT 
-        id, source, url, content_type, claim, category,
-        verification_status, confidence, evidence, verification_sources as sources,
-        images, videos, created_at
-      FROM crawled_content
-      WHERE claim IS NOT NULL
-      ORDER BY created_at DESC
+        cc.id, cc.source, cc.url, cc.content_type, cc.claim, cc.category,
+        cc.verification_status, cc.confidence, cc.evidence, cc.verification_sources as sources,
+        COALESCE(c.images, cc.images) as images, COALESCE(c.videos, cc.videos) as videos, cc.created_at
+      FROM crawled_content cc
+      LEFT JOIN content c ON c.content_hash = cc.content_hash
+      WHERE cc.claim IS NOT NULL
+      ORDER BY cc.created_at DESC
       LIMIT 50
     `);
 